@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 
+import os
 import sys
+from contextlib import nullcontext
 from typing import Annotated, Optional
 
 from cyclopts import App, Parameter
@@ -11,10 +13,26 @@ from rich.prompt import Prompt
 from rich.console import Console
 
 from pypaperless_cli.config import config as appconfig
-from pypaperless_cli.utils import groups, validators
+from pypaperless_cli.utils import cassette, groups, jobs as journals, profiling, validators
 from pypaperless_cli.commands import (
     auth,
+    backup,
+    bench,
+    browse,
+    completion,
+    correspondent,
+    dedupe,
     document,
+    jobs,
+    listen,
+    document_type,
+    metrics,
+    replicate,
+    rules,
+    storage_path,
+    tag,
+    view,
+    watch,
 )
 from pypaperless_cli.utils.types import (
     account_alias,
@@ -40,6 +58,22 @@ app["--version"].group = "Help"
 
 app.command(auth)
 app.command(document)
+app.command(browse)
+app.command(tag)
+app.command(correspondent)
+app.command(document_type)
+app.command(storage_path)
+app.command(dedupe)
+app.command(backup)
+app.command(replicate)
+app.command(rules)
+app.command(view)
+app.command(watch)
+app.command(listen)
+app.command(jobs)
+app.command(metrics)
+app.command(bench)
+app.command(completion)
 
 
 #
@@ -100,6 +134,25 @@ def main(
         negative = [],
         show_default = False
         )] = False,
+    record: Annotated[Optional[Path], Parameter(
+        env_var = ['PNGX_RECORD'],
+        group = groups.meta_parameters_traffic
+        )] = None,
+    replay: Annotated[Optional[Path], Parameter(
+        env_var = ['PNGX_REPLAY'],
+        group = groups.meta_parameters_traffic
+        )] = None,
+    replay_latency: Annotated[float, Parameter(
+        env_var = ['PNGX_REPLAY_LATENCY'],
+        group = groups.meta_parameters_traffic
+        )] = 1.0,
+    profile: Annotated[Optional[Path], Parameter(
+        env_var = ['PNGX_PROFILE'],
+        group = groups.meta_parameters_profiling
+        )] = None,
+    profile_interval: Annotated[float, Parameter(
+        group = groups.meta_parameters_profiling
+        )] = 0.001,
     ) -> None:
 
     """Initiate CLI
@@ -123,6 +176,16 @@ def main(
         If not specified, the default account will be used (if any).
     show_config: bool
         Show path of the configuration file in use.
+    record: Path
+        Record all API requests and responses to the given file (a cassette). Credentials aren't recorded.
+    replay: Path
+        Answer API requests from the given cassette instead of the server.
+    replay_latency: float
+        Factor applied to recorded latencies when replaying, e.g. 0 to replay without any delay.
+    profile: Path
+        Profile the command, including parsing of its arguments and rendering of output, and write the profile to the given file. Files ending with .folded, .collapsed or .txt get collapsed stacks of a sampling profiler (e.g. for flame graphs), anything else (e.g. .prof) pstats of a deterministic profiler.
+    profile_interval: float
+        Seconds between samples of the sampling profiler.
     """
 
 
@@ -134,6 +197,7 @@ def main(
 
     # Parse configuration
     try:
+        cassette.configure(record, replay, replay_latency)
         appconfig.load(config_file, use_account)
     except ValueError as e:
         Console().print(format_cyclopts_error(e))
@@ -145,13 +209,17 @@ def main(
 
     # Add ad-hoc configuration
     if host and not tokens[:2] == ('auth', 'login'):
+        # Replayed traffic doesn't involve the server, nor the credentials (cassettes don't contain any)
+        replaying = bool(cassette.settings["replay"])
+
         try:
             appconfig.add_account(
                 host = host,
                 user = user,
                 password = password,
-                token = token,
-                alias = "__adhoc__"
+                token = token or ("REDACTED" if replaying else None),
+                alias = "__adhoc__",
+                verify = not replaying
             )
         except ValueError as e:
             Console().print(format_cyclopts_error(e))
@@ -168,19 +236,31 @@ def main(
         if token:
             tokens += ("--token", token)
     
-    elif not appconfig.list():
+    # The stand-in API doesn't talk to any server
+    elif not appconfig.list() and tokens[:2] != ('bench', 'stand-in'):
         Console().print(format_cyclopts_error("No accounts configured that can be used."))
         sys.exit(1)
 
     # Now run the actual app
-    try:
-        app(tokens)
-    except ValueError as e:
-        Console().print(format_cyclopts_error(e))
-        sys.exit(1)
+    with profiling.profile(profile, profile_interval) if profile else nullcontext():
+        try:
+            journals.settings["command"] = tokens
+            app(tokens)
+        except (ValueError, cassette.NotRecordedError) as e:
+            Console().print(format_cyclopts_error(e))
+            sys.exit(1)
 
 
 def launch() -> None:
     """Run commands."""
 
-    app.meta()
+    try:
+        app.meta()
+    except KeyboardInterrupt:
+        # Long-running commands (e.g. `watch`) are stopped this way, persisting their state as they go
+        sys.exit(130)
+    except BrokenPipeError:
+        # Output piped into a command which stopped reading (e.g. `head`)
+        # Redirect remaining output to devnull to avoid another error while flushing at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
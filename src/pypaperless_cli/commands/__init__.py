@@ -3,4 +3,17 @@ Exports for CLI commands.
 """
 
 from pypaperless_cli.commands.auth import auth
+from pypaperless_cli.commands.backup import backup
+from pypaperless_cli.commands.bench import bench
+from pypaperless_cli.commands.browse import browse
+from pypaperless_cli.commands.completion import completion
+from pypaperless_cli.commands.dedupe import dedupe
 from pypaperless_cli.commands.document import document
+from pypaperless_cli.commands.jobs import jobs
+from pypaperless_cli.commands.listen import listen
+from pypaperless_cli.commands.metrics import metrics
+from pypaperless_cli.commands.objects import correspondent, document_type, storage_path, tag
+from pypaperless_cli.commands.replicate import replicate
+from pypaperless_cli.commands.rules import rules
+from pypaperless_cli.commands.watch import watch
+from pypaperless_cli.commands.view import view
@@ -12,6 +12,8 @@ from rich.console import Console
 from rich.table import Table
 from rich import box
 
+from pypaperless_cli.utils import output
+from pypaperless_cli.utils.output import OutputFormat
 from pypaperless_cli.utils.types import (
     account_alias,
     URL
@@ -128,27 +130,26 @@ def show(alias: account_alias = None, /) -> None:
 
 
 @auth.command
-def list() -> None:
-    """List available accounts"""
+def list(format: OutputFormat = "table") -> None:
+    """List available accounts. The current account is marked.
 
-    accounts = appconfig.list()
-
-    if accounts:
-        table = Table(box=box.SIMPLE_HEAD)
-        table.add_column("Alias")
-        table.add_column("Host")
-        table.add_column("User")
+    Parameters
+    ----------
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format.
+    """
 
-        for account in accounts:
-            if account.alias == appconfig.current.alias:
-                table.add_row(f"* {account.alias}", account.host, account.user, style="green")
-            else:
-                table.add_row(f"  {account.alias}", account.host, account.user)
+    accounts = appconfig.list()
 
-        Console().print(table)
-    
-    else:
+    if not accounts and format == "table":
         Console().print("No accounts configured.")
+        return
+
+    with output.writer(format, ["current", "alias", "host", "user"]) as out:
+        out.write(
+            {"current": account.alias == appconfig.current.alias, "alias": account.alias, "host": account.host, "user": account.user}
+            for account in accounts
+        )
 
 
 @auth.command
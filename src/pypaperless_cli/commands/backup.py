@@ -0,0 +1,304 @@
+"""
+Command to back up documents incrementally.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+from aiohttp import ClientResponse
+from rich.console import Console
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.config import config as appconfig
+from pypaperless_cli.const import API_PATH, DOCUMENT_FIELDS
+from pypaperless_cli.utils.cache import atomic_file, read_json, write_json
+from pypaperless_cli.utils.errors import describe
+from pypaperless_cli.utils.output import dumps
+from pypaperless_cli.utils.pages import stream_modified
+from pypaperless_cli.utils.references import REFERENCE_NAMES, ReferenceTables
+
+# Fields of documents recorded in manifests, the content is contained in the archived file anyway
+MANIFEST_FIELDS = ",".join(f for f in DOCUMENT_FIELDS if f != "content")
+
+# Size of chunks read from downloads and written to disk
+CHUNK_SIZE = 1024 * 1024
+
+
+class ObjectStore:
+    """Files stored by their MD5 checksum (as computed by Paperless-ngx).
+
+    Files are only downloaded if their checksum isn't stored yet, so unchanged and duplicate files
+    are transferred and stored once. Interrupted downloads are resumed if the server supports range requests.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Use the given directory as store."""
+
+        self.root = root
+        self.locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+    def path(self, checksum: str) -> Path:
+        """Return the path of a stored file."""
+
+        return self.root.joinpath(checksum[:2], checksum)
+
+
+    async def fetch(self, paperless: PaperlessAsyncAPI, checksum: str, path: str, params: Dict[str, Any]) -> int:
+        """Download a file unless it's already stored. Returns the number of bytes transferred."""
+
+        # Documents with identical files must not download them at the same time
+        async with self.locks[checksum]:
+            target = self.path(checksum)
+            if target.exists():
+                return 0
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            part = target.with_name(f"{checksum}.part")
+
+            md5 = hashlib.md5()
+            offset = 0
+
+            if part.exists():
+                with part.open("rb") as f:
+                    while chunk := f.read(CHUNK_SIZE):
+                        md5.update(chunk)
+                        offset += len(chunk)
+
+                # Downloaded completely, but interrupted before being stored
+                if md5.hexdigest() == checksum:
+                    part.replace(target)
+                    return 0
+
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            transferred = None
+
+            async with paperless.request("get", path, params=params, headers=headers) as res:
+                # Unless the partial file is longer than the file, it's continued
+                if res.status != 416:
+                    res.raise_for_status()
+                    if res.status != 206:
+                        # Range not supported, start over
+                        md5 = hashlib.md5()
+                    transferred = await self.receive(res, part, res.status == 206, md5)
+
+            if transferred is None:
+                # The partial file doesn't belong to the file, start over
+                md5 = hashlib.md5()
+                async with paperless.request("get", path, params=params) as res:
+                    res.raise_for_status()
+                    transferred = await self.receive(res, part, False, md5)
+
+            if md5.hexdigest() != checksum:
+                part.unlink()
+                raise ValueError(f"Checksum mismatch of downloaded file {checksum}.")
+
+            part.replace(target)
+
+            return transferred
+
+
+    async def receive(self, response: ClientResponse, part: Path, append: bool, md5: Any) -> int:
+        """Write a response's body to a partial file, updating its checksum. Returns the number of bytes written."""
+
+        transferred = 0
+
+        with part.open("ab" if append else "wb") as f:
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                f.write(chunk)
+                md5.update(chunk)
+                transferred += len(chunk)
+
+        return transferred
+
+
+class Backup:
+    """Back up documents changed since the last run into a directory.
+
+    The directory contains the object store (`objects/`), one manifest per run (`manifests/`)
+    describing all documents at that time, and the state of the last run (`state.json`).
+    """
+
+    def __init__(self, paperless: PaperlessAsyncAPI, directory: Path, archives: bool) -> None:
+        """Set up a backup into the given directory."""
+
+        self.paperless = paperless
+        self.directory = directory
+        self.archives = archives
+
+        self.store = ObjectStore(directory.joinpath("objects"))
+        self.state: Dict[str, Any] = read_json(directory.joinpath("state.json"), {})
+        self.documents: Dict[int, dict] = {}
+        self.stats: Counter = Counter()
+        self.errors: list = []
+
+
+    def restore(self) -> None:
+        """Load the documents recorded by the most recent manifest."""
+
+        if not self.state.get("manifest"):
+            return
+
+        try:
+            with gzip.open(self.directory.joinpath("manifests", self.state["manifest"]), "rt") as f:
+                manifest = read_manifest(f.read())
+        except (OSError, ValueError):
+            # Without the previous manifest, all documents need to be recorded again (their files are still stored)
+            self.state = {}
+            return
+
+        self.documents = {d["id"]: d for d in manifest["documents"]}
+
+
+    async def back_up(self, document: dict) -> None:
+        """Record a document and store its files."""
+
+        metadata = await self.paperless.request_json("get", API_PATH["documents_meta"].format(pk=document["id"]))
+
+        record = {
+            **document,
+            "original_filename": metadata.get("original_filename"),
+            "original_checksum": metadata["original_checksum"],
+            "archive_filename": metadata.get("archive_media_filename"),
+            "archive_checksum": metadata.get("archive_checksum"),
+        }
+
+        download = API_PATH["documents_download"].format(pk=document["id"])
+        files = [(record["original_checksum"], {"original": "true"})]
+        if self.archives and record["archive_checksum"]:
+            files.append((record["archive_checksum"], {}))
+
+        for checksum, params in files:
+            transferred = await self.store.fetch(self.paperless, checksum, download, params)
+            if transferred:
+                self.stats["files"] += 1
+                self.stats["bytes"] += transferred
+
+        self.documents[document["id"]] = record
+        self.stats["documents"] += 1
+
+
+    async def run(self, concurrency: int, page_size: int) -> str:
+        """Back up all changed documents and write a manifest. Returns the manifest's name."""
+
+        # Page results contain the IDs of all documents, which reveals deleted documents
+        page, references = await asyncio.gather(
+            self.paperless.request_json("get", API_PATH["documents"], params={"page_size": 1, "fields": "id"}),
+            ReferenceTables.load(self.paperless),
+        )
+
+        queue: asyncio.Queue = asyncio.Queue(concurrency * 2)
+
+        async def worker() -> None:
+            while (document := await queue.get()) is not None:
+                try:
+                    await self.back_up(document)
+                except Exception as e:
+                    # Any failure must not stop the worker, the queue would never drain otherwise
+                    self.errors.append(f"Document {document['id']}: {describe(e)}")
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        cursor = (self.state.get("modified"), self.state.get("id"))
+
+        try:
+            async for results in stream_modified(self.paperless, {"fields": MANIFEST_FIELDS}, cursor, page_size=page_size):
+                for document in results:
+                    await queue.put(document)
+                    cursor = (document["modified"], document["id"])
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+        ids = set(page["all"])
+        self.stats["deleted"] = sum(1 for id in self.documents if id not in ids)
+
+        name = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json.gz"
+        write_manifest(self.directory.joinpath("manifests", name), {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "host": appconfig.current.host,
+            "references": {kind: getattr(references, kind) for kind in REFERENCE_NAMES},
+            "documents": [self.documents[id] for id in sorted(self.documents) if id in ids],
+        })
+
+        # Documents which failed are backed up again next time
+        self.state["manifest"] = name
+        if not self.errors:
+            self.state["modified"], self.state["id"] = cursor
+        write_json(self.directory.joinpath("state.json"), self.state)
+
+        return name
+
+
+def read_manifest(text: str) -> Dict[str, Any]:
+    """Parse a manifest, turning document IDs back into integers."""
+
+    manifest = json.loads(text)
+    manifest["documents"] = [{**d, "id": int(d["id"])} for d in manifest.get("documents", [])]
+
+    return manifest
+
+
+def write_manifest(path: Path, manifest: Dict[str, Any]) -> None:
+    """Atomically write a gzip-compressed manifest."""
+
+    with atomic_file(path, "wt", opener=gzip.open) as f:
+        f.write(dumps(manifest))
+
+
+async def backup(
+    directory: Path,
+    /, *,
+    concurrency: int = 4,
+    archives: bool = True,
+    page_size: int = 100,
+    ) -> None:
+
+    """Back up documents and their files incrementally.
+
+    Only documents modified since the last run are transferred. Files are stored by checksum,
+    so unchanged and duplicate files are never downloaded or stored twice. Each run writes
+    a compressed manifest describing all documents, which refers to their files by checksum.
+    Interrupted runs can simply be restarted.
+
+    Examples
+    --------
+    pngx backup /mnt/backup/paperless --concurrency 8
+
+    Parameters
+    ----------
+    directory: Path
+        Directory to back up into. Created if it doesn't exist.
+    concurrency: int
+        Number of documents backed up simultaneously.
+    archives: bool
+        Back up archived versions of documents as well as the originals.
+    page_size: int
+        Number of documents requested at once.
+    """
+
+    directory.mkdir(parents=True, exist_ok=True)
+
+    async with PaperlessAsyncAPI() as paperless:
+        backup = Backup(paperless, directory, archives)
+        backup.restore()
+        manifest = await backup.run(concurrency, page_size)
+
+    for error in backup.errors:
+        print(error, file=sys.stderr)
+
+    stats = backup.stats
+    Console().print(
+        f"Backed up {stats['documents']} changed document(s), downloading {stats['files']} file(s) "
+        f"({stats['bytes'] / 1024 / 1024:.1f} MiB). {stats['deleted']} document(s) deleted since. Manifest: {manifest}"
+    )
+
+    if backup.errors:
+        raise ValueError(f"{len(backup.errors)} document(s) couldn't be backed up and will be retried next time.")
@@ -0,0 +1,340 @@
+"""
+Commands to benchmark Paperless-ngx servers.
+"""
+
+import asyncio
+import bisect
+import math
+import random
+import time
+import zlib
+from collections import defaultdict
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Literal, Optional
+
+from aiohttp import ClientError, web
+from cyclopts import App, Parameter
+from pypaperless.exceptions import PaperlessError
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils import output
+from pypaperless_cli.utils.standin import WORDS, create_app
+
+# Operations and their default weight. Operations changing documents are only run if explicitly allowed.
+OPERATIONS = {
+    "list": 40,
+    "show": 30,
+    "search": 10,
+    "edit": 10,
+    "bulk_edit": 5,
+    "upload": 5,
+}
+WRITE_OPERATIONS = ("edit", "bulk_edit", "upload")
+
+# Upper bounds of latency histogram buckets in milliseconds
+HISTOGRAM_BUCKETS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Fields requested when listing documents, as by `pngx document list`
+LIST_FIELDS = "id,title,created_date,correspondent,document_type,tags"
+
+#
+# Benchmarks
+#
+
+bench = App(name="bench", help="Benchmark Paperless-ngx servers.", version_flags=[])
+bench["--help"].group = "Help"
+
+
+def synthetic_pdf(text: str) -> bytes:
+    """Return a minimal, valid single-page PDF showing the given text."""
+
+    stream = zlib.compress(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    return pdf
+
+
+class Workload:
+    """Realistic operations against a server, picking documents at random."""
+
+    def __init__(self, paperless: PaperlessAsyncAPI, seed: Optional[int] = None) -> None:
+        """Set up the workload. Call `prepare()` before running operations."""
+
+        self.paperless = paperless
+        self.random = random.Random(seed)
+        self.ids: List[int] = []
+        self.words: List[str] = []
+
+
+    async def prepare(self) -> None:
+        """Fetch the IDs of all documents and words to search for."""
+
+        page = await self.paperless.request_json("get", API_PATH["documents"], params={"page_size": 100, "fields": "id,title"})
+        self.ids = page["all"]
+        self.words = sorted({w.lower() for d in page["results"] for w in d["title"].split() if len(w) > 3 and w.isalpha()}) or WORDS
+
+        if not self.ids:
+            raise ValueError("The server doesn't have any documents to benchmark with.")
+
+
+    async def list(self) -> None:
+        pages = max(1, math.ceil(len(self.ids) / 25))
+        params = {"page": self.random.randint(1, pages), "page_size": 25, "fields": LIST_FIELDS}
+        await self.paperless.request_json("get", API_PATH["documents"], params=params)
+
+    async def show(self) -> None:
+        await self.paperless.request_json("get", API_PATH["documents_single"].format(pk=self.random.choice(self.ids)))
+
+    async def search(self) -> None:
+        params = {"query": self.random.choice(self.words), "page_size": 25, "fields": LIST_FIELDS}
+        await self.paperless.request_json("get", API_PATH["documents"], params=params)
+
+    async def edit(self) -> None:
+        # Set the title a document already has
+        path = API_PATH["documents_single"].format(pk=self.random.choice(self.ids))
+        document = await self.paperless.request_json("get", path, params={"fields": "id,title"})
+        await self.paperless.request_json("patch", path, json={"title": document["title"]})
+
+    async def bulk_edit(self) -> None:
+        # Neither add nor remove any tag
+        ids = self.random.sample(self.ids, min(10, len(self.ids)))
+        await self.paperless.bulk_edit(ids, "modify_tags", add_tags=[], remove_tags=[])
+
+    async def upload(self) -> None:
+        title = f"pngx bench {self.random.randrange(10**9)}"
+        form = {"document": synthetic_pdf(title), "title": title}
+        await self.paperless.request_json("post", API_PATH["documents_post"], form=form)
+
+
+class Results:
+    """Latencies and errors per operation."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+
+    async def measure(self, name: str, operation: Callable[[], Awaitable[None]], started: float) -> None:
+        """Run an operation, recording its latency in milliseconds since `started` or an error."""
+
+        try:
+            await operation()
+        except (ClientError, asyncio.TimeoutError, PaperlessError):
+            self.errors[name] += 1
+        else:
+            self.latencies[name].append((time.monotonic() - started) * 1000)
+
+
+    def report(self, elapsed: float) -> List[Dict[str, Any]]:
+        """Summarize results per operation."""
+
+        rows = []
+
+        for name in OPERATIONS:
+            latencies = sorted(self.latencies.get(name, []))
+            errors = self.errors.get(name, 0)
+            total = len(latencies) + errors
+            if not total:
+                continue
+
+            def percentile(p: float) -> Optional[float]:
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1) if latencies else None
+
+            buckets = [bisect.bisect_right(latencies, bound) for bound in HISTOGRAM_BUCKETS]
+            histogram = {f"≤{bound}ms": count - previous for bound, count, previous in zip(HISTOGRAM_BUCKETS, buckets, [0] + buckets)}
+            histogram[f">{HISTOGRAM_BUCKETS[-1]}ms"] = len(latencies) - buckets[-1]
+
+            rows.append({
+                "operation": name,
+                "requests": total,
+                "errors": errors,
+                "error_rate": round(errors / total, 4),
+                "throughput": round(len(latencies) / elapsed, 1),
+                "p50": percentile(0.5),
+                "p90": percentile(0.9),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1], 1) if latencies else None,
+                "histogram": {k: v for k, v in histogram.items() if v},
+            })
+
+        return rows
+
+
+def parse_mix(mix: Optional[str], writes: bool) -> Dict[str, int]:
+    """Parse weights of operations given as NAME=WEIGHT pairs (comma-separated)."""
+
+    if mix is None:
+        return {k: v for k, v in OPERATIONS.items() if writes or k not in WRITE_OPERATIONS}
+
+    weights = {}
+    for pair in mix.split(","):
+        name, _, weight = pair.strip().partition("=")
+
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation \"{name}\". Must be any of {', '.join(OPERATIONS)}.")
+        if name in WRITE_OPERATIONS and not writes:
+            raise ValueError(f"Operation \"{name}\" changes documents and requires --allow-writes.")
+
+        try:
+            weights[name] = int(weight or 1)
+        except ValueError:
+            raise ValueError(f"Invalid weight \"{weight}\" of operation \"{name}\".")
+
+        if weights[name] < 0:
+            raise ValueError(f"Weight of operation \"{name}\" must not be negative.")
+
+    if not any(weights.values()):
+        raise ValueError("At least one operation must have a positive weight.")
+
+    return weights
+
+
+@bench.command
+async def server(
+    *,
+    mix: Annotated[Optional[str], Parameter(show_default = False)] = None,
+    duration: float = 30.0,
+    concurrency: int = 8,
+    rate: Annotated[Optional[float], Parameter(show_default = False)] = None,
+    allow_writes: Annotated[bool, Parameter(negative = [])] = False,
+    seed: Annotated[Optional[int], Parameter(show_default = False)] = None,
+    format: Literal["table", "json", "ndjson", "csv"] = "table",
+    ) -> None:
+
+    """Put load on the server with a mix of realistic operations and report latencies.
+
+    Operations are listing, showing and searching documents and, if allowed, editing
+    (without actually changing anything), bulk editing and uploading documents.
+    Latencies are reported in milliseconds. Use `pngx bench stand-in` to try it out locally.
+
+    Examples
+    --------
+    pngx bench server --mix list=50,show=40,search=10 --concurrency 16 --duration 60
+
+    Parameters
+    ----------
+    mix: str
+        Weights of operations (comma-separated NAME=WEIGHT pairs) out of list, show, search, edit, bulk_edit and upload.
+        Defaults to list=40,show=30,search=10 plus edit=10,bulk_edit=5,upload=5 if writes are allowed.
+    duration: float
+        Seconds to run the benchmark.
+    concurrency: int
+        Number of simultaneous operations, i.e. simulated clients.
+    rate: float
+        Start operations at this rate per second instead of as fast as possible, but at most the given number simultaneously.
+        Latencies include the time an operation waited to be started.
+    allow_writes: bool
+        Allow operations writing to the server. Uploaded documents are titled "pngx bench <number>" and need to be deleted afterwards.
+    seed: int
+        Seed of the random choice of operations and documents, for reproducible runs.
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format of the report.
+    """
+
+    if duration <= 0 or concurrency <= 0 or (rate is not None and rate <= 0):
+        raise ValueError("--duration, --concurrency and --rate must be positive.")
+
+    weights = parse_mix(mix, allow_writes)
+    names, values = list(weights), list(weights.values())
+    results = Results()
+
+    async with PaperlessAsyncAPI() as paperless:
+        workload = Workload(paperless, seed)
+        await workload.prepare()
+
+        def pick() -> str:
+            return workload.random.choices(names, weights=values)[0]
+
+        started = time.monotonic()
+        deadline = started + duration
+
+        if rate is None:
+            # Closed loop: each simulated client starts its next operation once the previous one finished
+            async def client() -> None:
+                while time.monotonic() < deadline:
+                    name = pick()
+                    await results.measure(name, getattr(workload, name), time.monotonic())
+
+            await asyncio.gather(*[client() for _ in range(concurrency)])
+
+        else:
+            # Open loop: operations are scheduled at a fixed rate, regardless of how long previous ones took
+            semaphore = asyncio.Semaphore(concurrency)
+            tasks = []
+
+            async def scheduled(name: str, at: float) -> None:
+                async with semaphore:
+                    await results.measure(name, getattr(workload, name), at)
+
+            i = 0
+            while (at := started + i / rate) < deadline:
+                await asyncio.sleep(max(0, at - time.monotonic()))
+                tasks.append(asyncio.create_task(scheduled(pick(), at)))
+                i += 1
+
+            await asyncio.gather(*tasks)
+
+        elapsed = time.monotonic() - started
+
+    columns = ["operation", "requests", "errors", "error_rate", "throughput", "p50", "p90", "p99", "max", "histogram"]
+    with output.writer(format, columns) as out:
+        out.write(results.report(elapsed))
+
+
+@bench.command(name="stand-in")
+async def stand_in(
+    *,
+    port: int = 8000,
+    bind: str = "127.0.0.1",
+    documents: int = 1000,
+    latency: float = 0.0,
+    ) -> None:
+
+    """Serve a stand-in of the Paperless-ngx API with synthetic documents.
+
+    Only the endpoints used by `pngx bench server` are provided, and any API token is accepted.
+
+    Examples
+    --------
+    pngx bench stand-in --port 8000 &
+    pngx --host http://127.0.0.1:8000 --token any bench server --allow-writes
+
+    Parameters
+    ----------
+    port: int
+        Port to serve the API on.
+    bind: str
+        Address to serve the API on.
+    documents: int
+        Number of synthetic documents.
+    latency: float
+        Seconds by which each response is delayed.
+    """
+
+    runner = web.AppRunner(create_app(documents, latency), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, bind, port).start()
+
+    print(f"Serving a stand-in API with {documents} documents on http://{bind}:{port}", flush=True)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
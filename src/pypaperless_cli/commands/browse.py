@@ -0,0 +1,711 @@
+"""
+Command to search and triage documents interactively.
+"""
+
+import asyncio
+import codecs
+import math
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Annotated, Any, Dict, Hashable, List, Optional, Set
+
+from aiohttp import ClientError
+from cyclopts import Parameter
+from pypaperless.exceptions import PaperlessError
+
+from rich.console import Console, Group
+from rich.layout import Layout
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.commands.document.show import SHOW_FIELDS
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils import converters
+from pypaperless_cli.utils.bulk import DocumentChanges
+from pypaperless_cli.utils.references import ReferenceTables
+
+# Fields of documents in the result list
+LIST_FIELDS = "id,title,created_date,correspondent,document_type,storage_path,tags"
+
+# Fields of the highlighted document's details
+DETAIL_FIELDS = ",".join([*SHOW_FIELDS, "content"])
+
+# Seconds the highlight has to rest on a document before its details are requested
+DETAIL_DELAY = 0.1
+
+# Escape sequences of special keys
+ESCAPE_SEQUENCES = {
+    "\x1b[A": "up",
+    "\x1b[B": "down",
+    "\x1b[C": "right",
+    "\x1b[D": "left",
+    "\x1bOA": "up",
+    "\x1bOB": "down",
+    "\x1b[5~": "pageup",
+    "\x1b[6~": "pagedown",
+    "\x1b[H": "home",
+    "\x1b[F": "end",
+}
+
+CONTROL_KEYS = {
+    "\x1b": "escape",
+    "\r": "enter",
+    "\n": "enter",
+    "\t": "tab",
+    "\x7f": "backspace",
+    "\x08": "backspace",
+}
+
+# Keys of the result list prompting for changes of the highlighted document: label and changed field
+ACTIONS = {
+    "t": ("Add tag", "add_tags"),
+    "r": ("Remove tag", "remove_tags"),
+    "c": ("Correspondent", "correspondent"),
+    "y": ("Document type", "document_type"),
+    "s": ("Storage path", "storage_path"),
+    "e": ("Title", "title"),
+}
+
+# Lookup tables of fields referring to other objects
+ACTION_REFERENCES = {
+    "add_tags": "tags",
+    "remove_tags": "tags",
+    "correspondent": "correspondents",
+    "document_type": "document_types",
+    "storage_path": "storage_paths",
+}
+
+SEARCH_HELP = "type to search · ↑↓ select · tab/esc results · ctrl+c quit"
+LIST_HELP = "↑↓ select · pgup/pgdn page · t/r add/remove tag · c correspondent · y type · s storage path · e title · / search · q quit"
+
+
+def parse_keys(data: str) -> List[str]:
+    """Split terminal input into keys, naming special keys (e.g. `up`, `enter`)."""
+
+    keys = []
+
+    while data:
+        for sequence, key in ESCAPE_SEQUENCES.items():
+            if data.startswith(sequence):
+                keys.append(key)
+                data = data[len(sequence):]
+                break
+        else:
+            keys.append(CONTROL_KEYS.get(data[0], data[0]))
+            data = data[1:]
+
+    return keys
+
+
+class LRUCache:
+    """Keep the most recently used items up to a maximum number."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.items: OrderedDict = OrderedDict()
+
+
+    def get(self, key: Hashable) -> Any:
+        if key not in self.items:
+            return None
+
+        self.items.move_to_end(key)
+        return self.items[key]
+
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self.items[key] = value
+        self.items.move_to_end(key)
+
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+
+    def pop(self, key: Hashable) -> None:
+        self.items.pop(key, None)
+
+
+    def clear(self) -> None:
+        self.items.clear()
+
+
+class Keyboard:
+    """Read keys from the terminal without waiting for a line to be completed."""
+
+    def __init__(self) -> None:
+        self.fd = sys.stdin.fileno()
+        self.keys: asyncio.Queue = asyncio.Queue()
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.attributes: Optional[list] = None
+
+
+    def __enter__(self) -> "Keyboard":
+        # Only available on Unix, the command is still listed elsewhere
+        import termios, tty
+
+        # Keys are passed on right away, Ctrl+C still interrupts
+        self.attributes = termios.tcgetattr(self.fd)
+        tty.setcbreak(self.fd)
+        asyncio.get_running_loop().add_reader(self.fd, self.read)
+
+        return self
+
+
+    def __exit__(self, *args: Any) -> None:
+        import termios
+
+        asyncio.get_running_loop().remove_reader(self.fd)
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.attributes)
+
+
+    def read(self) -> None:
+        for key in parse_keys(self.decoder.decode(os.read(self.fd, 1024))):
+            self.keys.put_nowait(key)
+
+
+class Browser:
+    """Search documents as you type and change them.
+
+    Searches are debounced and superseded searches are cancelled along with their requests.
+    Pages of results and details of documents are kept in LRU caches. The next page and the
+    details of the highlighted document are requested ahead, so paging and moving the
+    highlight usually don't wait for the server.
+    """
+
+    def __init__(
+            self,
+            paperless: PaperlessAsyncAPI,
+            references: ReferenceTables,
+            filters: Dict[str, str],
+            full_text: bool = False,
+            page_size: int = 25,
+            debounce: float = 0.3,
+            cache_size: int = 100,
+        ) -> None:
+        """Set up a browser. Call `run()` to start it."""
+
+        self.paperless = paperless
+        self.references = references
+        self.filters = filters
+        self.search_param = "query" if full_text else "title_content"
+        self.page_size = page_size
+        self.debounce = debounce
+
+        self.pages = LRUCache(cache_size)
+        self.details = LRUCache(cache_size)
+        self.inflight: Dict[Hashable, asyncio.Task] = {}
+        self.waiters: Dict[asyncio.Task, int] = {}
+
+        # What's shown
+        self.query = ""
+        self.page = 0
+        self.selected = 0
+        self.results: List[dict] = []
+        self.count: Optional[int] = None
+        self.focus = "search"
+        self.prompt: Optional[tuple] = None
+        self.prompt_text = ""
+        self.status = ""
+        self.latency = ""
+        self.loading = False
+
+        # Pending work, cancelled once superseded
+        self.loader: Optional[asyncio.Task] = None
+        self.detail_loader: Optional[asyncio.Task] = None
+        self.prefetchers: Set[asyncio.Task] = set()
+        self.background: Set[asyncio.Task] = set()
+
+        self.live: Optional[Live] = None
+
+
+    #
+    # Requests
+    #
+
+    async def cached(self, cache: LRUCache, key: Hashable, request: Any) -> Any:
+        """Return a cached value or await the request, sharing requests already in flight.
+
+        A cancelled caller only stops waiting. The request is cancelled once no caller waits for it anymore,
+        so superseded requests don't linger.
+        """
+
+        if (value := cache.get(key)) is not None:
+            return value
+
+        task = self.inflight.get(key)
+        if task is None:
+            task = self.inflight[key] = asyncio.ensure_future(request())
+            task.add_done_callback(lambda t: self.inflight.pop(key) if self.inflight.get(key) is t else None)
+
+        self.waiters[task] = self.waiters.get(task, 0) + 1
+
+        try:
+            value = await asyncio.shield(task)
+
+        finally:
+            self.waiters[task] -= 1
+            if not self.waiters[task]:
+                del self.waiters[task]
+
+                if not task.done():
+                    # Nobody waits for the request anymore. It's dropped at once, so a new caller starts a fresh one.
+                    task.cancel()
+                    if self.inflight.get(key) is task:
+                        del self.inflight[key]
+
+        cache.put(key, value)
+
+        return value
+
+
+    async def fetch_page(self, query: str, page: int) -> dict:
+        params = {
+            **self.filters,
+            "fields": LIST_FIELDS,
+            "page": page + 1,
+            "page_size": self.page_size,
+            "ordering": "-created",
+        }
+        if query:
+            params[self.search_param] = query
+
+        return await self.cached(
+            self.pages,
+            ("page", query, page),
+            lambda: self.paperless.request_json("get", API_PATH["documents"], params=params)
+        )
+
+
+    async def fetch_details(self, id: int) -> dict:
+        return await self.cached(
+            self.details,
+            ("document", id),
+            lambda: self.paperless.request_json("get", API_PATH["documents_single"].format(pk=id), params={"fields": DETAIL_FIELDS})
+        )
+
+
+    def spawn(self, coroutine: Any, tasks: Optional[Set[asyncio.Task]] = None) -> asyncio.Task:
+        """Run a coroutine in the background, keeping a reference until it's done."""
+
+        tasks = self.background if tasks is None else tasks
+        task = asyncio.create_task(coroutine)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+        return task
+
+
+    def search(self, delay: float = 0.0) -> None:
+        """(Re)load the current page, superseding any pending search."""
+
+        if self.loader is not None:
+            self.loader.cancel()
+
+        self.loading = True
+        self.loader = asyncio.create_task(self.load(delay))
+
+
+    async def load(self, delay: float) -> None:
+        query, page = self.query, self.page
+
+        # Wait for typing to pause before searching
+        await asyncio.sleep(delay)
+
+        started = time.monotonic()
+        cached = self.pages.get(("page", query, page)) is not None
+
+        try:
+            data = await self.fetch_page(query, page)
+        except (ClientError, asyncio.TimeoutError, PaperlessError) as e:
+            self.loading = False
+            self.status = f"Search failed: {e}"
+            self.refresh()
+            return
+
+        self.results = data["results"]
+        self.count = data["count"]
+        self.selected = min(self.selected, max(len(self.results) - 1, 0))
+        self.loading = False
+        self.latency = "cached" if cached else f"{(time.monotonic() - started) * 1000:.0f} ms"
+
+        self.refresh()
+        self.highlight(delay=0)
+
+        if data.get("next"):
+            self.spawn(self.prefetch(self.fetch_page(query, page + 1)), self.prefetchers)
+
+
+    async def prefetch(self, request: Any) -> None:
+        try:
+            await request
+        except (ClientError, asyncio.TimeoutError, PaperlessError):
+            # Requested again when actually needed
+            pass
+
+
+    def highlight(self, delay: float = DETAIL_DELAY) -> None:
+        """Request details of the highlighted document once the highlight rests on it."""
+
+        if self.detail_loader is not None:
+            self.detail_loader.cancel()
+
+        if not self.results:
+            return
+
+        async def load() -> None:
+            id = self.results[self.selected]["id"]
+
+            if self.details.get(("document", id)) is None:
+                await asyncio.sleep(delay)
+                try:
+                    await self.fetch_details(id)
+                except (ClientError, asyncio.TimeoutError, PaperlessError) as e:
+                    self.status = f"Loading document {id} failed: {e}"
+
+            self.refresh()
+
+            # The next document is likely highlighted next
+            if self.selected + 1 < len(self.results):
+                self.spawn(self.prefetch(self.fetch_details(self.results[self.selected + 1]["id"])), self.prefetchers)
+
+        self.detail_loader = asyncio.create_task(load())
+
+
+    #
+    # Changes
+    #
+
+    def change(self, field: str, value: str) -> None:
+        """Change a field of the highlighted document, given the (raw) value entered."""
+
+        if not self.results:
+            return
+
+        document = self.results[self.selected]
+
+        try:
+            if field in ("add_tags", "remove_tags"):
+                changes: Dict[str, Any] = {field: [self.references.resolve("tags", value)]}
+            elif field == "title":
+                if not value:
+                    raise ValueError("A title is required.")
+                changes = {field: value}
+            else:
+                # An empty value unassigns the object
+                changes = {field: self.references.resolve(ACTION_REFERENCES[field], value) if value else None}
+        except ValueError as e:
+            self.status = str(e)
+            return
+
+        document_changes = DocumentChanges()
+        if not document_changes.add(document, changes):
+            self.status = "Nothing to change."
+            return
+
+        self.status = "Saving…"
+        self.spawn(self.save(document["id"], document_changes))
+
+
+    async def save(self, id: int, changes: DocumentChanges) -> None:
+        try:
+            await changes.apply(self.paperless)
+        except (ClientError, asyncio.TimeoutError, PaperlessError) as e:
+            self.status = f"Saving failed: {e}"
+            self.refresh()
+            return
+
+        self.status = f"Document {id} saved."
+
+        # The document might have moved to another page or out of the results
+        self.pages.clear()
+        self.details.pop(("document", id))
+        self.search()
+
+
+    #
+    # Input
+    #
+
+    def move(self, offset: int) -> None:
+        """Move the highlight, turning pages at their ends."""
+
+        selected = self.selected + offset
+
+        if selected < 0 and self.page > 0:
+            self.page -= 1
+            self.selected = self.page_size - 1
+            self.search()
+        elif selected >= len(self.results) and self.count is not None and (self.page + 1) * self.page_size < self.count:
+            self.page += 1
+            self.selected = 0
+            self.search()
+        else:
+            self.selected = min(max(selected, 0), max(len(self.results) - 1, 0))
+            self.highlight()
+
+
+    def turn(self, offset: int) -> None:
+        """Turn pages."""
+
+        pages = math.ceil((self.count or 0) / self.page_size)
+        page = min(max(self.page + offset, 0), max(pages - 1, 0))
+
+        if page != self.page:
+            self.page = page
+            self.selected = 0
+            self.search()
+
+
+    def press(self, key: str) -> bool:
+        """Handle a key, returning `False` to quit."""
+
+        # Messages are shown until the next key
+        self.status = ""
+
+        if self.prompt is not None:
+            if key == "enter":
+                _, field = self.prompt
+                self.prompt = None
+                self.change(field, self.prompt_text.strip())
+            elif key == "escape":
+                self.prompt = None
+            elif key == "backspace":
+                self.prompt_text = self.prompt_text[:-1]
+            elif len(key) == 1 and key.isprintable():
+                self.prompt_text += key
+            return True
+
+        if key in ("up", "down"):
+            self.move(-1 if key == "up" else 1)
+        elif key in ("pageup", "pagedown"):
+            self.turn(-1 if key == "pageup" else 1)
+
+        elif self.focus == "search":
+            if key in ("tab", "escape", "enter"):
+                self.focus = "list"
+            elif key == "backspace" or (len(key) == 1 and key.isprintable()):
+                self.query = self.query[:-1] if key == "backspace" else self.query + key
+                self.page = 0
+                self.selected = 0
+
+                # Pages being prefetched for the previous query aren't needed anymore
+                for task in self.prefetchers:
+                    task.cancel()
+
+                self.search(self.debounce)
+
+        else:
+            if key == "q":
+                return False
+            elif key in ("/", "tab"):
+                self.focus = "search"
+            elif key == "k":
+                self.move(-1)
+            elif key == "j":
+                self.move(1)
+            elif key in ("p", "left"):
+                self.turn(-1)
+            elif key in ("n", "right"):
+                self.turn(1)
+            elif key in ACTIONS and self.results:
+                self.prompt = ACTIONS[key]
+                self.prompt_text = self.results[self.selected]["title"] if key == "e" else ""
+
+        return True
+
+
+    #
+    # Rendering
+    #
+
+    def render_search(self) -> Panel:
+        if self.prompt is not None:
+            label, _ = self.prompt
+            return Panel(Text.assemble((f"{label}: ", "bold yellow"), self.prompt_text, ("▏", "blink")), border_style="yellow")
+
+        cursor = ("▏", "blink") if self.focus == "search" else ""
+        text = Text.assemble(("Search: ", "bold"), self.query, cursor)
+        if self.loading:
+            text.append("  …", style="dim")
+
+        return Panel(text, border_style="green" if self.focus == "search" else "dim")
+
+
+    def render_results(self) -> Table:
+        table = Table(expand=True, box=None, show_edge=False, highlight=False)
+        table.add_column("ID", justify="right", style="dim", no_wrap=True)
+        table.add_column("Created", no_wrap=True)
+        table.add_column("Title", ratio=1, no_wrap=True, overflow="ellipsis")
+        table.add_column("Correspondent", no_wrap=True, overflow="ellipsis", max_width=20)
+        table.add_column("Tags", no_wrap=True, overflow="ellipsis", max_width=30)
+
+        for i, document in enumerate(self.results):
+            table.add_row(
+                str(document["id"]),
+                document.get("created_date") or "",
+                document.get("title") or "",
+                self.references.correspondents.get(document.get("correspondent"), ""),
+                ", ".join(self.references.tag_names(document.get("tags"))),
+                style="reverse" if i == self.selected and self.focus == "list" else ("bold" if i == self.selected else None),
+            )
+
+        return table
+
+
+    def render_details(self) -> Any:
+        if not self.results:
+            return Text("No documents." if self.count == 0 else "", style="dim")
+
+        id = self.results[self.selected]["id"]
+        document = self.details.get(("document", id))
+        if document is None:
+            return Text("Loading…", style="dim")
+
+        grid = Table.grid(padding=(0, 2))
+        grid.add_column(style="blue", no_wrap=True)
+        grid.add_column(overflow="fold")
+
+        references = self.references
+        grid.add_row("Title", Text(document.get("title") or "", style="bold"))
+        grid.add_row("ID", str(document["id"]))
+        grid.add_row("ASN", str(document.get("archive_serial_number")))
+        grid.add_row("Created", str(document.get("created_date")))
+        grid.add_row("Correspondent", str(references.correspondents.get(document.get("correspondent"))))
+        grid.add_row("Document type", str(references.document_types.get(document.get("document_type"))))
+        grid.add_row("Storage path", str(references.storage_paths.get(document.get("storage_path"))))
+        grid.add_row("Tags", "\n".join(references.tag_names(document.get("tags"))) or "None")
+        for custom_field in document.get("custom_fields") or []:
+            grid.add_row(references.custom_field_name(custom_field["field"]), str(custom_field["value"]))
+
+        content = " ".join((document.get("content") or "").split())
+
+        return Group(grid, Text(""), Text(content, style="dim"))
+
+
+    def render_footer(self) -> Text:
+        pages = math.ceil((self.count or 0) / self.page_size)
+        position = f"{self.count} document(s) · page {self.page + 1}/{max(pages, 1)}" if self.count is not None else "Searching…"
+
+        return Text.assemble(
+            (position, "bold"),
+            f" · {self.latency}" if self.latency else "",
+            (f" · {self.status}", "yellow") if self.status else "",
+            "   ",
+            (SEARCH_HELP if self.focus == "search" else LIST_HELP, "dim"),
+            no_wrap=True,
+            overflow="ellipsis",
+        )
+
+
+    def render(self) -> Layout:
+        layout = Layout()
+        layout.split_column(
+            Layout(self.render_search(), name="search", size=3),
+            Layout(name="body"),
+            Layout(self.render_footer(), name="footer", size=1),
+        )
+        layout["body"].split_row(
+            Layout(Panel(self.render_results(), border_style="dim"), name="results", ratio=3),
+            Layout(Panel(self.render_details(), border_style="dim"), name="details", ratio=2),
+        )
+
+        return layout
+
+
+    def refresh(self) -> None:
+        if self.live is not None:
+            self.live.update(self.render(), refresh=True)
+
+
+    async def run(self, console: Console) -> None:
+        """Browse until quit."""
+
+        with Live(self.render(), console=console, screen=True, auto_refresh=False) as live, Keyboard() as keyboard:
+            self.live = live
+            self.search()
+
+            try:
+                while self.press(await keyboard.keys.get()):
+                    self.refresh()
+            finally:
+                self.live = None
+                for task in [self.loader, self.detail_loader, *self.prefetchers, *self.background]:
+                    if task is not None:
+                        task.cancel()
+
+
+async def browse(
+    query: str = "",
+    /, *,
+    filters: Annotated[Optional[List[str]], Parameter(
+        name = ["--filter"],
+        negative = [],
+        converter = converters.query_filters
+        )] = None,
+    full_text: Annotated[bool, Parameter(negative = [])] = False,
+    page_size: Optional[int] = None,
+    debounce: float = 0.3,
+    cache_size: int = 100,
+    ) -> None:
+
+    """Search and triage documents interactively.
+
+    Results are updated as you type. Searches only start when typing pauses and superseded searches
+    are cancelled. Pages of results and details of documents are cached, and the next page and the details
+    of the highlighted document are requested ahead, so browsing stays responsive on slow connections.
+
+    Switch to the results with Tab to add or remove tags (t/r), set the correspondent (c), document type (y)
+    or storage path (s) and edit the title (e) of the highlighted document. Objects are given by name or ID,
+    an empty value unassigns them.
+
+    Examples
+    --------
+    pngx browse --filter tags__name__iexact=inbox
+
+    Parameters
+    ----------
+    query: str
+        Initial search.
+    filters: List[str]
+        Only browse documents matching the given API filter (e.g. --filter tags__id__all=1).
+    full_text: bool
+        Use full-text search instead of searching titles and content.
+    page_size: int
+        Number of documents per page. Defaults to the number fitting on the screen.
+    debounce: float
+        Seconds typing has to pause before searching.
+    cache_size: int
+        Number of pages and documents kept in memory each.
+    """
+
+    console = Console()
+
+    if sys.platform == "win32":
+        raise ValueError("Browsing isn't supported on Windows yet.")
+
+    if not (sys.stdin.isatty() and console.is_terminal):
+        raise ValueError("Browsing requires an interactive terminal.")
+
+    if page_size is None:
+        # Search box, borders, column headers and footer take the remaining lines
+        page_size = max(console.height - 7, 5)
+
+    async with PaperlessAsyncAPI() as paperless:
+        references = await ReferenceTables.load(paperless)
+
+        browser = Browser(
+            paperless,
+            references,
+            filters or {},
+            full_text = full_text,
+            page_size = page_size,
+            debounce = debounce,
+            cache_size = cache_size,
+        )
+        browser.query = query
+        await browser.run(console)
@@ -0,0 +1,201 @@
+"""
+Commands to set up shell completion.
+"""
+
+import inspect
+import typing
+from typing import Any, Dict, List, Literal, Tuple, Union
+
+from cyclopts import App
+from cyclopts.resolve import ResolvedCommand
+
+from pypaperless_cli.completion import refresh_names
+from pypaperless_cli.utils import converters
+from pypaperless_cli.utils.cache import cache_root, write_json
+
+#
+# Completion
+#
+
+completion = App(name="completion", help="Set up shell completion.", version_flags=[])
+completion["--help"].group = "Help"
+
+# Options completed with names of existing objects, identified by their converter
+CONVERTER_KINDS = {
+    converters.tag_name_to_id: "tags",
+    converters.custom_field_name_to_id: "custom_fields",
+    converters.correspondent_name_to_id: "correspondents",
+    converters.document_type_name_to_id: "document_types",
+    converters.storage_path_name_to_id: "storage_paths",
+}
+
+SCRIPTS = {
+    "bash": """\
+_pngx_complete() {
+    local IFS=$'\\n' candidate
+    COMPREPLY=()
+    for candidate in $(pngx-complete -- "${COMP_WORDS[@]:0:COMP_CWORD}" "${COMP_WORDS[COMP_CWORD]}" 2>/dev/null); do
+        COMPREPLY+=("$(printf '%q' "$candidate")")
+    done
+}
+complete -o default -F _pngx_complete pngx
+""",
+    "zsh": """\
+#compdef pngx
+_pngx() {
+    local -a candidates
+    candidates=("${(@f)$(pngx-complete -- "${(@)words[1,CURRENT-1]}" "${words[CURRENT]}" 2>/dev/null)}")
+    if [[ -n "${candidates[1]}" ]]; then
+        compadd -- "${candidates[@]}"
+    else
+        _files
+    fi
+}
+compdef _pngx pngx
+""",
+    "fish": """\
+complete -c pngx -f -a '(pngx-complete -- (commandline -opc) (commandline -ct))'
+""",
+}
+
+
+def unwrap(hint: Any) -> Tuple[Any, bool]:
+    """Strip `Annotated` and `Optional` from a type hint. Returns the inner type and whether it's a list."""
+
+    if typing.get_origin(hint) is typing.Annotated:
+        hint = typing.get_args(hint)[0]
+
+    if typing.get_origin(hint) is Union:
+        args = [a for a in typing.get_args(hint) if a is not type(None)]
+        hint = args[0] if len(args) == 1 else hint
+
+    if typing.get_origin(hint) in (list, List, tuple):
+        return (typing.get_args(hint) or [str])[0], True
+
+    return hint, False
+
+
+def command_options(app: App) -> Dict[str, List]:
+    """Describe the options of an app's default command.
+
+    Each option is mapped to `[KIND, MULTIPLE]`, `KIND` being `flag`, `value`, a list of choices
+    or the kind of names to complete (e.g. `tags`).
+    """
+
+    if app.default_command is None:
+        return {}
+
+    command = ResolvedCommand(
+        app.default_command,
+        app_parameter = app.default_parameter,
+        group_arguments = app.group_arguments,
+        group_parameters = app.group_parameters,
+        parse_docstring = False
+    )
+
+    options: Dict[str, List] = {}
+
+    for name, (iparam, implicit_value) in command.cli2parameter.items():
+        cparam = command.iparam_to_cparam[iparam]
+
+        if not name.startswith("-") or not cparam.show:
+            continue
+
+        if iparam.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.VAR_POSITIONAL):
+            continue
+
+        hint, multiple = unwrap(iparam.annotation)
+
+        if implicit_value is not None:
+            kind: Any = "flag"
+        elif cparam.converter in CONVERTER_KINDS:
+            kind = CONVERTER_KINDS[cparam.converter]
+        elif typing.get_origin(hint) is Literal:
+            kind = [str(choice) for choice in typing.get_args(hint)]
+        else:
+            kind = "value"
+
+        options[name] = [kind, multiple]
+
+    return options
+
+
+def command_tree(app: App) -> Dict[str, Any]:
+    """Describe all (sub)commands and their options, keyed by the path of the command."""
+
+    tree: Dict[str, Any] = {}
+
+    def visit(app: App, path: Tuple[str, ...]) -> None:
+        commands = [name for name in app._commands if not name.startswith("-")]
+        tree[" ".join(path)] = {"commands": commands, "options": command_options(app)}
+
+        for name in commands:
+            visit(app[name], path + (name,))
+
+    visit(app, ())
+
+    # Global options are given to the meta app
+    tree[""]["options"].update(command_options(app.meta))
+
+    return tree
+
+
+def write_command_tree() -> None:
+    """Cache the command tree used by `pngx-complete`."""
+
+    # Imported here as the application itself imports all commands
+    from pypaperless_cli.app import app
+
+    write_json(cache_root().joinpath("commands.json"), command_tree(app))
+
+
+@completion.command(name="bash")
+def bash() -> None:
+    """Print the completion script for Bash.
+
+    Examples
+    --------
+    pngx completion bash >> ~/.bashrc
+    """
+
+    write_command_tree()
+    print(SCRIPTS["bash"], end="")
+
+
+@completion.command(name="zsh")
+def zsh() -> None:
+    """Print the completion script for Zsh.
+
+    Examples
+    --------
+    pngx completion zsh > "${fpath[1]}/_pngx"
+    """
+
+    write_command_tree()
+    print(SCRIPTS["zsh"], end="")
+
+
+@completion.command(name="fish")
+def fish() -> None:
+    """Print the completion script for fish.
+
+    Examples
+    --------
+    pngx completion fish > ~/.config/fish/completions/pngx.fish
+    """
+
+    write_command_tree()
+    print(SCRIPTS["fish"], end="")
+
+
+@completion.command(name="refresh")
+async def refresh() -> None:
+    """Refresh the cached names of tags, correspondents, document types, storage paths and custom fields.
+
+    Names are refreshed automatically in the background once they are outdated,
+    this updates them immediately, e.g. after creating a new tag.
+    """
+
+    write_command_tree()
+    path = await refresh_names()
+    print(f"Completion cache updated: {path}")
@@ -0,0 +1,158 @@
+"""
+Command to find local files already stored in Paperless-ngx.
+"""
+
+import asyncio
+import hashlib
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Annotated, Dict, List, Literal, Optional, Tuple
+
+from cyclopts import Parameter
+from cyclopts.types import ExistingDirectory
+from rich.console import Console
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils import output
+from pypaperless_cli.utils.cache import cache_dir, read_json, write_json
+from pypaperless_cli.utils.errors import describe
+from pypaperless_cli.utils.output import OutputFormat
+
+# Persist the checksum index after this many newly fetched checksums
+CHECKPOINT_INTERVAL = 500
+
+
+def md5sum(path: str) -> Tuple[str, Optional[str]]:
+    """Return the MD5 checksum of a file (as Paperless-ngx does), reading it memory-mapped."""
+
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return path, hashlib.md5().hexdigest()
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return path, hashlib.md5(m).hexdigest()
+
+    except OSError:
+        return path, None
+
+
+async def update_index(paperless: PaperlessAsyncAPI, concurrency: int, errors: Dict[int, str]) -> Dict[str, int]:
+    """Update the local index of the server's document checksums.
+
+    The list of all document IDs is requested at once. Checksums are only fetched for documents
+    not indexed yet, deleted documents are removed from the index. Failed requests are recorded
+    in `errors` for each affected document; these documents stay unindexed and are retried on the next run.
+
+    Returns the index as a mapping of checksums to document IDs.
+    """
+
+    path = cache_dir().joinpath("checksums.json")
+    index: Dict[str, str] = read_json(path, {})
+
+    page = await paperless.request_json("get", API_PATH["documents"], params={"page_size": 1, "fields": "id"})
+    ids = set(map(str, page["all"]))
+
+    for id in set(index) - ids:
+        del index[id]
+
+    missing = sorted(ids - set(index), key=int)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(id: str) -> None:
+        async with semaphore:
+            try:
+                metadata = await paperless.request_json("get", API_PATH["documents_meta"].format(pk=id))
+
+            except Exception as e:
+                errors[int(id)] = describe(e)
+                return
+
+        index[id] = metadata["original_checksum"]
+
+        if len(index) % CHECKPOINT_INTERVAL == 0:
+            write_json(path, index)
+
+    try:
+        await asyncio.gather(*[fetch(id) for id in missing])
+    finally:
+        # Keep whatever has been fetched so far, even if interrupted
+        write_json(path, index)
+
+    return {checksum: int(id) for id, checksum in index.items()}
+
+
+async def dedupe(
+    directory: ExistingDirectory,
+    /, *,
+    pattern: str = "*",
+    only: Annotated[Optional[Literal["present", "missing"]], Parameter(show_default = False)] = None,
+    format: OutputFormat = "table",
+    workers: Optional[int] = None,
+    concurrency: int = 16,
+    ) -> None:
+
+    """Find local files which are already stored in Paperless-ngx.
+
+    Files are identified by the checksum of their original.
+    The server's checksums are kept in a local index which is updated incrementally on each run.
+    Local files are hashed in parallel.
+
+    Examples
+    --------
+    pngx dedupe scans/ --pattern "*.pdf" --only missing
+
+    Parameters
+    ----------
+    directory: Path
+        Directory to search for files (recursively).
+    pattern: str
+        Only consider files matching the given glob pattern.
+    only: Literal["present", "missing"]
+        Only print paths of files already present in or missing from Paperless-ngx, one per line.
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format of the full report.
+    workers: int
+        Number of worker processes hashing files. Defaults to the number of CPUs.
+    concurrency: int
+        Maximum number of simultaneous requests while updating the checksum index.
+    """
+
+    errors: Dict[int, str] = {}
+    files = [str(p) for p in sorted(directory.rglob(pattern)) if p.is_file()]
+
+    # Hash local files while the index is being updated
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(workers) as pool:
+        hashing = loop.run_in_executor(None, lambda: list(pool.map(md5sum, files, chunksize=16)))
+
+        async with PaperlessAsyncAPI() as paperless:
+            index = await update_index(paperless, concurrency, errors)
+
+        checksums: List[Tuple[str, Optional[str]]] = await hashing
+
+    results = [(path, checksum, index.get(checksum)) for path, checksum in checksums]
+
+    if only == "present":
+        print("\n".join(path for path, _, id in results if id is not None))
+
+    elif only == "missing":
+        print("\n".join(path for path, checksum, id in results if id is None and checksum is not None))
+
+    else:
+        statuses = {True: "present", False: "missing"}
+
+        with output.writer(format, ["status", "file", "document"]) as out:
+            out.write(
+                {"status": "unreadable" if checksum is None else statuses[id is not None], "file": path, "document": id}
+                for path, checksum, id in results
+            )
+
+    if errors:
+        for id, error in sorted(errors.items()):
+            Console(stderr=True).print(f"Document {id}: {error}")
+        raise ValueError(f"Checksums of {len(errors)} document(s) couldn't be fetched, their files are reported as missing.")
@@ -4,11 +4,21 @@ from cyclopts import App
 
 from pypaperless_cli.utils import groups
 
+from pypaperless_cli.commands.document.list import list
 from pypaperless_cli.commands.document.show import show
+from pypaperless_cli.commands.document.content import content
 from pypaperless_cli.commands.document.edit import edit
+from pypaperless_cli.commands.document.export import export
+from pypaperless_cli.commands.document.apply import apply
+from pypaperless_cli.commands.document.suggest import suggest
 
 document = App(name="document", help="Work with your documents.", group_commands=groups.commands, version_flags=[])
 document["--help"].group = "Help"
 
+document.command(list)
 document.command(show)
 document.command(edit, group_arguments=groups.arguments, group_parameters=groups.standard_fields)
+document.command(export)
+document.command(content)
+document.command(apply)
+document.command(suggest)
@@ -0,0 +1,278 @@
+"""Method for applying a changeset of per-document values."""
+
+import csv
+import json
+import sys
+from collections import Counter
+from typing import Annotated, Any, Dict, List, Literal
+
+from cyclopts import Parameter
+from cyclopts.types import ExistingFile
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import DOCUMENT_FIELDS
+from pypaperless_cli.utils import jobs, output
+from pypaperless_cli.utils.bulk import DocumentChanges
+from pypaperless_cli.utils.converters import boolean
+from pypaperless_cli.utils.pages import stream_documents
+from pypaperless_cli.utils.references import DOCUMENT_REFERENCES, ReferenceTables
+
+CUSTOM_FIELD_PREFIX = "custom_fields."
+
+# Columns which can be changed, besides custom fields
+APPLY_FIELDS = (
+    "title",
+    "created",
+    "created_date",
+    "archive_serial_number",
+    "correspondent",
+    "document_type",
+    "storage_path",
+    "tags",
+    "add_tags",
+    "remove_tags",
+)
+
+# Alternative column names
+FIELD_ALIASES = {
+    "asn": "archive_serial_number",
+}
+
+# Read-only columns, e.g. of files written by `pngx document export`, which are silently ignored
+IGNORED_FIELDS = tuple(f for f in DOCUMENT_FIELDS if f not in APPLY_FIELDS and f not in ("id", "custom_fields"))
+
+# Fields of documents needed to determine changes
+CURRENT_FIELDS = "id,title,created,created_date,archive_serial_number,correspondent,document_type,storage_path,tags,custom_fields"
+
+# Separator of list values in CSV files, as written by `pngx document export --format csv`
+LIST_SEPARATOR = "|"
+
+
+def read_rows(path: ExistingFile) -> List[Dict[str, Any]]:
+    """Read the rows of a CSV or newline-delimited JSON (`.ndjson`, `.jsonl`) or JSON file.
+
+    Empty CSV cells leave a field as it is.
+    """
+
+    try:
+        if path.suffix.lower() in (".ndjson", ".jsonl"):
+            with path.open(encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        if path.suffix.lower() == ".json":
+            return json.loads(path.read_text(encoding="utf-8"))
+
+        with path.open(newline="", encoding="utf-8-sig") as f:
+            return [{k: v for k, v in row.items() if v not in (None, "")} for row in csv.DictReader(f)]
+    except OSError as e:
+        raise ValueError(f"Can't read {path}: {e.strerror}.")
+    except (ValueError, csv.Error) as e:
+        raise ValueError(f"Invalid file {path}: {e}")
+
+
+def split_list(value: Any) -> List[Any]:
+    """Return list values given as list or as text separated by `|` or commas."""
+
+    if isinstance(value, list):
+        return value
+    if value is None:
+        return []
+
+    text = str(value)
+    separator = LIST_SEPARATOR if LIST_SEPARATOR in text else ","
+    return [v.strip() for v in text.split(separator) if v.strip()]
+
+
+def custom_field_value(data_type: str, value: Any) -> Any:
+    """Convert a custom field value given as text (e.g. in CSV files) according to the field's data type."""
+
+    if not isinstance(value, str):
+        return value
+
+    if data_type == "integer":
+        return int(value)
+    if data_type == "float":
+        return float(value)
+    if data_type == "boolean":
+        return boolean(value)
+    if data_type == "documentlink":
+        return [int(v) for v in split_list(value)]
+
+    return value
+
+
+def parse_row(row: Dict[str, Any], references: ReferenceTables) -> Dict[str, Any]:
+    """Turn a row into changes as recorded by `DocumentChanges`, resolving names to IDs.
+
+    A `tags` column sets the complete list of tags and is turned into tags to add and remove
+    per document later on (`tags` is kept as is).
+    """
+
+    changes: Dict[str, Any] = {}
+    custom_fields = {}
+
+    for column, value in row.items():
+        column = FIELD_ALIASES.get(column, column)
+
+        if column == "id" or column in IGNORED_FIELDS:
+            continue
+
+        if column.startswith(CUSTOM_FIELD_PREFIX):
+            id = references.resolve("custom_fields", column[len(CUSTOM_FIELD_PREFIX):])
+            custom_fields[id] = custom_field_value(references.custom_fields[id]["data_type"], value)
+        elif column in ("tags", "add_tags", "remove_tags"):
+            changes[column] = [references.resolve("tags", t) for t in split_list(value)]
+        elif column in DOCUMENT_REFERENCES:
+            changes[column] = None if value is None else references.resolve(DOCUMENT_REFERENCES[column], value)
+        elif column == "archive_serial_number":
+            changes[column] = None if value is None else int(value)
+        elif column in APPLY_FIELDS:
+            changes[column] = value
+        else:
+            raise ValueError(f"Unknown column \"{column}\". Must be id, any of {', '.join(APPLY_FIELDS)} or {CUSTOM_FIELD_PREFIX}<NAME>.")
+
+    if custom_fields:
+        changes["custom_fields"] = custom_fields
+
+    return changes
+
+
+def describe(changes: Dict[str, Any], references: ReferenceTables) -> str:
+    """Describe effective changes of a document in a single line."""
+
+    parts = []
+
+    for field, value in changes.items():
+        if field in ("add_tags", "remove_tags"):
+            sign = "+" if field == "add_tags" else "-"
+            parts.append(f"tags {' '.join(sign + t for t in references.tag_names(value))}")
+        elif field == "custom_fields":
+            parts += [f"{references.custom_field_name(k)}={v}" for k, v in value.items()]
+        elif field == "remove_custom_fields":
+            parts += [f"-{references.custom_field_name(k)}" for k in value]
+        elif field in DOCUMENT_REFERENCES and value is not None:
+            parts.append(f"{field}={getattr(references, DOCUMENT_REFERENCES[field]).get(value, value)}")
+        else:
+            parts.append(f"{field}={value}")
+
+    return ", ".join(parts)
+
+
+async def apply(
+    file: ExistingFile,
+    /, *,
+    dry_run: Annotated[bool, Parameter(negative = [])] = False,
+    concurrency: int = 8,
+    page_size: int = 100,
+    format: Literal["table", "json", "ndjson", "csv"] = "table",
+    ) -> None:
+
+    """Apply a changeset of per-document values.
+
+    Each row of the changeset changes one document, identified by its `id` column. Other columns are
+    title, created, created_date, archive_serial_number (or asn), correspondent, document_type, storage_path,
+    tags (the complete list), add_tags, remove_tags and custom_fields.<NAME>. Objects can be given by ID or name,
+    lists are separated by `|`. Files written by `pngx document export` can be edited and applied as they are.
+
+    Names are resolved once and only actual changes are sent: rows with identical tag, correspondent,
+    document type or storage path changes are grouped into bulk edits, everything else is sent as
+    minimal concurrent PATCH requests. A report of the result for each row is printed.
+
+    Changes are applied page by page and journaled as a job: if interrupted, `pngx jobs resume`
+    skips the rows already applied (reported as skipped).
+
+    Examples
+    --------
+    pngx document apply changes.csv --dry-run
+    pngx document apply changes.ndjson --format csv > report.csv
+
+    Parameters
+    ----------
+    file: ExistingFile
+        CSV, JSON or newline-delimited JSON (`.ndjson`, `.jsonl`) file. Empty CSV cells leave a field as it is.
+    dry_run: bool
+        Only report the changes that would be applied.
+    concurrency: int
+        Number of simultaneous requests.
+    page_size: int
+        Number of documents requested at once to determine their current values.
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format of the report.
+    """
+
+    rows = read_rows(file)
+
+    # Applying a changeset is journaled as a job, which can be resumed if interrupted
+    with jobs.journal(enabled=not dry_run) as journal:
+        async with PaperlessAsyncAPI() as paperless:
+            references = await ReferenceTables.load(paperless)
+
+            changesets: Dict[int, Dict[str, Any]] = {}
+            for i, row in enumerate(rows, 1):
+                try:
+                    id = int(row["id"])
+                except (KeyError, ValueError, TypeError):
+                    raise ValueError(f"Row {i} has no valid id.")
+
+                if id in changesets:
+                    raise ValueError(f"Document {id} is changed by more than one row (row {i}).")
+
+                try:
+                    changesets[id] = parse_row(row, references)
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"Invalid row {i}: {e}")
+
+            journal.total(len(changesets))
+            pending = [id for id in changesets if id not in journal.completed]
+
+            if not pending:
+                print("All rows have already been applied.", file=sys.stderr)
+                return
+
+            effective: Dict[int, Dict[str, Any]] = {}
+            errors: Dict[int, str] = {}
+
+            # Changes are applied page by page, checkpointing the documents changed successfully
+            async for documents in stream_documents(paperless, {"fields": CURRENT_FIELDS}, pending, page_size=page_size):
+                changes = DocumentChanges()
+
+                for document in documents:
+                    document_changes = dict(changesets[document["id"]])
+
+                    if "tags" in document_changes:
+                        tags = document_changes.pop("tags")
+                        document_changes["add_tags"] = [*document_changes.get("add_tags", []), *tags]
+                        document_changes["remove_tags"] = [
+                            *document_changes.get("remove_tags", []),
+                            *[t for t in document.get("tags") or [] if t not in tags],
+                        ]
+
+                    effective[document["id"]] = changes.add(document, document_changes)
+
+                if not dry_run:
+                    await changes.apply(paperless, concurrency, errors)
+                    journal.done(d["id"] for d in documents if d["id"] not in errors)
+
+        report = []
+        for id in changesets:
+            if id in journal.completed and id not in effective:
+                result, error = "skipped", None
+            elif id not in effective:
+                result, error = "missing", "Document does not exist."
+            elif id in errors:
+                result, error = "failed", errors[id]
+            elif effective[id]:
+                result, error = "would change" if dry_run else "changed", None
+            else:
+                result, error = "unchanged", None
+
+            report.append({"id": id, "result": result, "changes": describe(effective.get(id, {}), references), "error": error})
+
+        with output.writer(format, ["id", "result", "changes", "error"]) as out:
+            out.write(report)
+
+        counts = Counter(r["result"] for r in report)
+        print(", ".join(f"{count} {result}" for result, count in counts.items()) or "Nothing to apply.", file=sys.stderr)
+
+        # Raised within the journal, so the job is recorded as failed and can be resumed
+        if counts["missing"] or counts["failed"]:
+            raise ValueError(f"{counts['missing'] + counts['failed']} row(s) couldn't be applied.")
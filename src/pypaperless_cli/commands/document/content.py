@@ -0,0 +1,107 @@
+"""Method for dumping the content of documents."""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Annotated, List, Optional
+
+from cyclopts import Parameter
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.utils import converters, jobs
+from pypaperless_cli.utils.output import dumps
+from pypaperless_cli.utils.pages import stream_documents
+from pypaperless_cli.utils.stdin import STDIN
+from pypaperless_cli.utils.types import DocumentIDs
+
+# Only these fields are transferred for each document
+CONTENT_FIELDS = "id,title,content"
+
+
+async def content(
+    *ids: DocumentIDs,
+    out_dir: Annotated[str, Parameter(name = ["--out-dir", "-o"], allow_leading_hyphen = True)] = "-",
+    filters: Annotated[Optional[List[str]], Parameter(
+        name = ["--filter"],
+        negative = [],
+        converter = converters.query_filters
+        )] = None,
+    all_documents: Annotated[bool, Parameter(name = ["--all"], negative = [])] = False,
+    page_size: int = 100,
+    buffer: int = 4,
+    ) -> None:
+
+    """Dump the (OCR) content of many documents.
+
+    Content is retrieved from the paginated document list rather than document by document.
+    While pages are written, the next pages are already requested. At most `buffer` pages are held in memory,
+    thus a slow consumer reading from stdout throttles fetching instead of increasing memory usage.
+
+    Parameters
+    ----------
+    ids: int
+        IDs of the documents to dump. If omitted, all documents matching the given filters are dumped. Use - to read IDs from stdin.
+    out_dir: str
+        Directory to write one `<ID>.txt` file per document into. Use `-` to write newline-delimited JSON to stdout.
+    filters: List[str]
+        Only dump documents matching the given API filter (e.g. --filter tags__id__all=1).
+    all_documents: bool
+        Dump all documents, if neither IDs nor filters are given.
+    page_size: int
+        Number of documents requested at once.
+    buffer: int
+        Maximum number of pages fetched ahead of writing.
+    """
+
+    if not ids and not filters and not all_documents:
+        raise ValueError("Specify document IDs and/or filters, or --all to dump all documents.")
+
+    if buffer < 1:
+        raise ValueError("Buffer must hold at least one page.")
+
+    directory = None
+    if out_dir != "-":
+        directory = Path(out_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def write(results: List[dict]) -> None:
+        if directory is not None:
+            for document in results:
+                directory.joinpath(f"{document['id']}.txt").write_text(document.get("content") or "", encoding="utf-8")
+        else:
+            sys.stdout.write("".join(dumps(document) + "\n" for document in results))
+            sys.stdout.flush()
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+    params = {**(filters or {}), "fields": CONTENT_FIELDS}
+    if not ids:
+        params["ordering"] = "id"
+
+    # Dumping many documents is journaled as a job, which can be resumed if interrupted
+    with jobs.journal(enabled=len(ids) != 1 or STDIN in ids) as journal:
+        if ids and STDIN not in ids:
+            journal.total(len(ids))
+
+        async with PaperlessAsyncAPI() as paperless:
+
+            async def produce() -> None:
+                try:
+                    async for results in stream_documents(paperless, params, list(ids) or None, page_size=page_size, exclude=journal.completed):
+                        # Blocks as long as the queue is full
+                        await queue.put(results)
+                finally:
+                    await queue.put(None)
+
+            producer = asyncio.create_task(produce())
+
+            try:
+                while (results := await queue.get()) is not None:
+                    # Writing happens in a separate thread so fetching continues while the consumer is busy
+                    await asyncio.to_thread(write, results)
+                    journal.done(document["id"] for document in results)
+            except BaseException:
+                producer.cancel()
+                raise
+
+            # Surface errors that occurred while fetching
+            await producer
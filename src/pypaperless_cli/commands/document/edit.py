@@ -4,22 +4,35 @@ from typing import Annotated, List, Optional
 
 from cyclopts import Group, Parameter
 
-from pypaperless.models.common import CustomFieldValueType
-
 from pypaperless_cli.api import PaperlessAsyncAPI
-from pypaperless_cli.utils import converters, groups, validators
-from pypaperless_cli.utils.types import CustomFieldKeyValue
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils import converters, groups, jobs, validators
+from pypaperless_cli.utils.bulk import DocumentChanges
+from pypaperless_cli.utils.pages import stream_pages
+from pypaperless_cli.utils.stdin import STDIN, id_chunks
+from pypaperless_cli.utils.types import CustomFieldKeyValue, DocumentIDs
 
 group_tags = Group(name = "Tags parameters", sort_key=groups.standard_fields.sort_key+1)
 group_custom_fields = Group(name = "Custom fields parameters", sort_key=group_tags.sort_key+1)
 
+# Fields of documents needed to determine changes
+EDIT_FIELDS = "id,title,created_date,archive_serial_number,correspondent,document_type,storage_path,tags,custom_fields"
+
+# Number of documents changed at once
+EDIT_CHUNK_SIZE = 100
+
 async def edit(
-        id: int,
-        /, *,
+        *ids: DocumentIDs,
         asn: Optional[int] = None,
-        correspondent: Optional[int] = None,
-        document_type: Optional[int] = None,
-        storage_path: Optional[int] = None,
+        correspondent: Annotated[
+            Optional[str|int],
+            Parameter(converter = converters.correspondent_name_to_id)] = None,
+        document_type: Annotated[
+            Optional[str|int],
+            Parameter(converter = converters.document_type_name_to_id)] = None,
+        storage_path: Annotated[
+            Optional[str|int],
+            Parameter(converter = converters.storage_path_name_to_id)] = None,
         title: Optional[str] = None,
         created_date: Optional[str] = None,
         
@@ -69,20 +82,28 @@ async def edit(
             )] = None
     ) -> None:
 
-    """Update a document's information.
-    
+    """Update the information of one or many documents.
+
+    Tags, correspondents, document types and storage paths of many documents are changed using bulk edits.
+    IDs read from stdin are processed in chunks as they arrive.
+
+    Examples
+    --------
+    pngx document list --filter tags__name__iexact=inbox --ids | pngx document edit - --add-tags reviewed
+
     Parameters
     ----------
-    id: int
-        The ID of the document to be updated.
+    ids: int
+        IDs of the documents to be updated. Use - to read IDs (or JSON objects with an `id` key) line by line from stdin.
     asn: int
         Archive serial number. The unique identifier of the document in your physical document binders.
-    correspondent: int
-        ID of the correspondent.
-    document_type: int
-        ID of the document type.
-    storage_path: int
-        ID of the storage path.
+        Can only be assigned to a single document.
+    correspondent: str|int
+        ID or exact name of the correspondent.
+    document_type: str|int
+        ID or exact name of the document type.
+    storage_path: str|int
+        ID or exact name of the storage path.
     title: str
         Document title
     created_date: str
@@ -100,60 +121,65 @@ async def edit(
         Unassign given custom fields.
     """
 
-    async with PaperlessAsyncAPI() as paperless:
-        document = await paperless.documents(id)
-
-        if asn:
-            document.archive_serial_number = asn
-        
-        if correspondent:
-            document.correspondent = correspondent
-        
-        if document_type:
-            document.document_type = document_type
-        
-        if storage_path:
-            document.storage_path = storage_path
-        
-        if title:
-            document.title = title
-        
-        if created_date:
-            document.created_date = created_date
-
-        if remove_tags:
-            # Only keep tags not in `remove_tags``
-            document.tags = [t for t in document.tags if t not in remove_tags]
-
-        if add_tags:
-            # Union existing and new tags, removing duplicate entries
-            document.tags = list(dict.fromkeys(document.tags + add_tags))
-
-        if remove_custom_fields:
-            # Remove given custom field if it's assigned to document
-            for f in remove_custom_fields:
-                remove_custom_field = next((custom_field for custom_field in document.custom_fields if custom_field.field == f["id"]), None)
-                if remove_custom_field:
-                    document.custom_fields.remove(remove_custom_field)
-
-        if add_custom_fields:
-            # Update existing custom fields with possibly new values
-            for custom_field in document.custom_fields:
-                updated_custom_field = next((f for f in add_custom_fields if custom_field.field == f["id"]), None)
-                if updated_custom_field:
-                    if updated_custom_field["value"] is not None:
-                        custom_field.value = updated_custom_field["value"]
-                    add_custom_fields.remove(updated_custom_field)
-            
-            # Add remaining new custom fields
-            for custom_field in add_custom_fields:
-                new_custom_field = CustomFieldValueType(
-                    field = custom_field["id"],
-                    value = custom_field["value"]
-                )
-                document.custom_fields.append(new_custom_field)
-
-        try:
-            await document.update()
-        except Exception as e:
-            raise ValueError(str(e))
+    if not ids:
+        raise ValueError("Specify the IDs of the documents to be updated (or - to read them from stdin).")
+
+    if asn and (len(ids) > 1 or STDIN in ids):
+        raise ValueError("An archive serial number can only be assigned to a single document.")
+
+    changes = {
+        "archive_serial_number": asn,
+        "correspondent": correspondent,
+        "document_type": document_type,
+        "storage_path": storage_path,
+        "title": title,
+        "created_date": created_date,
+    }
+    changes = {k: v for k, v in changes.items() if v}
+    changes["add_tags"] = add_tags or []
+    changes["remove_tags"] = remove_tags or []
+    changes["remove_custom_fields"] = [f["id"] for f in remove_custom_fields or []]
+
+    missing = []
+
+    # Editing many documents is journaled as a job, which can be resumed if interrupted
+    with jobs.journal(enabled=len(ids) > 1 or STDIN in ids) as journal:
+        if STDIN not in ids:
+            journal.total(len(ids))
+
+        async with PaperlessAsyncAPI() as paperless:
+            # Documents are changed chunk by chunk, so IDs read from stdin are processed as they arrive
+            async for chunk in id_chunks(ids, EDIT_CHUNK_SIZE):
+                chunk = [id for id in chunk if id not in journal.completed]
+                if not chunk:
+                    continue
+
+                params = {"id__in": chunk, "fields": EDIT_FIELDS}
+                document_changes = DocumentChanges()
+                found = set()
+
+                async for documents in stream_pages(paperless, API_PATH["documents"], params, page_size=EDIT_CHUNK_SIZE):
+                    for document in documents:
+                        found.add(document["id"])
+
+                        # Custom fields without a value are assigned, but keep their value if already assigned
+                        assigned = {f["field"] for f in document.get("custom_fields") or []}
+                        custom_fields = {
+                            f["id"]: f["value"] for f in add_custom_fields or []
+                            if f["value"] is not None or f["id"] not in assigned
+                        }
+
+                        document_changes.add(document, {**changes, "custom_fields": custom_fields})
+
+                missing += [id for id in chunk if id not in found]
+
+                try:
+                    await document_changes.apply(paperless)
+                except Exception as e:
+                    raise ValueError(str(e))
+
+                journal.done(id for id in chunk if id in found)
+
+        # Raised within the journal, so the job is recorded as failed
+        if missing:
+            raise ValueError(f"Document(s) {', '.join(map(str, missing))} do not exist.")
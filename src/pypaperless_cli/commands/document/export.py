@@ -0,0 +1,237 @@
+"""Method for exporting document metadata."""
+
+import sys
+from typing import Annotated, Any, Dict, List, Literal, Optional
+
+from cyclopts import Parameter
+from cyclopts.types import Path
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.utils import converters, jobs
+from pypaperless_cli.utils.output import CSVWriter, writer as record_writer
+from pypaperless_cli.utils.pages import stream_documents
+from pypaperless_cli.utils.references import ReferenceTables
+from pypaperless_cli.utils.stdin import STDIN
+from pypaperless_cli.utils.types import DocumentIDs
+
+# Fields exported by default, in column order
+# Anything else (especially the document's content) isn't transferred unless asked for
+EXPORT_FIELDS = [
+    "id",
+    "title",
+    "created",
+    "added",
+    "modified",
+    "archive_serial_number",
+    "correspondent",
+    "document_type",
+    "storage_path",
+    "tags",
+    "original_file_name",
+    "custom_fields",
+]
+
+CUSTOM_FIELD_PREFIX = "custom_fields."
+
+# Formats which can be appended to when resuming an export
+RESUMABLE_FORMATS = ("csv", "ndjson")
+
+
+# Fields referring to other objects, mapped to the lookup table resolving their names
+REFERENCE_FIELDS = {
+    "correspondent": "correspondents",
+    "document_type": "document_types",
+    "storage_path": "storage_paths",
+}
+
+
+def document_row(document: dict, fields: List[str], references: ReferenceTables) -> Dict[str, Any]:
+    """Flatten a document into a single row with resolved names."""
+
+    row = {}
+
+    for field in fields:
+        value = document.get(field)
+
+        if field == "tags":
+            row[field] = references.tag_names(value)
+        elif field == "custom_fields":
+            for custom_field in value or []:
+                row[f"{CUSTOM_FIELD_PREFIX}{references.custom_field_name(custom_field['field'])}"] = custom_field["value"]
+        elif field in REFERENCE_FIELDS:
+            row[field] = getattr(references, REFERENCE_FIELDS[field]).get(value)
+        else:
+            row[field] = value
+
+    return row
+
+
+class ParquetRowWriter:
+    """Write rows into Parquet row groups of a fixed size."""
+
+    def __init__(self, path: Path, columns: List[str], custom_fields: Dict[str, str], row_group_size: int) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("Exporting to Parquet requires pyarrow. Install it via `pip install pypaperless-cli[parquet]`.")
+
+        self.pa = pyarrow
+
+        # Keep native types for custom fields where possible, anything else is exported as text
+        custom_field_types = {
+            "boolean": pyarrow.bool_(),
+            "integer": pyarrow.int64(),
+            "float": pyarrow.float64(),
+            "documentlink": pyarrow.list_(pyarrow.int64()),
+        }
+
+        types = {
+            "id": pyarrow.int64(),
+            "archive_serial_number": pyarrow.int64(),
+            "page_count": pyarrow.int64(),
+            "owner": pyarrow.int64(),
+            "tags": pyarrow.list_(pyarrow.string()),
+        }
+
+        self.schema = pyarrow.schema([
+            (c, types.get(c) or custom_field_types.get(custom_fields.get(c), pyarrow.string()))
+            for c in columns
+        ])
+        self.text_columns = [f.name for f in self.schema if f.type == pyarrow.string()]
+        self.row_group_size = row_group_size
+        self.buffer: List[dict] = []
+        self.writer = pyarrow.parquet.ParquetWriter(str(path), self.schema)
+
+    def write(self, rows: List[dict]) -> None:
+        for row in rows:
+            # Custom field values aren't necessarily strings (e.g. monetary or select fields)
+            for c in self.text_columns:
+                if row.get(c) is not None and not isinstance(row[c], str):
+                    row[c] = str(row[c])
+            self.buffer.append(row)
+
+        if len(self.buffer) >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            table = self.pa.Table.from_pylist(self.buffer, schema=self.schema)
+            self.writer.write_table(table, row_group_size=self.row_group_size)
+            self.buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+async def export(
+    *ids: DocumentIDs,
+    format: Literal["csv", "json", "ndjson", "parquet"] = "ndjson",
+    output: Annotated[Optional[Path], Parameter(name = ["--output", "-o"])] = None,
+    filters: Annotated[Optional[List[str]], Parameter(
+        name = ["--filter"],
+        negative = [],
+        converter = converters.query_filters
+        )] = None,
+    fields: Annotated[Optional[List[str]], Parameter(
+        negative = [],
+        show_default = False,
+        converter = converters.document_fields
+        )] = None,
+    page_size: int = 500,
+    row_group_size: int = 10000,
+    ) -> None:
+
+    """Export metadata of many documents.
+
+    Documents are streamed page by page, thus even large instances can be exported with constant memory usage.
+    Names of tags, correspondents, document types, storage paths and custom fields are resolved up-front once.
+
+    Exports of many documents to a CSV or newline-delimited JSON file are journaled as a job: if interrupted,
+    `pngx jobs resume` appends the documents not exported yet to the file.
+
+    Examples
+    --------
+    pngx document list --filter tags__id__all=1 --ids | pngx document export - --format csv
+
+    Parameters
+    ----------
+    ids: int
+        IDs of the documents to export. If omitted, all documents matching the given filters are exported. Use - to read IDs from stdin.
+    format: Literal["csv", "json", "ndjson", "parquet"]
+        Output format.
+    output: Path
+        File to write to. Defaults to stdout (not supported for Parquet).
+    filters: List[str]
+        Only export documents matching the given API filter (e.g. --filter tags__id__all=1 --filter created__year=2024).
+    fields: List[str]
+        Fields to export (comma-separated), e.g. --fields id,title,content. Defaults to all fields except the content and a few internal ones.
+    page_size: int
+        Number of documents requested at once.
+    row_group_size: int
+        Number of rows per Parquet row group.
+    """
+
+    if format == "parquet" and output is None:
+        raise ValueError("Exporting to Parquet requires an output file (--output).")
+
+    fields = fields or EXPORT_FIELDS
+    params = {**(filters or {}), "fields": ",".join(dict.fromkeys(["id", *fields]))}
+    if not ids:
+        params["ordering"] = "id"
+
+    resumable = output is not None and format in RESUMABLE_FORMATS and (len(ids) != 1 or STDIN in ids)
+
+    # Exporting many documents to a file is journaled as a job, which can be resumed if interrupted
+    with jobs.journal(enabled=resumable) as journal:
+        resumed = bool(journal.completed)
+        if ids and STDIN not in ids:
+            journal.total(len(ids))
+
+        await export_documents(journal, list(ids) or None, params, fields, format, output, resumed, page_size, row_group_size)
+
+
+async def export_documents(
+        journal: jobs.Journal,
+        ids: Optional[List[int|str]],
+        params: Dict[str, Any],
+        fields: List[str],
+        format: str,
+        output: Optional[Path],
+        resumed: bool,
+        page_size: int,
+        row_group_size: int,
+    ) -> None:
+    """Stream documents into the export, checkpointing each page written."""
+
+    async with PaperlessAsyncAPI() as paperless:
+        kinds = {REFERENCE_FIELDS.get(f, f) for f in fields} & {"tags", "custom_fields", *REFERENCE_FIELDS.values()}
+        references = await ReferenceTables.load(paperless, kinds)
+
+        # Custom fields are flattened into columns of their own
+        custom_fields = {
+            f"{CUSTOM_FIELD_PREFIX}{f['name']}": f["data_type"]
+            for f in references.custom_fields.values()
+        }
+        columns = [f for f in fields if f != "custom_fields"] + list(custom_fields)
+
+        file = None
+        if format == "parquet":
+            writer = ParquetRowWriter(output, columns, custom_fields, row_group_size)
+        else:
+            # A resumed export is continued at the end of the file, without repeating the CSV header
+            file = open(output, "a" if resumed else "w", newline="", encoding="utf-8") if output else sys.stdout
+            writer = CSVWriter(columns, file, header=False) if resumed and format == "csv" else record_writer(format, columns, file)
+
+        try:
+            async for results in stream_documents(paperless, params, ids, page_size=page_size, exclude=journal.completed):
+                writer.write([document_row(document, fields, references) for document in results])
+
+                if file is not None:
+                    file.flush()
+                journal.done(document["id"] for document in results)
+        finally:
+            writer.close()
+            if file is not None and file is not sys.stdout:
+                file.close()
@@ -0,0 +1,82 @@
+"""Method for listing documents."""
+
+from typing import Annotated, List, Optional
+
+from cyclopts import Parameter
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils import converters, output
+from pypaperless_cli.utils.output import OutputFormat
+from pypaperless_cli.utils.pages import stream_pages
+from pypaperless_cli.utils.references import DOCUMENT_REFERENCES, ReferenceTables, document_record
+
+# Fields listed by default
+LIST_FIELDS = ["id", "title", "created_date", "correspondent", "document_type", "tags"]
+
+async def list(
+    *,
+    filters: Annotated[Optional[List[str]], Parameter(
+        name = ["--filter"],
+        negative = [],
+        converter = converters.query_filters
+        )] = None,
+    fields: Annotated[Optional[List[str]], Parameter(
+        negative = [],
+        show_default = False,
+        converter = converters.document_fields
+        )] = None,
+    limit: Annotated[Optional[int], Parameter(show_default = False)] = None,
+    format: OutputFormat = "table",
+    page_size: int = 100,
+    ids: Annotated[bool, Parameter(negative = [])] = False,
+    ) -> None:
+
+    """List documents.
+
+    Only the listed fields are requested from the API. Especially the (potentially large) content
+    of documents isn't transferred unless explicitly asked for.
+
+    Examples
+    --------
+    pngx document list --filter tags__id__all=1 --fields id,title,added
+    pngx document list --filter tags__id__all=1 --ids | pngx document edit - --add-tags reviewed
+
+    Parameters
+    ----------
+    filters: List[str]
+        Only list documents matching the given API filter (e.g. --filter tags__id__all=1).
+    fields: List[str]
+        Fields to list (comma-separated). Defaults to id, title, created date, correspondent, document type and tags.
+    limit: int
+        List at most this many documents.
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format. Tables are printed as tab-separated values unless printed to a terminal.
+    page_size: int
+        Number of documents requested at once.
+    ids: bool
+        Only print the IDs of documents, one per line, e.g. to pipe them into other commands reading IDs from stdin (`-`).
+    """
+
+    fields = ["id"] if ids else fields or LIST_FIELDS
+    params = {**(filters or {}), "fields": ",".join(fields)}
+
+    if limit is not None:
+        page_size = min(page_size, limit)
+
+    count = 0
+
+    async with PaperlessAsyncAPI() as paperless:
+        kinds = [DOCUMENT_REFERENCES[f] for f in fields if f in DOCUMENT_REFERENCES]
+        references = await ReferenceTables.load(paperless, kinds) if kinds else ReferenceTables()
+
+        with (output.IDWriter(fields) if ids else output.writer(format, fields)) as out:
+            async for results in stream_pages(paperless, API_PATH["documents"], params, page_size=page_size):
+                if limit is not None:
+                    results = results[:limit - count]
+
+                out.write(document_record(document, fields, references) for document in results)
+
+                count += len(results)
+                if limit is not None and count >= limit:
+                    break
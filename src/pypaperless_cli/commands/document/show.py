@@ -1,118 +1,295 @@
 """Method for retrieving information about a document."""
 
-from typing import Annotated, Optional
+import asyncio
+from typing import Annotated, Any, Dict, List, Optional, Tuple
 
+from aiohttp import ClientError, ClientResponseError
 from cyclopts import Parameter
+from pypaperless.exceptions import PaperlessError
 
-from rich.console import Console
-from rich.table import Table
+from rich.markup import escape
+from rich.text import Text
 
 from pypaperless_cli.api import PaperlessAsyncAPI
-from pypaperless_cli.const import GUI_PATH
+from pypaperless_cli.const import API_PATH, DOCUMENT_EXPANSIONS, GUI_PATH
 from pypaperless_cli.config import config as appconfig
+from pypaperless_cli.utils import converters, output
 from pypaperless_cli.utils.highlighter import highlight_none
+from pypaperless_cli.utils.pages import stream_pages
+from pypaperless_cli.utils.references import ReferenceTables
+from pypaperless_cli.utils.stdin import id_chunks
+from pypaperless_cli.utils.types import DocumentIDs
+
+# Fields rendered by default, in order of appearance
+# The document's content is left out as it can be large and isn't shown anyway
+SHOW_FIELDS = [
+    "title",
+    "id",
+    "archive_serial_number",
+    "created_date",
+    "correspondent",
+    "document_type",
+    "storage_path",
+    "tags",
+    "custom_fields",
+]
+
+# Number of documents fetched concurrently, IDs read from stdin are shown chunk by chunk as they arrive
+SHOW_CHUNK_SIZE = 25
+
+# Lookup tables required to render fields or sub-resources
+# Storage paths are fetched separately as their path is shown as well
+FIELD_REFERENCES = {
+    "correspondent": ["correspondents"],
+    "document_type": ["document_types"],
+    "tags": ["tags"],
+    "custom_fields": ["custom_fields"],
+    "suggestions": ["tags", "correspondents", "document_types"],
+}
+
+
+async def fetch_storage_paths(paperless: PaperlessAsyncAPI) -> Dict[int, Tuple[str, str]]:
+    """Fetch names and paths of all storage paths."""
+
+    storage_paths = {}
+
+    async for results in stream_pages(paperless, API_PATH["storage_paths"], {"fields": "id,name,path"}, page_size=1000):
+        for storage_path in results:
+            storage_paths[storage_path["id"]] = (storage_path["name"], storage_path["path"])
+
+    return storage_paths
+
+
+async def fetch_expansion(paperless: PaperlessAsyncAPI, id: int, expansion: str) -> Any:
+    """Fetch a sub-resource of a document. Returns `None` if it isn't available (e.g. on older versions of Paperless-ngx)."""
+
+    try:
+        return await paperless.request_json("get", API_PATH[DOCUMENT_EXPANSIONS[expansion]].format(pk=id))
+    except (ClientError, PaperlessError):
+        return None
+
+
+def expansion_rows(expansion: str, data: Any, references: ReferenceTables, storage_paths: Dict[int, Tuple[str, str]]) -> List[tuple]:
+    """Render a document's sub-resource as labelled rows."""
+
+    rows: List[tuple] = [(f"[white]{expansion.capitalize()}", "")]
+
+    if data is None:
+        return rows + [("[i purple]Not available", "")]
+
+    if not data:
+        return rows + [(highlight_none(str(None)).markup, "")]
+
+    if expansion == "notes":
+        for note in data:
+            user = note.get("user")
+            author = user.get("username") if isinstance(user, dict) else user
+            rows.append((escape(f"{note['created'][:16].replace('T', ' ')} {author or ''}".strip()), note["note"]))
+
+    elif expansion == "history":
+        for entry in data:
+            actor = (entry.get("actor") or {}).get("username") or "system"
+            changes = []
+            for field, change in (entry.get("changes") or {}).items():
+                if isinstance(change, list) and len(change) == 2:
+                    changes.append(f"{field}: {change[0]} → {change[1]}")
+                else:
+                    changes.append(f"{field}: {change}")
+
+            rows.append((
+                escape(f"{entry['timestamp'][:16].replace('T', ' ')} {actor}"),
+                "\n".join([entry.get("action", ""), *changes])
+            ))
+
+    elif expansion == "metadata":
+        for key in ("original_filename", "original_mime_type", "original_size", "original_checksum",
+                    "archive_media_filename", "archive_size", "archive_checksum", "lang"):
+            if key in data:
+                rows.append((key.replace("_", " ").capitalize(), highlight_none(str(data[key]))))
+
+    elif expansion == "suggestions":
+        names = {
+            "tags": references.tags,
+            "correspondents": references.correspondents,
+            "document_types": references.document_types,
+            "storage_paths": {id: name for id, (name, _) in storage_paths.items()},
+        }
+        for key, table in names.items():
+            values = [table.get(i, str(i)) for i in data.get(key) or []]
+            rows.append((key.replace("_", " ").capitalize(), "\n".join(values) or highlight_none(str(None))))
+
+        rows.append(("Dates", "\n".join(data.get("dates") or []) or highlight_none(str(None))))
+
+    return rows
+
+
+async def fetch_document(paperless: PaperlessAsyncAPI, id: int, params: Optional[Dict[str, str]], expand: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Fetch a document and its sub-resources concurrently."""
+
+    try:
+        document, *expanded = await asyncio.gather(
+            paperless.request_json("get", API_PATH["documents_single"].format(pk=id), params=params),
+            *[fetch_expansion(paperless, id, e) for e in expand],
+        )
+    except ClientResponseError as e:
+        if e.status == 404:
+            raise ValueError(f"Document {id} does not exist.")
+        raise
+
+    return document, dict(zip(expand, expanded))
+
+
+def document_rows(
+    document: Dict[str, Any],
+    details: Dict[str, Any],
+    fields: List[str],
+    references: ReferenceTables,
+    storage_paths: Dict[int, Tuple[str, str]],
+    ) -> List[tuple]:
+    """Render a document's fields and sub-resources as labelled rows."""
+
+    rows = []
+
+    for field in fields:
+        value = document.get(field)
+
+        if field == "title":
+            # Explicitly style title as NoneHighlighter doesn't work well with additional styles
+            if value:
+                rows.append(("[b]Title", Text(value, style="bold")))
+            else:
+                rows.append(("[b]Title", Text(str(None), style="bold purple")))
+
+        elif field == "id":
+            rows.append(("ID", str(value)))
+        elif field == "archive_serial_number":
+            rows.append(("ASN", highlight_none(str(value))))
+        elif field == "created_date":
+            rows.append(("Created", str(value)))
+        elif field == "correspondent":
+            rows.append(("Correspondent", highlight_none(str(references.correspondents.get(value)))))
+        elif field == "document_type":
+            rows.append(("Document type", highlight_none(str(references.document_types.get(value)))))
+
+        elif field == "storage_path":
+            storage_path = storage_paths.get(value)
+            rows.append(("Storage path", highlight_none(f"{storage_path[0]}\n({storage_path[1]})" if storage_path else str(None))))
+
+        elif field == "tags":
+            if value:
+                rows.append(("Tags", "\n".join(references.tag_names(value))))
+            else:
+                rows.append(("Tags", highlight_none(str(None))))
+
+            rows.append(("Details", f"{appconfig.current.host}{GUI_PATH['documents_details'].format(pk=document['id'])}"))
+
+        elif field == "custom_fields":
+            rows.append(("[white]Custom fields", ""))
+            if value:
+                for custom_field in value:
+                    rows.append((escape(references.custom_field_name(custom_field["field"])), highlight_none(str(custom_field["value"]))))
+            else:
+                rows.append((highlight_none(str(None)).markup, ""))
+
+        else:
+            # Any other field is shown as is
+            rows.append((field.replace("_", " ").capitalize(), highlight_none(str(value))))
+
+    for expansion, data in details.items():
+        rows.extend(expansion_rows(expansion, data, references, storage_paths))
+
+    return rows
+
 
 async def show(
-    id: int, /, *,
+    *ids: DocumentIDs,
     json: Annotated[Optional[bool], Parameter(
         negative = [],
         show_default = False
         )] = False,
+    fields: Annotated[Optional[List[str]], Parameter(
+        negative = [],
+        show_default = False,
+        converter = converters.document_fields
+        )] = None,
+    expand: Annotated[Optional[List[str]], Parameter(
+        name = ["--with"],
+        negative = [],
+        show_default = False,
+        converter = converters.document_expansions
+        )] = None,
     ) -> None:
 
-    """Show information about a document.
-    
+    """Show information about documents.
+
+    The documents, names of referenced objects and any additional details are fetched concurrently.
+    Several documents are shown one after another.
+
+    Examples
+    --------
+    pngx document show 123 --with notes,history
+
+    pngx document list --tag inbox --ids | pngx document show - --json
+
     Parameters
     ----------
-    id: int
-        The ID of the document to show information about.
+    ids: List[int]
+        The IDs of the documents to show information about. Use - to read IDs from stdin.
     json: bool
-        If given, the information is printed as JSON.
+        If given, the information is printed as JSON, one object per document.
+    fields: List[str]
+        Only request and show the given fields (comma-separated), e.g. --fields title,content.
+        Defaults to all fields shown, which are all fields except the content unless printed as JSON.
+    expand: List[str]
+        Additionally show the given details (comma-separated): notes, history, metadata and/or suggestions.
     """
 
+    if not ids:
+        raise ValueError("Specify the IDs of the documents to show (or - to read them from stdin).")
+
+    if fields is None and not json:
+        fields = SHOW_FIELDS
+
+    expand = expand or []
+    params = {"fields": ",".join(dict.fromkeys(["id", *fields]))} if fields else None
+
+    # Names are only resolved for rendering, JSON contains IDs only
+    kinds = set()
+    if not json:
+        for name in [*fields, *expand]:
+            kinds.update(FIELD_REFERENCES.get(name, []))
+
+    with_storage_paths = not json and ("storage_path" in fields or "suggestions" in expand)
+
+    async def no_storage_paths() -> Dict[int, Tuple[str, str]]:
+        return {}
+
     async with PaperlessAsyncAPI() as paperless:
-        document = await paperless.documents(id)
-        
-        # Everything except created date is optional
-        # therefore initialize possibly empty fields
-        doc_title = None
-        doc_type = None
-        correspondent = None
-        storage_path = None
-        tags = []
-        custom_fields = []
-
-        if len(document.title) > 0:
-            doc_title = document.title
-
-        if document.document_type is not None:
-            _doc_type = await paperless.document_types(document.document_type)
-            doc_type = _doc_type.name
-        
-        if document.correspondent is not None:
-            _correspondent = await paperless.correspondents(document.correspondent)
-            correspondent = _correspondent.name
-        
-        if document.storage_path is not None:
-            _storage_path = await paperless.storage_paths(document.storage_path)
-            storage_path = f"{_storage_path.name}\n({_storage_path.path})"
-
-        
-        if document.tags:
-            filters = {
-                "id__in": ",".join(map(str, document.tags))
-            }
-            async with paperless.tags.reduce(**filters) as filtered:
-                async for tag in filtered:
-                    tags.append(tag)
-
-        if document.custom_fields:
-            filters = {
-                "id__in": ",".join(map(lambda f: str(f.field), document.custom_fields))
-            }
-            async with paperless.custom_fields.reduce(**filters) as filtered:
-                async for field in filtered:
-                    custom_fields.append({
-                        "id": field.id,
-                        "name": field.name,
-                        "value": next(x.value for x in document.custom_fields if x.field == field.id),
-                        "data_type": field.data_type
-                    })
-
-    if json:
-        Console().print_json(data=document._data)
-
-    else:
-        table = Table.grid(padding=(0,3))
-
-        table.add_column(style="blue")
-        table.add_column(style="green", no_wrap=True)
-
-        # Explicitly check title as NoneHighlighter doesn't work well with additional styles
-        if doc_title is not None:
-            table.add_row("[b]Title", f"[b]{doc_title}")
-        else:
-            table.add_row("[b]Title", f"[b purple]{str(doc_title)}")
+        # Lookup tables are loaded once, concurrently with the first documents
+        lookups = asyncio.gather(
+            ReferenceTables.load(paperless, kinds),
+            fetch_storage_paths(paperless) if with_storage_paths else no_storage_paths(),
+        )
+        first = True
 
-        table.add_row("ID", str(document.id))
-        table.add_row("ASN", highlight_none(str(document.archive_serial_number)))
-        table.add_row("Created", str(document.created_date))
-        table.add_row("Correspondent", highlight_none(str(correspondent)))
-        table.add_row("Document type", highlight_none(str(doc_type)))
-        table.add_row("Storage path", highlight_none(str(storage_path)))
+        try:
+            async for chunk in id_chunks(ids, SHOW_CHUNK_SIZE):
+                documents, (references, storage_paths) = await asyncio.gather(
+                    asyncio.gather(*[fetch_document(paperless, id, params, expand) for id in chunk]),
+                    lookups,
+                )
 
-        if tags:
-            table.add_row("Tags", "\n".join([tag.name for tag in tags]))
-        else:
-            table.add_row("Tags", highlight_none(str(None)))
+                for document, details in documents:
+                    if json:
+                        output.print_json({**document, **details})
+                        continue
 
-        table.add_row("Details", f"{appconfig.current.host}{GUI_PATH['documents_details'].format(pk=document.id)}")
+                    if not first:
+                        print()
+                    first = False
 
-        table.add_row("[white]Custom fields")
-        if custom_fields:
-            for custom_field in custom_fields:
-                table.add_row(custom_field["name"], highlight_none(str(custom_field["value"])))
-        else:
-            table.add_row(highlight_none(str(None)))
+                    output.print_fields(document_rows(document, details, fields, references, storage_paths))
 
-        Console().print(table)
+        finally:
+            if not lookups.done():
+                lookups.cancel()
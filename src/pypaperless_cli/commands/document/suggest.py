@@ -0,0 +1,169 @@
+"""Method for applying the server's suggestions to documents."""
+
+import asyncio
+from typing import Annotated, Any, Dict, List, Optional
+
+from cyclopts import Parameter
+from rich.console import Console
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import API_PATH, SUGGESTION_FIELDS
+from pypaperless_cli.utils import converters, output
+from pypaperless_cli.utils.bulk import DocumentChanges
+from pypaperless_cli.utils.errors import describe
+from pypaperless_cli.utils.output import OutputFormat
+from pypaperless_cli.utils.pages import stream_documents
+from pypaperless_cli.utils.references import ReferenceTables, describe_changes
+from pypaperless_cli.utils.types import DocumentIDs
+
+# Only these fields are transferred for each document
+SUGGEST_FIELDS = "id,title,tags,correspondent,document_type,storage_path"
+
+
+def suggested_changes(document: dict, suggestions: Dict[str, List[int]], fields: List[str], overwrite: bool) -> Dict[str, Any]:
+    """Turn suggestions into changes of the given fields.
+
+    Suggested tags are added. Correspondents, document types and storage paths are set to the first
+    suggestion, but only if none is assigned yet unless `overwrite` is set.
+    """
+
+    changes: Dict[str, Any] = {}
+
+    for field in fields:
+        suggested = suggestions.get(SUGGESTION_FIELDS[field]) or []
+
+        if field == "tags":
+            if suggested:
+                changes["add_tags"] = suggested
+        elif suggested and (overwrite or document.get(field) is None):
+            changes[field] = suggested[0]
+
+    return changes
+
+
+async def suggest(
+    *ids: DocumentIDs,
+    filters: Annotated[Optional[List[str]], Parameter(
+        name = ["--filter"],
+        negative = [],
+        converter = converters.query_filters
+        )] = None,
+    all_documents: Annotated[bool, Parameter(name = ["--all"], negative = [])] = False,
+    apply: Annotated[Optional[List[str]], Parameter(
+        negative = [],
+        show_default = False,
+        converter = converters.suggestion_fields
+        )] = None,
+    overwrite: Annotated[bool, Parameter(negative = [])] = False,
+    dry_run: Annotated[bool, Parameter(negative = [])] = False,
+    concurrency: int = 8,
+    page_size: int = 100,
+    format: OutputFormat = "table",
+    ) -> None:
+
+    """Fetch the server's suggestions for many documents and optionally apply them.
+
+    Suggestions are fetched concurrently. Applied suggestions are aggregated, so documents
+    receiving identical changes are updated by a single bulk edit.
+
+    Examples
+    --------
+    pngx document suggest --filter tags__id__all=1 --apply tags,correspondent,document_type --dry-run
+
+    Parameters
+    ----------
+    ids: int
+        IDs of the documents. If omitted, all documents matching the given filters are processed. Use - to read IDs from stdin.
+    filters: List[str]
+        Only process documents matching the given API filter (e.g. --filter tags__id__all=1).
+    all_documents: bool
+        Process all documents, if neither IDs nor filters are given.
+    apply: List[str]
+        Apply suggestions of the given fields (comma-separated): tags, correspondent, document_type and/or storage_path.
+        If omitted, suggestions are only listed.
+    overwrite: bool
+        Replace correspondents, document types and storage paths already assigned. By default, only missing ones are set.
+    dry_run: bool
+        Only report the changes that would be applied.
+    concurrency: int
+        Maximum number of simultaneous requests.
+    page_size: int
+        Number of documents requested at once.
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format of listed suggestions.
+    """
+
+    if not ids and not filters and not all_documents:
+        raise ValueError("Specify document IDs and/or filters, or --all to process all documents.")
+
+    params = {**(filters or {}), "fields": SUGGEST_FIELDS}
+    changes = DocumentChanges()
+    results: List[Dict[str, Any]] = []
+    errors: List[str] = []
+
+    async with PaperlessAsyncAPI() as paperless:
+        references = await ReferenceTables.load(paperless)
+
+        async def process(document: dict) -> None:
+            suggestions = await paperless.request_json("get", API_PATH["documents_suggestions"].format(pk=document["id"]))
+
+            if apply:
+                effective = changes.add(document, suggested_changes(document, suggestions, apply, overwrite))
+                if effective:
+                    results.append({"id": document["id"], "title": document["title"], "changes": describe_changes(effective, references)})
+            else:
+                results.append({
+                    "id": document["id"],
+                    "title": document["title"],
+                    **{
+                        field: [getattr(references, kind).get(id, id) for id in suggestions.get(kind) or []]
+                        for field, kind in SUGGESTION_FIELDS.items()
+                    },
+                    "dates": suggestions.get("dates") or [],
+                })
+
+        # Documents are fetched page by page while a pool of workers requests their suggestions
+        queue: asyncio.Queue = asyncio.Queue(concurrency * 2)
+
+        async def worker() -> None:
+            while (document := await queue.get()) is not None:
+                # Failures are recorded per document, a stopped worker would leave the queue undrained
+                try:
+                    await process(document)
+                except Exception as e:
+                    errors.append(f"Document {document['id']}: {describe(e)}")
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+
+        try:
+            async for documents in stream_documents(paperless, params, list(ids) or None, page_size=page_size):
+                for document in documents:
+                    await queue.put(document)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+        if apply and not dry_run and changes:
+            await changes.apply(paperless, concurrency=concurrency)
+
+    results.sort(key=lambda r: r["id"])
+
+    if not apply:
+        with output.writer(format, ["id", "title", *SUGGESTION_FIELDS, "dates"]) as out:
+            out.write(results)
+    else:
+        if dry_run and results:
+            with output.writer("table", ["id", "title", "changes"]) as out:
+                out.write(results)
+
+        verb = "Would update" if dry_run else "Updated"
+        Console().print(
+            f"{verb} {len(changes)} document(s) "
+            f"using {len(changes.operations())} bulk edit(s) and {len(changes.patches)} single update(s)."
+        )
+
+    if errors:
+        for error in errors:
+            Console(stderr=True).print(error)
+        raise ValueError(f"Suggestions of {len(errors)} document(s) couldn't be fetched.")
@@ -0,0 +1,78 @@
+"""
+Commands to list and resume long-running jobs.
+"""
+
+from cyclopts import App
+
+from pypaperless_cli.utils import jobs as journals, output
+from pypaperless_cli.utils.output import OutputFormat
+
+#
+# Jobs
+#
+
+jobs = App(name="jobs", help="List and resume long-running jobs.", version_flags=[])
+jobs["--help"].group = "Help"
+
+COLUMNS = ["id", "command", "status", "done", "total", "throughput", "started", "updated"]
+
+
+@jobs.command
+def list(format: OutputFormat = "table") -> None:
+    """List jobs of the current account with their progress.
+
+    Bulk commands (e.g. `document edit`, `document apply` or `document content` of many documents)
+    are journaled as jobs. The throughput is given in items per second of running time.
+
+    Parameters
+    ----------
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format.
+    """
+
+    with output.writer(format, COLUMNS) as out:
+        out.write([journal.summary() for journal in journals.list_journals()])
+
+
+@jobs.command
+def resume(id: str, /) -> None:
+    """Resume a job, skipping items it already completed.
+
+    The job's command is run again as it was given. Jobs reading document IDs from stdin
+    need the same input to be piped again.
+
+    Examples
+    --------
+    pngx jobs resume 3f2a9c1e
+
+    Parameters
+    ----------
+    id: str
+        ID of the job, as shown by `pngx jobs list`.
+    """
+
+    # Avoid a circular import, the app imports all commands
+    from pypaperless_cli.app import app
+
+    journal = journals.Journal.load(id)
+    if not journal.command:
+        raise ValueError(f"Job \"{id}\" has no command to resume.")
+    if journal.summary()["status"] == "finished":
+        raise ValueError(f"Job \"{id}\" is already finished.")
+
+    journals.settings["resume"] = journal.id
+    app([*journal.command])
+
+
+@jobs.command
+def remove(*ids: str) -> None:
+    """Remove jobs' journals.
+
+    Parameters
+    ----------
+    ids: str
+        IDs of the jobs.
+    """
+
+    for id in ids:
+        journals.remove(id)
@@ -0,0 +1,349 @@
+"""
+Command to receive webhooks of Paperless-ngx workflows.
+"""
+
+import asyncio
+import hmac
+import re
+import sys
+from typing import Annotated, Any, Dict, List, Optional
+
+from aiohttp import web
+from cyclopts import Parameter
+from cyclopts.types import ExistingFile
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.rules import DOCUMENT_FIELDS, RuleSet, match_fields, resolve_actions
+from pypaperless_cli.utils import converters, validators
+from pypaperless_cli.utils.bulk import DocumentChanges
+from pypaperless_cli.utils.errors import describe
+from pypaperless_cli.utils.output import dumps
+from pypaperless_cli.utils.pages import stream_pages
+from pypaperless_cli.utils.references import ReferenceTables
+
+# Keys of webhook parameters holding the ID of the document
+ID_KEYS = ("id", "doc_id", "document_id")
+
+# Document URLs (e.g. the `doc_url` placeholder of workflows) contain the document's ID
+DOCUMENT_URL = re.compile(r"/documents/(\d+)")
+
+
+def document_id(data: Dict[str, Any]) -> Optional[int]:
+    """Find the ID of the document in the parameters (query, form or JSON body) of a webhook."""
+
+    for key in ID_KEYS:
+        value = data.get(key)
+        if isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit()):
+            return int(value)
+
+    for value in data.values():
+        if isinstance(value, str) and (match := DOCUMENT_URL.search(value)):
+            return int(match.group(1))
+
+    return None
+
+
+class Listener:
+    """Receive webhooks and apply actions to their documents.
+
+    Webhooks are queued (up to a limit, beyond which they're rejected) and answered right away.
+    Documents of webhooks arriving within a short window are collected into batches, so a burst
+    (e.g. a whole scanner batch being consumed) is handled by a few requests and bulk edits.
+    Batches are processed by a pool of workers sharing a single session.
+    """
+
+    def __init__(
+            self,
+            paperless: PaperlessAsyncAPI,
+            actions: Dict[str, Any],
+            ruleset: Optional[RuleSet],
+            references: ReferenceTables,
+            secret: Optional[str] = None,
+            queue_size: int = 1000,
+            batch_size: int = 100,
+            batch_window: float = 2.0,
+            concurrency: int = 8,
+            dry_run: bool = False,
+        ) -> None:
+        """Set up a listener applying the given changes and/or rules."""
+
+        self.paperless = paperless
+        self.actions = actions
+        self.ruleset = ruleset
+        self.references = references
+        self.secret = secret
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.concurrency = concurrency
+        self.dry_run = dry_run
+
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.batches: asyncio.Queue = asyncio.Queue(1)
+
+        # Resolve names once (and fail early if any doesn't exist)
+        self.rule_actions = [resolve_actions(rule, references) for rule in ruleset.rules] if ruleset else []
+        self.custom_field_names = {id: f["name"] for id, f in references.custom_fields.items()}
+
+        # Don't transfer content if it isn't matched against
+        self.fields = DOCUMENT_FIELDS
+        if ruleset is None or "content" not in ruleset.prefilters:
+            self.fields = DOCUMENT_FIELDS.replace(",content", "")
+
+
+    def authorized(self, request: web.Request) -> bool:
+        if self.secret is None:
+            return True
+
+        given = request.headers.get("Authorization", "").removeprefix("Bearer ") or request.query.get("token", "")
+
+        return hmac.compare_digest(given.encode(), self.secret.encode())
+
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Queue the document of a webhook."""
+
+        if not self.authorized(request):
+            return web.json_response({"detail": "Invalid secret."}, status=401)
+
+        data: Dict[str, Any] = dict(request.query)
+        try:
+            if request.content_type == "application/json":
+                body = await request.json()
+                if isinstance(body, dict):
+                    data.update(body)
+            else:
+                data.update(await request.post())
+        except ValueError:
+            return web.json_response({"detail": "Invalid body."}, status=400)
+
+        id = document_id(data)
+        if id is None:
+            return web.json_response({"detail": "No document ID found."}, status=400)
+
+        try:
+            self.queue.put_nowait(id)
+        except asyncio.QueueFull:
+            # Rather than holding the connection, let the sender know it's too much at the moment
+            return web.json_response({"detail": "Too many pending documents."}, status=503, headers={"Retry-After": "10"})
+
+        return web.json_response({"id": id, "queued": self.queue.qsize()}, status=202)
+
+
+    async def batch(self) -> None:
+        """Collect queued documents into batches.
+
+        A batch is complete when it's full or `batch_window` seconds after its first document arrived.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            ids = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+
+            while len(ids) < self.batch_size and (remaining := deadline - loop.time()) > 0:
+                try:
+                    ids.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Workflows might call the same webhook more than once per document
+            await self.batches.put(list(dict.fromkeys(ids)))
+
+
+    async def work(self) -> None:
+        while True:
+            ids = await self.batches.get()
+
+            # Whatever goes wrong with a batch, the listener keeps serving
+            try:
+                await self.process(ids)
+            except Exception as e:
+                print(f"Processing document(s) {', '.join(map(str, ids))} failed: {describe(e)}", file=sys.stderr)
+
+
+    async def process(self, ids: List[int]) -> None:
+        """Apply actions to a batch of documents."""
+
+        changes = DocumentChanges()
+        events = []
+        found = set()
+
+        params = {"id__in": ids, "fields": self.fields}
+        async for documents in stream_pages(self.paperless, API_PATH["documents"], params, page_size=self.batch_size):
+            for document in documents:
+                found.add(document["id"])
+
+                matched = []
+                if self.ruleset is not None:
+                    matched = self.ruleset.evaluate(match_fields(document, self.custom_field_names))
+
+                effective: Dict[str, Any] = {}
+                for actions in [self.actions, *(self.rule_actions[i] for i in matched)]:
+                    for k, v in changes.add(document, actions).items():
+                        if isinstance(v, dict):
+                            effective.setdefault(k, {}).update(v)
+                        elif isinstance(v, list):
+                            effective[k] = sorted(set(effective.get(k, [])) | set(v))
+                        else:
+                            effective[k] = v
+
+                events.append({
+                    "id": document["id"],
+                    "title": document.get("title"),
+                    "rules": [self.ruleset.rules[i].name for i in matched],
+                    "changes": effective,
+                })
+
+        errors: Dict[int, str] = {}
+        if not self.dry_run and changes:
+            await changes.apply(self.paperless, self.concurrency, errors)
+
+        for event in events:
+            if event["id"] in errors:
+                event["error"] = errors[event["id"]]
+            print(dumps(event), flush=True)
+
+        for id in ids:
+            if id not in found:
+                print(f"Document {id} does not exist.", file=sys.stderr)
+
+
+    async def serve(self, bind: str, port: int, workers: int) -> None:
+        """Receive webhooks until cancelled."""
+
+        app = web.Application()
+        app.add_routes([web.post("/{path:.*}", self.handle)])
+
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+
+        try:
+            await web.TCPSite(runner, bind, port).start()
+        except OSError as e:
+            await runner.cleanup()
+            raise ValueError(f"Can't listen on {bind}:{port}: {e.strerror}")
+
+        print(f"Listening for webhooks on http://{bind}:{port}/", file=sys.stderr)
+
+        tasks = [asyncio.create_task(self.batch()), *(asyncio.create_task(self.work()) for _ in range(workers))]
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await runner.cleanup()
+            for task in tasks:
+                task.cancel()
+
+            if not self.queue.empty():
+                print(f"{self.queue.qsize()} queued document(s) weren't processed.", file=sys.stderr)
+
+
+async def listen(
+    *,
+    port: int = 9121,
+    bind: str = "127.0.0.1",
+    rules_file: Annotated[Optional[ExistingFile], Parameter(name = ["--rules"], show_default = False)] = None,
+    add_tags: Annotated[Optional[List[str|int]], Parameter(
+        name = ["--tags", "--add-tags"],
+        negative = [],
+        converter = converters.tag_name_to_id,
+        validator = validators.tag_exists
+        )] = None,
+    remove_tags: Annotated[Optional[List[str|int]], Parameter(
+        negative = [],
+        converter = converters.tag_name_to_id,
+        validator = validators.tag_exists
+        )] = None,
+    correspondent: Annotated[Optional[str|int], Parameter(converter = converters.correspondent_name_to_id)] = None,
+    document_type: Annotated[Optional[str|int], Parameter(converter = converters.document_type_name_to_id)] = None,
+    storage_path: Annotated[Optional[str|int], Parameter(converter = converters.storage_path_name_to_id)] = None,
+    secret: Annotated[Optional[str], Parameter(env_var = ["PNGX_LISTEN_SECRET"], show_default = False)] = None,
+    workers: int = 4,
+    queue_size: int = 1000,
+    batch_size: int = 100,
+    batch_window: float = 2.0,
+    concurrency: int = 8,
+    dry_run: Annotated[bool, Parameter(negative = [])] = False,
+    ) -> None:
+
+    """Receive webhooks of Paperless-ngx workflows and apply changes or rules to their documents.
+
+    Set up a workflow action of type webhook pointing to this listener, passing the document's ID or URL,
+    e.g. the parameter `doc_url` with the value `{doc_url}`. Webhooks are answered right away. Documents
+    of webhooks arriving in quick succession are batched and changed using as few bulk edits as possible.
+    Each processed document is printed as a JSON line.
+
+    Examples
+    --------
+    pngx listen --port 9121 --rules rules.toml --secret "$SECRET"
+
+    Parameters
+    ----------
+    port: int
+        Port to listen on.
+    bind: str
+        Address to listen on.
+    rules_file: Path
+        TOML file of content-matching rules (see `pngx rules apply`) to apply to each document.
+    add_tags: List[str|int]
+        Assign tags to each document. Requires the ID or the exact name of the tags.
+    remove_tags: List[str|int]
+        Unassign tags from each document. Requires the ID or the exact name of the tags.
+    correspondent: str|int
+        Set the correspondent of each document (ID or exact name).
+    document_type: str|int
+        Set the document type of each document (ID or exact name).
+    storage_path: str|int
+        Set the storage path of each document (ID or exact name).
+    secret: str
+        Only accept webhooks passing this secret, either as `Authorization: Bearer <SECRET>` header or as `token` query parameter.
+    workers: int
+        Number of batches processed simultaneously.
+    queue_size: int
+        Maximum number of documents waiting to be processed. Further webhooks are rejected until the queue drains.
+    batch_size: int
+        Maximum number of documents processed at once.
+    batch_window: float
+        Seconds to wait for further webhooks before processing a batch.
+    concurrency: int
+        Maximum number of simultaneous update requests per batch.
+    dry_run: bool
+        Only print the changes that would be applied.
+    """
+
+    actions: Dict[str, Any] = {
+        "add_tags": add_tags or [],
+        "remove_tags": remove_tags or [],
+        "correspondent": correspondent,
+        "document_type": document_type,
+        "storage_path": storage_path,
+    }
+    actions = {k: v for k, v in actions.items() if v}
+
+    if not actions and rules_file is None:
+        raise ValueError("Specify changes and/or --rules to apply to documents.")
+
+    if workers < 1 or queue_size < 1 or batch_size < 1:
+        raise ValueError("--workers, --queue-size and --batch-size must be positive.")
+
+    ruleset = RuleSet.from_file(rules_file) if rules_file else None
+
+    # A single session is shared by all workers
+    async with PaperlessAsyncAPI() as paperless:
+        references = await ReferenceTables.load(paperless)
+
+        listener = Listener(
+            paperless,
+            actions,
+            ruleset,
+            references,
+            secret = secret,
+            queue_size = queue_size,
+            batch_size = batch_size,
+            batch_window = batch_window,
+            concurrency = concurrency,
+            dry_run = dry_run,
+        )
+        await listener.serve(bind, port, workers)
@@ -0,0 +1,187 @@
+"""
+Command to export instance statistics as OpenMetrics.
+"""
+
+import asyncio
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Annotated, Dict, List, Optional, Tuple
+
+from aiohttp import ClientError, web
+from cyclopts import Parameter
+from pypaperless.exceptions import PaperlessError
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.config import config as appconfig
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils.cache import atomic_file
+from pypaperless_cli.utils.pages import stream_pages
+
+# Objects whose document counts are exported, mapped to the label of the metric
+COUNTED_OBJECTS = {
+    "tags": "tag",
+    "correspondents": "correspondent",
+    "document_types": "document_type",
+    "storage_paths": "storage_path",
+}
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# A metric family: name, help text and samples (labels and value)
+Family = Tuple[str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def escape_label(value: str) -> str:
+    """Escape a label value."""
+
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render(families: List[Family], labels: Dict[str, str]) -> str:
+    """Render metric families as OpenMetrics text, adding the given labels to each sample."""
+
+    lines = []
+
+    for name, help, samples in families:
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"# HELP {name} {help}")
+
+        for sample_labels, value in samples:
+            text = ",".join(f"{k}=\"{escape_label(str(v))}\"" for k, v in {**labels, **sample_labels}.items())
+            lines.append(f"{name}{{{text}}} {value}" if text else f"{name} {value}")
+
+    lines.append("# EOF")
+
+    return "\n".join(lines) + "\n"
+
+
+async def fetch_counts(paperless: PaperlessAsyncAPI, kind: str) -> List[Tuple[str, int]]:
+    """Fetch names and document counts of all objects of a kind."""
+
+    counts = []
+
+    async for results in stream_pages(paperless, API_PATH[kind], {"fields": "id,name,document_count"}, page_size=1000):
+        counts.extend((o["name"], o.get("document_count") or 0) for o in results)
+
+    return counts
+
+
+async def collect(paperless: PaperlessAsyncAPI) -> List[Family]:
+    """Gather statistics, tasks and document counts concurrently."""
+
+    started = time.monotonic()
+
+    statistics, tasks, *counts = await asyncio.gather(
+        paperless.request_json("get", API_PATH["statistics"]),
+        paperless.request_json("get", API_PATH["tasks"], params={"acknowledged": "false"}),
+        *[fetch_counts(paperless, kind) for kind in COUNTED_OBJECTS],
+    )
+
+    families: List[Family] = [
+        ("paperless_up", "Whether statistics could be gathered.", [({}, 1)]),
+        ("paperless_documents", "Number of documents.", [({}, statistics.get("documents_total") or 0)]),
+        ("paperless_inbox_documents", "Number of documents in the inbox.", [({}, statistics.get("documents_inbox") or 0)]),
+        ("paperless_characters", "Number of characters of all documents' content.", [({}, statistics.get("character_count") or 0)]),
+        ("paperless_mime_type_documents", "Number of documents by MIME type.", [
+            ({"mime_type": c["mime_type"]}, c["mime_type_count"]) for c in statistics.get("document_file_type_counts") or []
+        ]),
+        ("paperless_tasks", "Number of unacknowledged tasks by status.", [
+            ({"status": status}, count) for status, count in sorted(Counter(t["status"] for t in tasks).items())
+        ]),
+    ]
+
+    for (kind, label), objects in zip(COUNTED_OBJECTS.items(), counts):
+        families.append((f"paperless_{label}_documents", f"Number of documents by {label.replace('_', ' ')}.", [
+            ({label: name}, count) for name, count in objects
+        ]))
+
+    families.append(("paperless_scrape_duration_seconds", "Time it took to gather statistics.", [({}, round(time.monotonic() - started, 3))]))
+
+    return families
+
+
+async def serve(paperless: PaperlessAsyncAPI, bind: str, port: int, interval: float, labels: Dict[str, str]) -> None:
+    """Serve metrics over HTTP, refreshing them in the background.
+
+    Scrapes are answered from the most recent results, so any number of scrapes
+    doesn't cause more than one round of requests per interval.
+    """
+
+    cached = render(await collect(paperless), labels)
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(body=cached.encode(), headers={"Content-Type": OPENMETRICS_CONTENT_TYPE})
+
+    app = web.Application()
+    app.add_routes([web.get("/metrics", handle)])
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, bind, port).start()
+
+    print(f"Serving metrics on http://{bind}:{port}/metrics", file=sys.stderr)
+
+    try:
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                cached = render(await collect(paperless), labels)
+            except (ClientError, asyncio.TimeoutError, PaperlessError) as e:
+                print(f"Gathering statistics failed: {e}", file=sys.stderr)
+                cached = render([("paperless_up", "Whether statistics could be gathered.", [({}, 0)])], labels)
+
+    finally:
+        await runner.cleanup()
+
+
+async def metrics(
+    *,
+    output: Annotated[Optional[Path], Parameter(name = ["--output", "-o"], show_default = False)] = None,
+    serve_port: Annotated[Optional[int], Parameter(name = ["--serve"], show_default = False)] = None,
+    bind: str = "127.0.0.1",
+    interval: float = 60.0,
+    ) -> None:
+
+    """Export instance statistics as OpenMetrics, e.g. for Prometheus.
+
+    Statistics, unacknowledged tasks and the document counts of tags, correspondents, document types
+    and storage paths are gathered concurrently. Each sample is labelled with the instance's host.
+
+    Examples
+    --------
+    pngx metrics --output /var/lib/node_exporter/textfile/paperless.prom
+
+    Parameters
+    ----------
+    output: Path
+        Write metrics to the given file instead of printing them, e.g. for the node exporter's textfile collector. The file is replaced atomically.
+    serve_port: int
+        Serve metrics on the given port at /metrics instead of printing them once.
+    bind: str
+        Address to serve metrics on.
+    interval: float
+        Seconds between refreshes while serving. Scrapes are answered from the most recent results.
+    """
+
+    if interval <= 0:
+        raise ValueError("--interval must be positive.")
+
+    labels = {"host": appconfig.current.host}
+
+    # A single session is reused for all refreshes
+    async with PaperlessAsyncAPI() as paperless:
+        if serve_port is not None:
+            await serve(paperless, bind, serve_port, interval, labels)
+            return
+
+        text = render(await collect(paperless), labels)
+
+    if output is None:
+        sys.stdout.write(text)
+    else:
+        # Collectors must never read a partially written file
+        with atomic_file(output) as f:
+            f.write(text)
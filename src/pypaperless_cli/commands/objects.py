@@ -0,0 +1,226 @@
+"""
+Commands to manage tags, correspondents, document types and storage paths.
+"""
+
+import asyncio
+import csv
+import sys
+from pathlib import Path
+from typing import Annotated, Any, Callable, Dict, List
+
+from aiohttp import ClientError
+from cyclopts import App, Parameter
+from cyclopts.types import ExistingFile
+from pypaperless.exceptions import PaperlessError
+from pypaperless.models.common import MatchingAlgorithmType
+
+from rich.console import Console
+from tomlkit import parse
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils import output
+from pypaperless_cli.utils.converters import boolean
+from pypaperless_cli.utils.pages import stream_pages
+from pypaperless_cli.utils.references import REFERENCE_NAMES
+
+
+def matching_algorithm(value: Any) -> int:
+    """Convert a matching algorithm given by name (e.g. `regex`) or number."""
+
+    for algorithm in MatchingAlgorithmType:
+        if algorithm is not MatchingAlgorithmType.UNKNOWN and str(value).strip().lower() in (algorithm.name.lower(), str(algorithm.value)):
+            return algorithm.value
+
+    names = ", ".join(a.name.lower() for a in MatchingAlgorithmType if a is not MatchingAlgorithmType.UNKNOWN)
+    raise ValueError(f"\"{value}\" is not a matching algorithm. Must be any of {names}.")
+
+
+# Fields of objects which can be imported, mapped to their conversion
+MATCHING_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "name": str,
+    "match": str,
+    "matching_algorithm": matching_algorithm,
+    "is_insensitive": boolean,
+}
+
+OBJECT_FIELDS: Dict[str, Dict[str, Callable[[Any], Any]]] = {
+    "tags": {**MATCHING_FIELDS, "color": str, "is_inbox_tag": boolean},
+    "correspondents": MATCHING_FIELDS,
+    "document_types": MATCHING_FIELDS,
+    "storage_paths": {**MATCHING_FIELDS, "path": str},
+}
+
+
+def read_spec(path: Path, kind: str) -> List[Dict[str, Any]]:
+    """Read and validate the objects of a kind from a CSV or TOML file.
+
+    CSV files have a header row naming the fields, empty cells leave a field as it is.
+    TOML files define an array of tables named after the kind, e.g. `[[tags]]`.
+    """
+
+    fields = OBJECT_FIELDS[kind]
+
+    try:
+        if path.suffix.lower() == ".toml":
+            entries = parse(path.read_text()).unwrap().get(kind, [])
+        else:
+            with path.open(newline="") as f:
+                entries = [{k: v for k, v in row.items() if v not in (None, "")} for row in csv.DictReader(f)]
+    except OSError as e:
+        raise ValueError(f"Can't read {path}: {e.strerror}.")
+    except Exception as e:
+        raise ValueError(f"Invalid file {path}: {e}")
+
+    objects = {}
+
+    for i, entry in enumerate(entries, 1):
+        unknown = [k for k in entry if k not in fields]
+        if unknown:
+            raise ValueError(f"Unknown field(s) {', '.join(unknown)} in entry {i}. Must be any of {', '.join(fields)}.")
+
+        if not str(entry.get("name", "")).strip():
+            raise ValueError(f"Entry {i} has no name.")
+
+        try:
+            spec = {k: fields[k](v) for k, v in entry.items()}
+        except ValueError as e:
+            raise ValueError(f"Invalid entry {i}: {e}")
+
+        key = spec["name"].casefold()
+        if key in objects:
+            raise ValueError(f"{REFERENCE_NAMES[kind]} \"{spec['name']}\" is defined more than once.")
+
+        objects[key] = spec
+
+    return list(objects.values())
+
+
+def plan(spec: List[Dict[str, Any]], existing: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Compare desired objects with existing ones, returning the required creates and updates.
+
+    Objects are matched by their (case-insensitive) name. Each change is a dictionary with
+    the `action` (`create` or `update`), the object's `name`, its `id` (if it exists) and the changed `fields`.
+    """
+
+    by_name = {o["name"].casefold(): o for o in existing}
+    changes = []
+
+    for desired in spec:
+        current = by_name.get(desired["name"].casefold())
+
+        if current is None:
+            changes.append({"action": "create", "name": desired["name"], "id": None, "fields": desired})
+            continue
+
+        fields = {k: v for k, v in desired.items() if current.get(k) != v}
+        if fields:
+            changes.append({"action": "update", "name": current["name"], "id": current["id"], "fields": fields, "previous": current})
+
+    return changes
+
+
+def describe(change: Dict[str, Any]) -> List[str]:
+    """Describe the changed fields of a planned change."""
+
+    if change["action"] == "create":
+        return [f"{k}={v}" for k, v in change["fields"].items() if k != "name"]
+
+    return [f"{k}: {change['previous'].get(k)} → {v}" for k, v in change["fields"].items()]
+
+
+async def apply(paperless: PaperlessAsyncAPI, kind: str, changes: List[Dict[str, Any]], concurrency: int) -> List[str]:
+    """Send all changes using at most `concurrency` simultaneous requests. Returns errors of failed changes."""
+
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = []
+
+    async def send(change: Dict[str, Any]) -> None:
+        async with semaphore:
+            try:
+                if change["action"] == "create":
+                    await paperless.request_json("post", API_PATH[kind], json=change["fields"])
+                else:
+                    await paperless.request_json("patch", API_PATH[f"{kind}_single"].format(pk=change["id"]), json=change["fields"])
+            except (ClientError, PaperlessError) as e:
+                errors.append(f"Failed to {change['action']} \"{change['name']}\": {e}")
+
+    await asyncio.gather(*[send(change) for change in changes])
+
+    return errors
+
+
+def object_app(kind: str, name: str) -> App:
+    """Create the command group of a kind of objects."""
+
+    label = REFERENCE_NAMES[kind].lower()
+    plural = kind.replace("_", " ")
+
+    app = App(name=name, help=f"Manage {plural}.", version_flags=[])
+    app["--help"].group = "Help"
+
+    async def import_objects(
+        file: ExistingFile,
+        /, *,
+        dry_run: Annotated[bool, Parameter(negative = [])] = False,
+        concurrency: int = 8,
+        ) -> None:
+
+        spec = read_spec(file, kind)
+        existing = []
+
+        async with PaperlessAsyncAPI() as paperless:
+            # Fetched once, all comparisons are done locally
+            async for results in stream_pages(paperless, API_PATH[kind], page_size=1000):
+                existing.extend(results)
+
+            changes = plan(spec, existing)
+
+            if dry_run:
+                if changes:
+                    with output.writer("table", ["action", "name", "changes"]) as out:
+                        out.write({**change, "changes": describe(change)} for change in changes)
+                errors = []
+            else:
+                errors = await apply(paperless, kind, changes, concurrency)
+
+        for error in errors:
+            print(error, file=sys.stderr)
+
+        created = sum(1 for c in changes if c["action"] == "create")
+        updated = len(changes) - created
+        verb = ("Would create", "update") if dry_run else ("Created", "updated")
+        Console().print(f"{verb[0]} {created} and {verb[1]} {updated} {plural}, {len(spec) - len(changes)} unchanged.")
+
+        if errors:
+            raise ValueError(f"{len(errors)} of {len(changes)} change(s) failed.")
+
+    import_objects.__doc__ = f"""Create or update {plural} from a CSV or TOML file.
+
+    The file is compared with existing {plural} by name. Only missing {plural} are created
+    and only changed fields are updated, using concurrent requests.
+
+    Examples
+    --------
+    pngx {name} import {kind}.csv --dry-run
+
+    Parameters
+    ----------
+    file: Path
+        CSV file with a header row naming the fields, or TOML file with an array of tables named {kind}.
+        Fields are: {", ".join(OBJECT_FIELDS[kind])}. Each {label} requires a name.
+    dry_run: bool
+        Only show the planned changes without applying them.
+    concurrency: int
+        Maximum number of simultaneous requests.
+    """
+
+    app.command(import_objects, name="import")
+
+    return app
+
+
+tag = object_app("tags", "tag")
+correspondent = object_app("correspondents", "correspondent")
+document_type = object_app("document_types", "document-type")
+storage_path = object_app("storage_paths", "storage-path")
@@ -0,0 +1,398 @@
+"""
+Command to replicate documents from one Paperless-ngx instance to another.
+"""
+
+import asyncio
+import re
+import sys
+import time
+from collections import Counter
+from typing import Annotated, Any, Dict, List, Optional
+
+from cyclopts import Parameter
+from cyclopts.types import Path
+from rich.console import Console
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.commands.objects import OBJECT_FIELDS
+from pypaperless_cli.config import config as appconfig
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils.cache import account_dirname, read_json, state_dir, write_json
+from pypaperless_cli.utils.errors import describe
+from pypaperless_cli.utils.pages import stream_pages
+from pypaperless_cli.utils.references import REFERENCE_NAMES
+
+# Fields of objects copied along with their name
+COPIED_FIELDS = {
+    **{kind: [f for f in fields if f != "name"] for kind, fields in OBJECT_FIELDS.items()},
+    "custom_fields": ["data_type", "extra_data"],
+}
+
+# Fields of documents needed to replicate them
+DOCUMENT_FIELDS = "id,title,created,archive_serial_number,correspondent,document_type,storage_path,tags,custom_fields,original_file_name,notes"
+
+# Document fields referring to objects, mapped to their kind
+REFERENCE_FIELDS = {
+    "correspondent": "correspondents",
+    "document_type": "document_types",
+    "storage_path": "storage_paths",
+}
+
+# Seconds between checks of consumption tasks
+POLL_INTERVAL = 1.0
+
+# Consumption failures caused by a document existing already, revealing the existing document's ID
+DUPLICATE = re.compile(r"duplicate of .*\(#(\d+)\)", re.IGNORECASE)
+
+
+class Replication:
+    """Copy objects and documents from a source to a target instance.
+
+    Objects are matched by name and created on the target if missing. Documents are streamed
+    through a pipeline: their original files are downloaded and uploaded concurrently, with at most
+    `buffer` files held in memory. Uploaded files are consumed asynchronously by the target, thus
+    at most `pending` consumption tasks are awaited at a time. Once consumed, metadata (which the
+    target's matching might have changed) is set again, custom field values and notes are copied.
+
+    Progress is persisted (replicated documents, awaited tasks), so interrupted runs resume where they stopped.
+    """
+
+    def __init__(self, source: PaperlessAsyncAPI, target: PaperlessAsyncAPI, state_file: Path) -> None:
+        """Set up a replication, loading the progress of previous runs."""
+
+        self.source = source
+        self.target = target
+        self.state_file = state_file
+
+        state = read_json(state_file, {})
+        # Source document IDs (as strings, like JSON keys) mapped to target document IDs
+        self.documents: Dict[str, int] = state.get("documents", {})
+        # Consumption tasks awaited, mapped to source document IDs
+        self.tasks: Dict[str, int] = state.get("tasks", {})
+
+        self.maps: Dict[str, Dict[int, int]] = {}
+        self.metadata: Dict[int, dict] = {}
+        self.stats: Counter = Counter()
+        self.errors: Dict[int, str] = {}
+        # Objects which couldn't be created, as "Kind name", mapped to the error
+        self.object_errors: Dict[str, str] = {}
+        self.saved = time.monotonic()
+
+
+    def save(self, force: bool = False) -> None:
+        """Persist the progress, at most every few seconds unless forced."""
+
+        if force or time.monotonic() - self.saved > POLL_INTERVAL:
+            write_json(self.state_file, {"documents": self.documents, "tasks": self.tasks})
+            self.saved = time.monotonic()
+
+
+    async def map_objects(self, kind: str, dry_run: bool, concurrency: int) -> int:
+        """Map objects of a kind by name, creating missing ones on the target. Returns the number of objects (to be) created.
+
+        At most `concurrency` objects are created at a time. Objects which couldn't be created are recorded
+        in `object_errors` and left unmapped, all others are mapped nonetheless.
+        """
+
+        async def fetch(paperless: PaperlessAsyncAPI) -> List[dict]:
+            return [o async for page in stream_pages(paperless, API_PATH[kind], page_size=1000) for o in page]
+
+        source, target = await asyncio.gather(fetch(self.source), fetch(self.target))
+        existing = {o["name"].casefold(): o["id"] for o in target}
+        mapping = {}
+        missing = []
+
+        for obj in source:
+            if obj["name"].casefold() in existing:
+                mapping[obj["id"]] = existing[obj["name"].casefold()]
+            else:
+                missing.append(obj)
+
+        if not dry_run:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def create(obj: dict) -> None:
+                data = {"name": obj["name"], **{f: obj[f] for f in COPIED_FIELDS[kind] if f in obj}}
+                try:
+                    async with semaphore:
+                        created = await self.target.request_json("post", API_PATH[kind], json=data)
+                except Exception as e:
+                    self.object_errors[f"{REFERENCE_NAMES[kind]} {obj['name']}"] = describe(e)
+                    return
+
+                mapping[obj["id"]] = created["id"]
+
+            await asyncio.gather(*[create(obj) for obj in missing])
+
+        self.maps[kind] = mapping
+
+        return len(missing)
+
+
+    def map_document(self, document: dict) -> Dict[str, Any]:
+        """Return a document's metadata with references mapped to the target's objects."""
+
+        data = {
+            "title": document["title"],
+            "created": document["created"],
+            "archive_serial_number": document.get("archive_serial_number"),
+            "tags": [self.maps["tags"][t] for t in document.get("tags") or [] if t in self.maps["tags"]],
+        }
+
+        for field, kind in REFERENCE_FIELDS.items():
+            data[field] = self.maps[kind].get(document.get(field))
+
+        return data
+
+
+    async def upload(self, document: dict, content: bytes) -> str:
+        """Upload a downloaded document. Returns the ID of its consumption task."""
+
+        form = {
+            **{k: v for k, v in self.map_document(document).items() if v is not None},
+            "document": (content, document.get("original_file_name") or f"{document['id']}.pdf"),
+            "custom_fields": [self.maps["custom_fields"][f["field"]] for f in document.get("custom_fields") or []],
+        }
+        task_id = str(await self.target.request_json("post", API_PATH["documents_post"], form=form))
+
+        self.tasks[task_id] = document["id"]
+        self.stats["uploaded"] += 1
+        self.stats["bytes"] += len(content)
+        self.save()
+
+        return task_id
+
+
+    async def complete(self, source_id: int, target_id: int) -> None:
+        """Set the metadata of a consumed document and copy its custom field values and notes."""
+
+        document = self.metadata.pop(source_id, None)
+        if document is None:
+            document = await self.source.request_json("get", API_PATH["documents_single"].format(pk=source_id), params={"fields": DOCUMENT_FIELDS})
+
+        data = self.map_document(document)
+        data["custom_fields"] = [
+            {"field": self.maps["custom_fields"][f["field"]], "value": f["value"]}
+            for f in document.get("custom_fields") or [] if f["field"] in self.maps["custom_fields"]
+        ]
+        await self.target.request_json("patch", API_PATH["documents_single"].format(pk=target_id), json=data)
+
+        if document.get("notes"):
+            notes = await self.source.request_json("get", API_PATH["documents_notes"].format(pk=source_id))
+            for note in sorted(notes, key=lambda n: n["created"]):
+                await self.target.request_json("post", API_PATH["documents_notes"].format(pk=target_id), json={"note": note["note"]})
+
+
+    async def check(self, task_id: str) -> bool:
+        """Check a consumption task. Returns whether it's done."""
+
+        source_id = self.tasks[task_id]
+        tasks = await self.target.request_json("get", API_PATH["tasks"], params={"task_id": task_id})
+        task = tasks[0] if tasks else None
+
+        if task is None or task["status"] not in ("SUCCESS", "FAILURE"):
+            return False
+
+        if task["status"] == "SUCCESS":
+            target_id = int(task["related_document"])
+        elif match := DUPLICATE.search(task.get("result") or ""):
+            # Most likely replicated by an interrupted run already
+            target_id = int(match.group(1))
+            self.stats["duplicates"] += 1
+        else:
+            self.errors[source_id] = f"Consumption failed: {task.get('result')}"
+            del self.tasks[task_id]
+            return True
+
+        await self.complete(source_id, target_id)
+
+        self.documents[str(source_id)] = target_id
+        del self.tasks[task_id]
+        self.stats["documents"] += 1
+        self.save()
+
+        return True
+
+
+    async def run(self, concurrency: int, buffer: int, pending: int, page_size: int) -> None:
+        """Replicate all documents not replicated yet."""
+
+        downloads: asyncio.Queue = asyncio.Queue(buffer)
+        uploads: asyncio.Queue = asyncio.Queue(buffer)
+        uploading = True
+
+        # Uploads wait for a slot, which is freed once the consumption of the uploaded document is done.
+        # Tasks awaited since a previous run occupy slots as well.
+        slots = asyncio.Semaphore(pending)
+        holding = set()
+        for task_id in list(self.tasks)[:pending]:
+            await slots.acquire()
+            holding.add(task_id)
+
+        async def produce() -> None:
+            awaited = set(self.tasks.values())
+            params = {"ordering": "id", "fields": DOCUMENT_FIELDS}
+            async for documents in stream_pages(self.source, API_PATH["documents"], params, page_size):
+                for document in documents:
+                    if str(document["id"]) not in self.documents and document["id"] not in awaited:
+                        await downloads.put(document)
+
+        async def download() -> None:
+            while (document := await downloads.get()) is not None:
+                path = API_PATH["documents_download"].format(pk=document["id"])
+                try:
+                    async with self.source.request("get", path, params={"original": "true"}) as res:
+                        res.raise_for_status()
+                        content = await res.read()
+                except Exception as e:
+                    self.errors[document["id"]] = f"Download failed: {describe(e)}"
+                    continue
+
+                await uploads.put((document, content))
+
+        async def upload() -> None:
+            while (item := await uploads.get()) is not None:
+                document, content = item
+                await slots.acquire()
+                self.metadata[document["id"]] = document
+                try:
+                    holding.add(await self.upload(document, content))
+                except Exception as e:
+                    self.metadata.pop(document["id"], None)
+                    self.errors[document["id"]] = f"Upload failed: {describe(e)}"
+                    slots.release()
+
+        async def check(task_id: str) -> None:
+            try:
+                done = await self.check(task_id)
+            except Exception as e:
+                # E.g. an unexpected task result, which must not stop tracking the other tasks
+                if task_id in self.tasks:
+                    self.errors[self.tasks.pop(task_id)] = f"Completion failed: {describe(e)}"
+                done = True
+
+            if done and task_id in holding:
+                holding.remove(task_id)
+                slots.release()
+
+        async def track() -> None:
+            while uploading or self.tasks:
+                await asyncio.sleep(POLL_INTERVAL)
+                await asyncio.gather(*[check(task_id) for task_id in list(self.tasks)])
+                self.save(force=True)
+
+        # Should any part of the pipeline fail, the others are cancelled rather than waiting forever
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(track())
+                downloaders = [group.create_task(download()) for _ in range(concurrency)]
+                uploaders = [group.create_task(upload()) for _ in range(concurrency)]
+
+                await produce()
+                for _ in downloaders:
+                    await downloads.put(None)
+                await asyncio.gather(*downloaders)
+                for _ in uploaders:
+                    await uploads.put(None)
+                await asyncio.gather(*uploaders)
+
+                uploading = False
+        except ExceptionGroup as e:
+            # Failures of single documents are recorded, so this is a failure of the whole run (e.g. a lost connection)
+            raise e.exceptions[0] from None
+        finally:
+            self.save(force=True)
+
+
+async def replicate(
+    *,
+    source: Annotated[str, Parameter(name = ["--from"])],
+    target: Annotated[str, Parameter(name = ["--to"])],
+    concurrency: int = 4,
+    buffer: int = 8,
+    pending: int = 16,
+    page_size: int = 100,
+    state_file: Annotated[Optional[Path], Parameter(show_default = False)] = None,
+    dry_run: Annotated[bool, Parameter(negative = [])] = False,
+    ) -> None:
+
+    """Replicate objects and documents from one instance to another, e.g. to consolidate instances.
+
+    Tags, correspondents, document types, storage paths and custom fields are matched by name and created
+    if missing. Documents are streamed through a concurrent download and upload pipeline, their consumption
+    by the target is tracked and their metadata, custom field values and notes are set once consumed.
+    Progress is persisted, so an interrupted replication is resumed by running it again.
+    Permissions and the history of documents aren't replicated.
+
+    Examples
+    --------
+    pngx replicate --from old --to new --concurrency 8
+
+    Parameters
+    ----------
+    source: str
+        Alias of the account to replicate from.
+    target: str
+        Alias of the account to replicate to.
+    concurrency: int
+        Number of simultaneous downloads and, separately, uploads. Also limits the objects created at a time.
+    buffer: int
+        Maximum number of downloaded files held in memory until they're uploaded.
+    pending: int
+        Maximum number of uploaded documents being consumed by the target at a time.
+    page_size: int
+        Number of documents requested at once.
+    state_file: Path
+        File to persist progress in. Defaults to a file in the state directory of the target account.
+    dry_run: bool
+        Only report which objects would be created and how many documents would be replicated.
+    """
+
+    if min(concurrency, buffer, pending, page_size) < 1:
+        raise ValueError("--concurrency, --buffer, --pending and --page-size must be positive.")
+
+    source_account = appconfig.get_account(source)
+    target_account = appconfig.get_account(target)
+
+    if (source_account.host, source_account.user) == (target_account.host, target_account.user):
+        raise ValueError("Source and target must be different accounts.")
+
+    if state_file is None:
+        state_file = state_dir(target_account).joinpath(f"replicate-{account_dirname(source_account.user, source_account.host)}.json")
+
+    console = Console(stderr=True)
+
+    async with PaperlessAsyncAPI(source_account) as source_api, PaperlessAsyncAPI(target_account) as target_api:
+        replication = Replication(source_api, target_api, state_file)
+
+        created = await asyncio.gather(*[replication.map_objects(kind, dry_run, concurrency) for kind in REFERENCE_NAMES])
+        for kind, count in zip(REFERENCE_NAMES, created):
+            if count:
+                console.print(f"{REFERENCE_NAMES[kind]}s {'to be ' if dry_run else ''}created: {count}")
+
+        if replication.object_errors:
+            # Documents would lose their references to these objects
+            for name, error in sorted(replication.object_errors.items()):
+                print(f"{name}: {error}", file=sys.stderr)
+            raise ValueError(f"{len(replication.object_errors)} object(s) couldn't be created, thus no documents were replicated. Run again to retry.")
+
+        if dry_run:
+            page = await source_api.request_json("get", API_PATH["documents"], params={"page_size": 1, "fields": "id"})
+            remaining = [id for id in page["all"] if str(id) not in replication.documents]
+            console.print(f"Documents to be replicated: {len(remaining)} (of {len(page['all'])}).")
+            return
+
+        try:
+            await replication.run(concurrency, buffer, pending, page_size)
+        finally:
+            for id, error in sorted(replication.errors.items()):
+                print(f"Document {id}: {error}", file=sys.stderr)
+
+            stats = replication.stats
+            console.print(
+                f"Replicated {stats['documents']} document(s), uploading {stats['uploaded']} file(s) "
+                f"({stats['bytes'] / 1024 / 1024:.1f} MiB). {len(replication.documents)} document(s) replicated in total."
+            )
+
+    if replication.errors:
+        raise ValueError(f"{len(replication.errors)} document(s) couldn't be replicated and will be retried next time.")
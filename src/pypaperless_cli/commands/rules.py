@@ -0,0 +1,157 @@
+"""
+Command to apply content-matching rules.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Annotated, Any, Dict, List, Optional
+
+from cyclopts import App, Parameter
+from cyclopts.types import ExistingFile
+
+from rich.console import Console
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.rules import (
+    DOCUMENT_FIELDS,
+    RuleSet,
+    evaluate_batch,
+    init_worker,
+    match_fields,
+    resolve_actions
+)
+from pypaperless_cli.utils import converters, output
+from pypaperless_cli.utils.bulk import DocumentChanges
+from pypaperless_cli.utils.pages import stream_documents
+from pypaperless_cli.utils.references import ReferenceTables, describe_changes
+from pypaperless_cli.utils.types import DocumentIDs
+
+#
+# Rules
+#
+
+rules = App(name="rules", help="Apply content-matching rules to documents.", version_flags=[])
+rules["--help"].group = "Help"
+
+
+@rules.command
+async def apply(
+    rules_file: ExistingFile,
+    /,
+    *ids: DocumentIDs,
+    filters: Annotated[Optional[List[str]], Parameter(
+        name = ["--filter"],
+        negative = [],
+        converter = converters.query_filters
+        )] = None,
+    dry_run: Annotated[bool, Parameter(negative = [])] = False,
+    workers: Optional[int] = None,
+    page_size: int = 100,
+    concurrency: int = 8,
+    ) -> None:
+
+    """Apply content-matching rules to documents.
+
+    Documents are streamed page by page and evaluated in a pool of worker processes.
+    Resulting changes are grouped into as few bulk edit requests as possible.
+
+    Examples
+    --------
+    pngx rules apply rules.toml --filter tags__id__all=1 --dry-run
+
+    Parameters
+    ----------
+    rules_file: Path
+        TOML file defining the rules.
+    ids: int
+        IDs of the documents to apply rules to. If omitted, rules are applied to all documents matching the given filters. Use - to read IDs from stdin.
+    filters: List[str]
+        Only apply rules to documents matching the given API filter (e.g. --filter tags__id__all=1).
+    dry_run: bool
+        Only report matches and resulting changes without updating any document.
+    workers: int
+        Number of worker processes evaluating rules. Defaults to the number of CPUs. Use 0 to evaluate rules in-process.
+    page_size: int
+        Number of documents requested (and evaluated) at once.
+    concurrency: int
+        Maximum number of simultaneous update requests.
+    """
+
+    ruleset = RuleSet.from_file(rules_file)
+
+    # Don't transfer content if it isn't matched against
+    fields = DOCUMENT_FIELDS if "content" in ruleset.prefilters else DOCUMENT_FIELDS.replace(",content", "")
+    params = {**(filters or {}), "fields": fields}
+
+    workers = os.cpu_count() if workers is None else workers
+
+    changes = DocumentChanges()
+    matches = []
+
+    async with PaperlessAsyncAPI() as paperless:
+        references = await ReferenceTables.load(paperless)
+
+        # Resolve names once (and fail early if any doesn't exist)
+        actions = [resolve_actions(rule, references) for rule in ruleset.rules]
+        custom_field_names = {id: f["name"] for id, f in references.custom_fields.items()}
+
+        def record(documents: List[dict], results: List[List[int]]) -> None:
+            for document, matched in zip(documents, results):
+                if not matched:
+                    continue
+
+                effective: Dict[str, Any] = {}
+                for i in matched:
+                    for k, v in changes.add(document, actions[i]).items():
+                        if isinstance(v, dict):
+                            effective.setdefault(k, {}).update(v)
+                        elif isinstance(v, list):
+                            effective[k] = sorted(set(effective.get(k, [])) | set(v))
+                        else:
+                            effective[k] = v
+
+                # Don't keep the whole document (including its content) around
+                matches.append((document["id"], document.get("title"), [ruleset.rules[i].name for i in matched], effective))
+
+        stream = stream_documents(paperless, params, list(ids) or None, page_size=page_size)
+
+        if workers == 0:
+            async for documents in stream:
+                record(documents, [ruleset.evaluate(match_fields(d, custom_field_names)) for d in documents])
+
+        else:
+            loop = asyncio.get_running_loop()
+
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(ruleset.spec,)) as pool:
+                # Limit the number of batches in flight so memory usage stays bounded
+                pending: List[tuple] = []
+
+                async for documents in stream:
+                    batch = [match_fields(d, custom_field_names) for d in documents]
+                    pending.append((documents, loop.run_in_executor(pool, evaluate_batch, batch)))
+
+                    if len(pending) >= workers * 2:
+                        documents, future = pending.pop(0)
+                        record(documents, await future)
+
+                for documents, future in pending:
+                    record(documents, await future)
+
+        if not dry_run and changes:
+            await changes.apply(paperless, concurrency=concurrency)
+
+    console = Console()
+
+    if dry_run and matches:
+        with output.writer("table", ["id", "title", "rules", "changes"]) as out:
+            out.write(
+                {"id": id, "title": title, "rules": names, "changes": describe_changes(effective, references) or "None"}
+                for id, title, names, effective in matches
+            )
+
+    verb = "Would update" if dry_run else "Updated"
+    console.print(
+        f"{len(matches)} document(s) matched. {verb} {len(changes)} document(s) "
+        f"using {len(changes.operations())} bulk edit(s) and {len(changes.patches)} single update(s)."
+    )
@@ -0,0 +1,224 @@
+"""
+Commands to list and run saved views.
+"""
+
+import time
+from typing import Annotated, Dict, List, Optional, Tuple
+
+from cyclopts import App, Parameter
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import API_PATH, SAVED_VIEW_DISPLAY_FIELDS, SAVED_VIEW_FILTER_RULES
+from pypaperless_cli.utils import converters, output
+from pypaperless_cli.utils.cache import cache_dir, read_json, write_json
+from pypaperless_cli.utils.output import OutputFormat
+from pypaperless_cli.utils.pages import stream_pages
+from pypaperless_cli.utils.references import DOCUMENT_REFERENCES, ReferenceTables, document_record
+
+# Seconds for which cached saved views are used without asking the API again
+SAVED_VIEWS_CACHE_TTL = 60 * 60
+
+# Fields shown if a saved view doesn't define any display fields (as does the web interface)
+DEFAULT_DISPLAY_FIELDS = ["title", "created", "tag", "correspondent", "documenttype"]
+
+#
+# Saved views
+#
+
+view = App(name="view", help="List and run saved views.", version_flags=[])
+view["--help"].group = "Help"
+
+
+def view_params(saved_view: dict) -> Dict[str, str]:
+    """Translate a saved view's filter rules and sort order into query parameters of the documents endpoint."""
+
+    params: Dict[str, str] = {}
+
+    for rule in saved_view.get("filter_rules") or []:
+        param = SAVED_VIEW_FILTER_RULES.get(rule["rule_type"])
+        if param is None:
+            raise ValueError(f"Saved view \"{saved_view['name']}\" uses an unsupported filter rule (type {rule['rule_type']}).")
+
+        value = rule.get("value")
+
+        if value is None:
+            if param.count("__") != 1 or not param.endswith("__id"):
+                continue
+            # e.g. "no correspondent"
+            param, value = param.replace("__id", "__isnull"), "1"
+
+        # Rules of the same type are combined, e.g. multiple tags which all must be assigned
+        params[param] = f"{params[param]},{value}" if param in params else str(value)
+
+    if saved_view.get("sort_field"):
+        params["ordering"] = ("-" if saved_view.get("sort_reverse") else "") + saved_view["sort_field"]
+
+    return params
+
+
+def view_fields(saved_view: dict) -> Tuple[List[str], List[int]]:
+    """Return the document fields and the IDs of custom fields displayed by a saved view."""
+
+    fields: List[str] = ["id"]
+    custom_fields: List[int] = []
+
+    for name in saved_view.get("display_fields") or DEFAULT_DISPLAY_FIELDS:
+        if name.startswith("custom_field_") and name[13:].isdigit():
+            custom_fields.append(int(name[13:]))
+        elif name in SAVED_VIEW_DISPLAY_FIELDS:
+            fields.append(SAVED_VIEW_DISPLAY_FIELDS[name])
+
+    if custom_fields:
+        fields.append("custom_fields")
+
+    return list(dict.fromkeys(fields)), custom_fields
+
+
+async def fetch_views(paperless: PaperlessAsyncAPI) -> List[dict]:
+    """Fetch all saved views and update the cache."""
+
+    views = []
+    async for results in stream_pages(paperless, API_PATH["saved_views"], page_size=1000):
+        views.extend(results)
+
+    write_json(cache_dir().joinpath("saved_views.json"), {"updated": time.time(), "views": views})
+
+    return views
+
+
+async def find_view(paperless: PaperlessAsyncAPI, name: str, refresh: bool = False) -> dict:
+    """Return a saved view given its ID or (case-insensitive) name.
+
+    Cached saved views are used unless outdated. If the view can't be found in the cache,
+    saved views are fetched again in case it has been created in the meantime.
+    """
+
+    cached = read_json(cache_dir().joinpath("saved_views.json"), {})
+    fresh = not refresh and time.time() - cached.get("updated", 0) < SAVED_VIEWS_CACHE_TTL
+    views = cached["views"] if fresh else await fetch_views(paperless)
+
+    while True:
+        for saved_view in views:
+            if str(saved_view["id"]) == name or saved_view["name"].casefold() == name.casefold():
+                return saved_view
+
+        if not fresh:
+            raise ValueError(f"Saved view \"{name}\" does not exist.")
+
+        views, fresh = await fetch_views(paperless), False
+
+
+@view.command(name="list")
+async def list_views(
+    *,
+    format: OutputFormat = "table",
+    ) -> None:
+
+    """List saved views.
+
+    Saved views are always fetched from the API, which updates the local cache used by `pngx view run`.
+
+    Parameters
+    ----------
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format. Tables are printed as tab-separated values unless printed to a terminal.
+    """
+
+    async with PaperlessAsyncAPI() as paperless:
+        views = await fetch_views(paperless)
+
+    with output.writer(format, ["id", "name", "filters", "display_fields"]) as out:
+        for saved_view in views:
+            try:
+                filters = [f"{k}={v}" for k, v in view_params(saved_view).items()]
+            except ValueError as e:
+                filters = [str(e)]
+
+            out.write([{
+                "id": saved_view["id"],
+                "name": saved_view["name"],
+                "filters": filters,
+                "display_fields": saved_view.get("display_fields") or DEFAULT_DISPLAY_FIELDS,
+            }])
+
+
+@view.command
+async def run(
+    name: str, /, *,
+    filters: Annotated[Optional[List[str]], Parameter(
+        name = ["--filter"],
+        negative = [],
+        converter = converters.query_filters
+        )] = None,
+    limit: Annotated[Optional[int], Parameter(show_default = False)] = None,
+    format: OutputFormat = "table",
+    page_size: int = 100,
+    refresh: Annotated[bool, Parameter(negative = [])] = False,
+    ) -> None:
+
+    """List the documents of a saved view.
+
+    The view's filter rules and sort order are translated into a document query, and only the view's
+    display fields are requested. Saved views are cached, so running a view usually only queries documents.
+
+    Examples
+    --------
+    pngx view run Inbox --format ndjson
+
+    Parameters
+    ----------
+    name: str
+        ID or name of the saved view.
+    filters: List[str]
+        Additional API filters (KEY=VALUE), overriding the view's filters of the same name.
+    limit: int
+        List at most this many documents.
+    format: Literal["table", "json", "ndjson", "csv"]
+        Output format. Tables are printed as tab-separated values unless printed to a terminal.
+    page_size: int
+        Number of documents requested at once.
+    refresh: bool
+        Fetch saved views from the API even if they are cached.
+    """
+
+    if limit is not None:
+        page_size = min(page_size, limit)
+
+    # Neither the API index nor pypaperless' helpers are needed, so skip initialization
+    paperless = PaperlessAsyncAPI()
+
+    try:
+        saved_view = await find_view(paperless, name, refresh)
+        fields, custom_fields = view_fields(saved_view)
+        params = {**view_params(saved_view), **(filters or {}), "fields": ",".join(fields)}
+
+        kinds = [DOCUMENT_REFERENCES[f] for f in fields if f in DOCUMENT_REFERENCES]
+        references = await ReferenceTables.load(paperless, kinds) if kinds else ReferenceTables()
+
+        # Each custom field becomes a column of its own
+        custom_field_names = [references.custom_field_name(id) for id in custom_fields]
+        columns = [f for f in fields if f != "custom_fields"] + custom_field_names
+
+        count = 0
+
+        with output.writer(format, columns) as out:
+            async for results in stream_pages(paperless, API_PATH["documents"], params, page_size=page_size):
+                if limit is not None:
+                    results = results[:limit - count]
+
+                records = []
+                for document in results:
+                    record = document_record(document, fields, references)
+                    record.update(record.pop("custom_fields", None) or {})
+                    if "notes" in record:
+                        record["notes"] = len(record["notes"] or [])
+                    records.append(record)
+
+                out.write(records)
+
+                count += len(results)
+                if limit is not None and count >= limit:
+                    break
+
+    finally:
+        await paperless.close()
@@ -0,0 +1,235 @@
+"""
+Command to watch for document and task changes.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated, Any, Dict, List, Optional
+
+from aiohttp import ClientError
+from cyclopts import Parameter
+from pypaperless.exceptions import PaperlessError
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils import converters
+from pypaperless_cli.utils.cache import read_json, state_dir, write_json
+from pypaperless_cli.utils.output import dumps
+from pypaperless_cli.utils.pages import stream_modified
+
+# Fields of documents included in events, `content` is deliberately left out
+EVENT_FIELDS = "id,title,added,modified,tags,correspondent,document_type,storage_path"
+
+
+class Watcher:
+    """Poll for changed documents and consumption tasks, emitting an event for each change.
+
+    The state (the modification time and ID of the most recently changed document and the status of
+    pending tasks) is persisted after each page of changes, so a restarted watcher continues where it left off.
+    """
+
+    def __init__(self, paperless: PaperlessAsyncAPI, state_file: Path, filters: Dict[str, str], command: Optional[str], tasks: bool) -> None:
+        """Set up a watcher. Call `restore()` before polling."""
+
+        self.paperless = paperless
+        self.state_file = state_file
+        self.filters = filters
+        self.command = command
+        self.tasks = tasks
+
+        # Modification time and ID of the most recently changed document seen
+        self.cursor: Optional[str] = None
+        self.cursor_id: Optional[int] = None
+        self.task_states: Dict[str, str] = {}
+
+
+    async def restore(self) -> None:
+        """Load the persisted state or, on the first run, start watching from now on."""
+
+        state = read_json(self.state_file)
+
+        if state is not None:
+            self.cursor = state.get("modified")
+            self.cursor_id = state.get("id")
+            self.task_states = state.get("tasks", {})
+            return
+
+        # Use the server's timestamps rather than the local clock, they might differ
+        params = {"ordering": "-modified", "page_size": 1, "fields": "modified"}
+        page = await self.paperless.request_json("get", API_PATH["documents"], params=params)
+        if page["results"]:
+            self.cursor = page["results"][0]["modified"]
+
+        if self.tasks:
+            self.task_states = {t["task_id"]: t["status"] for t in await self.fetch_tasks()}
+
+        self.save()
+
+
+    def save(self) -> None:
+        """Persist the state."""
+
+        write_json(self.state_file, {"modified": self.cursor, "id": self.cursor_id, "tasks": self.task_states})
+
+
+    async def fetch_tasks(self) -> List[dict]:
+        """Fetch all tasks which haven't been acknowledged yet."""
+
+        return await self.paperless.request_json("get", API_PATH["tasks"], params={"acknowledged": "false"})
+
+
+    async def emit(self, event: Dict[str, Any]) -> None:
+        """Print an event as a JSON line or pass it to the configured command."""
+
+        line = dumps(event)
+
+        if self.command is None:
+            print(line, flush=True)
+            return
+
+        env = {**os.environ, "PNGX_EVENT": event["event"]}
+        if event.get("document_id") is not None:
+            env["PNGX_DOCUMENT_ID"] = str(event["document_id"])
+
+        # Events are handled one after another to preserve their order
+        process = await asyncio.create_subprocess_shell(self.command, stdin=asyncio.subprocess.PIPE, env=env)
+        await process.communicate(line.encode() + b"\n")
+
+        if process.returncode != 0:
+            print(f"Command exited with status {process.returncode} for event {line}", file=sys.stderr)
+
+
+    async def poll_documents(self) -> int:
+        """Emit events for documents added or modified since the last poll. Returns the number of events."""
+
+        params = {**self.filters, "fields": EVENT_FIELDS}
+        since = datetime.fromisoformat(self.cursor) if self.cursor else None
+        count = 0
+
+        async for results in stream_modified(self.paperless, params, (self.cursor, self.cursor_id), page_size=100):
+            for document in results:
+                added = since is None or datetime.fromisoformat(document["added"]) > since
+                await self.emit({
+                    "event": "document_added" if added else "document_modified",
+                    "document_id": document["id"],
+                    "document": document,
+                })
+                self.cursor, self.cursor_id = document["modified"], document["id"]
+                count += 1
+
+            self.save()
+
+        return count
+
+
+    async def poll_tasks(self) -> int:
+        """Emit events for tasks whose status changed since the last poll. Returns the number of events."""
+
+        tasks = await self.fetch_tasks()
+        states = {}
+        count = 0
+
+        for task in tasks:
+            states[task["task_id"]] = task["status"]
+
+            if self.task_states.get(task["task_id"]) == task["status"]:
+                continue
+
+            related = task.get("related_document")
+            await self.emit({
+                "event": f"task_{task['status'].lower()}",
+                "document_id": int(related) if related and str(related).isdigit() else None,
+                "task": task,
+            })
+            count += 1
+
+        # Forget about acknowledged tasks
+        self.task_states = states
+        self.save()
+
+        return count
+
+
+    async def poll(self) -> int:
+        """Poll once for changes. Returns the number of events."""
+
+        count = await self.poll_documents()
+        if self.tasks:
+            count += await self.poll_tasks()
+
+        return count
+
+
+async def watch(
+    *,
+    filters: Annotated[
+        Optional[List[str]],
+        Parameter(
+            name = ["--filter"],
+            negative = [],
+            converter = converters.query_filters
+        )] = None,
+    exec: Annotated[Optional[str], Parameter(show_default = False)] = None,
+    tasks: bool = True,
+    interval: float = 5.0,
+    max_interval: float = 120.0,
+    once: Annotated[bool, Parameter(negative = [])] = False,
+    state_file: Annotated[Optional[Path], Parameter(show_default = False)] = None,
+    ) -> None:
+
+    """Watch for added or modified documents and consumption tasks.
+
+    Each change is printed as a JSON line or passed to a command.
+    Changes are tracked with a persisted cursor, so restarting the watcher neither misses nor repeats changes.
+    The interval between polls doubles while nothing changes, up to the maximum interval.
+
+    Examples
+    --------
+    pngx watch --filter tags__id__all=1 --exec 'jq -r .document.title'
+
+    Parameters
+    ----------
+    filters: List[str]
+        Only watch documents matching the given API filters (KEY=VALUE), e.g. tags__id__all=1.
+    exec: str
+        Shell command to run for each event instead of printing it. The event is passed as JSON on stdin and in brief via the PNGX_EVENT and PNGX_DOCUMENT_ID environment variables.
+    tasks: bool
+        Watch consumption tasks as well.
+    interval: float
+        Seconds between polls while changes keep coming in.
+    max_interval: float
+        Maximum seconds between polls while idle.
+    once: bool
+        Poll once and exit, e.g. when run by cron.
+    state_file: Path
+        File to persist the state in. Defaults to a file in the state directory of the current account. Use different files for watchers with different filters.
+    """
+
+    if interval <= 0 or max_interval < interval:
+        raise ValueError("--interval must be positive and not greater than --max-interval.")
+
+    state_file = state_file or state_dir().joinpath("watch.json")
+    delay = interval
+
+    # A single session is reused for all polls
+    async with PaperlessAsyncAPI() as paperless:
+        watcher = Watcher(paperless, state_file, filters or {}, exec, tasks)
+        await watcher.restore()
+
+        while True:
+            try:
+                changed = await watcher.poll()
+            except (ClientError, asyncio.TimeoutError, PaperlessError) as e:
+                if once:
+                    raise ValueError(f"Polling failed: {e}")
+                print(f"Polling failed, retrying: {e}", file=sys.stderr)
+                changed = 0
+
+            if once:
+                break
+
+            delay = interval if changed else min(delay * 2, max_interval)
+            await asyncio.sleep(delay)
@@ -0,0 +1,297 @@
+"""
+Shell completion.
+
+Shells run the completion entry point (`pngx-complete`) on every keypress, so it has to answer
+within milliseconds: it neither imports the command-line interface nor talks to the API. Instead,
+candidates are looked up in files cached per user:
+
+* `commands.json`: the tree of commands and their options, written by `pngx completion <SHELL>`
+* `<ACCOUNT>/names.json`: names of tags, correspondents, document types, storage paths and
+  custom fields, each list sorted by its case-folded keys for prefix search
+
+Stale or missing name indexes are refreshed in a detached background process, so the
+current completion request is answered from what's cached (if anything) without waiting.
+"""
+
+import bisect
+import json
+import os
+import subprocess
+import sys
+import time
+import tomllib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pypaperless_cli.utils.cache import account_dirname, cache_dir, cache_root, read_json, write_json
+
+# Refresh name indexes older than this many seconds
+INDEX_TTL = 15 * 60
+
+# Skip refreshing if another refresh has been started within this many seconds
+REFRESH_LOCK_TTL = 60
+
+# Kinds of names which can be completed
+NAME_KINDS = ("tags", "correspondents", "document_types", "storage_paths", "custom_fields")
+
+
+#
+# Lookup
+#
+
+def option_value(words: List[str], name: str) -> Optional[str]:
+    """Return the value of an option given on the command line, if any."""
+
+    for i, word in enumerate(words):
+        if word == name and i + 1 < len(words):
+            return words[i + 1]
+        if word.startswith(f"{name}="):
+            return word[len(name) + 1:]
+
+    return None
+
+
+def account_index_path(words: List[str]) -> Optional[Path]:
+    """Determine the name index of the account a command line would use.
+
+    Follows the same precedence as the CLI: ad-hoc credentials, `--use` or the configured default account.
+    """
+
+    host = option_value(words, "--host") or os.environ.get("PNGX_HOST")
+    user = option_value(words, "--user") or os.environ.get("PNGX_USER")
+
+    if not host:
+        config_file = option_value(words, "--config") or os.environ.get("PNGX_CONFIG")
+
+        if config_file:
+            path = Path(config_file)
+        elif Path("pngx.toml").exists():
+            path = Path("pngx.toml")
+        else:
+            path = Path(os.environ.get("XDG_CONFIG_HOME") or Path.home().joinpath(".config"), "pngx", "pngx.toml")
+
+        try:
+            accounts = tomllib.loads(path.read_text()).get("accounts", {})
+        except (OSError, ValueError):
+            return None
+
+        alias = option_value(words, "--use") or accounts.get("current")
+        account = accounts.get(alias) if alias else None
+        if not isinstance(account, dict) or not account.get("host"):
+            return None
+
+        host, user = account["host"], account.get("user")
+
+    elif "://" not in host:
+        host = f"https://{host}"
+
+    return cache_root().joinpath(account_dirname(user, host.rstrip("/")), "names.json")
+
+
+def complete_names(index: Dict[str, Any], kind: str, prefix: str) -> List[str]:
+    """Return all names of the given kind starting with `prefix` (case-insensitive)."""
+
+    entry = index.get(kind) or {"keys": [], "names": []}
+    keys, names = entry["keys"], entry["names"]
+    key = prefix.casefold()
+
+    start = bisect.bisect_left(keys, key)
+    end = bisect.bisect_left(keys, key + "\U0010ffff", lo=start)
+
+    return names[start:end]
+
+
+def walk(tree: Dict[str, Any], words: List[str]) -> Tuple[Dict[str, Any], Optional[List]]:
+    """Follow the words of a command line through the command tree.
+
+    Returns the innermost command reached and the specification of the option
+    still expecting a value (if any).
+    """
+
+    node = tree[""]
+    path: List[str] = []
+    pending = None
+
+    for word in words:
+        if word.startswith("-"):
+            name, sep, _ = word.partition("=")
+            spec = node["options"].get(name) or tree[""]["options"].get(name)
+            pending = spec if spec and spec[0] != "flag" and not sep else None
+
+        elif pending is not None:
+            # Options accepting multiple values keep consuming words until the next option
+            if not pending[1]:
+                pending = None
+
+        elif word in node["commands"]:
+            path.append(word)
+            node = tree[" ".join(path)]
+
+    return node, pending
+
+
+def complete(words: List[str]) -> List[str]:
+    """Return completion candidates.
+
+    Parameters
+    ----------
+    words : List[str]
+        Words of the command line, excluding the program name. The last word is the one being completed.
+    """
+
+    tree = read_json(cache_root().joinpath("commands.json"))
+    if not tree:
+        return []
+
+    *previous, current = words or [""]
+    node, pending = walk(tree, previous)
+
+    if current.startswith("-") and not pending:
+        options = list(node["options"]) + (list(tree[""]["options"]) if node is not tree[""] else [])
+        return sorted(o for o in options if o.startswith(current))
+
+    if pending is None:
+        return [c for c in node["commands"] if c.startswith(current)]
+
+    kind = pending[0]
+
+    if isinstance(kind, list):
+        return [c for c in kind if c.startswith(current)]
+
+    if kind not in NAME_KINDS:
+        return []
+
+    path = account_index_path(previous)
+    if path is None:
+        return []
+
+    index = read_json(path, {})
+    if time.time() - index.get("updated", 0) > INDEX_TTL:
+        refresh_in_background(path, previous)
+
+    prefix = current.lstrip("\"'")
+    if kind == "custom_fields" and "=" in prefix:
+        # Values of custom fields can't be completed
+        return []
+
+    return complete_names(index, kind, prefix)
+
+
+#
+# Refreshing name indexes
+#
+
+def refresh_in_background(path: Path, words: List[str]) -> None:
+    """Refresh a name index in a detached process, unless a refresh is already running."""
+
+    lock = path.with_name("names.lock")
+
+    try:
+        if time.time() - lock.stat().st_mtime < REFRESH_LOCK_TTL:
+            return
+    except OSError:
+        pass
+
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    lock.touch()
+
+    # Pass the account to use the same way the CLI would
+    env = dict(os.environ)
+    for option, var in (("--config", "PNGX_CONFIG"), ("--use", "PNGX_USE"), ("--host", "PNGX_HOST"), ("--user", "PNGX_USER"), ("--token", "PNGX_TOKEN")):
+        value = option_value(words, option)
+        if value:
+            env[var] = value
+
+    subprocess.Popen(
+        [sys.executable, "-m", "pypaperless_cli.completion", "--refresh"],
+        env = env,
+        stdin = subprocess.DEVNULL,
+        stdout = subprocess.DEVNULL,
+        stderr = subprocess.DEVNULL,
+        start_new_session = True,
+    )
+
+
+def name_index(references: Any) -> Dict[str, Any]:
+    """Build a name index from `ReferenceTables`."""
+
+    index: Dict[str, Any] = {"updated": time.time()}
+
+    for kind in NAME_KINDS:
+        table = getattr(references, kind)
+        names = sorted(
+            {item["name"] if isinstance(item, dict) else item for item in table.values()},
+            key=str.casefold
+        )
+        index[kind] = {"keys": [n.casefold() for n in names], "names": names}
+
+    return index
+
+
+async def refresh_names() -> Path:
+    """Fetch all names of the current account and write its name index."""
+
+    from pypaperless_cli.api import PaperlessAsyncAPI
+    from pypaperless_cli.utils.references import ReferenceTables
+
+    paperless = PaperlessAsyncAPI()
+    try:
+        references = await ReferenceTables.load(paperless)
+    finally:
+        await paperless.close()
+
+    path = cache_dir().joinpath("names.json")
+    write_json(path, name_index(references))
+
+    return path
+
+
+def refresh() -> None:
+    """Refresh the name index of the account specified by environment variables."""
+
+    import asyncio
+    from pypaperless_cli.config import config as appconfig
+
+    appconfig.load_env()
+    path = cache_dir().joinpath("names.json")
+
+    try:
+        asyncio.run(refresh_names())
+    finally:
+        path.with_name("names.lock").unlink(missing_ok=True)
+
+
+def launch(argv: Optional[List[str]] = None) -> None:
+    """Print completion candidates for a command line, one per line.
+
+    Invoked by shells as `pngx-complete -- <WORDS>`, with `<WORDS>` being the words
+    of the command line up to and including the word being completed.
+    """
+
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv[:1] == ["--refresh"]:
+        try:
+            refresh()
+        except Exception:
+            sys.exit(1)
+        return
+
+    if argv[:1] == ["--"]:
+        argv = argv[1:]
+
+    # Drop the program name
+    words = argv[1:] if argv else []
+
+    try:
+        candidates = complete(words)
+    except Exception:
+        # Never break the shell's prompt
+        candidates = []
+
+    if candidates:
+        print("\n".join(candidates))
+
+
+if __name__ == "__main__":
+    launch()
@@ -2,10 +2,10 @@
 Handle application configuration.
 """
 
+import os
 from pathlib import Path
 from typing import List, Optional
 
-import httpx
 from xdg_base_dirs import xdg_config_home
 from tomlkit import (
     dumps,
@@ -59,6 +59,30 @@ class CLIConfig:
             self.use_account(use_account)
 
 
+    def load_env(self) -> None:
+        """Load configuration as specified by environment variables only.
+
+        Used by entry points bypassing the command-line interface. Supports
+        `PNGX_CONFIG` and `PNGX_USE` as well as ad-hoc credentials (`PNGX_HOST`, `PNGX_USER`, `PNGX_TOKEN`),
+        which aren't verified up-front.
+        """
+
+        config_file = os.environ.get("PNGX_CONFIG")
+        self.load(Path(config_file) if config_file else None, os.environ.get("PNGX_USE"))
+
+        if os.environ.get("PNGX_HOST"):
+            self.add_account(
+                host = os.environ["PNGX_HOST"].rstrip("/"),
+                user = os.environ.get("PNGX_USER"),
+                token = os.environ.get("PNGX_TOKEN"),
+                alias = "__adhoc__",
+                verify = False
+            )
+
+        if self.current is None:
+            raise ValueError("No accounts configured that can be used.")
+
+
     @property
     def current(self) -> Account:
         """Return the default account"""
@@ -94,9 +118,17 @@ class CLIConfig:
         user: Optional[str] = None,
         password: Optional[str] = None,
         token: Optional[str] = None,
-        alias: str = "default"
+        alias: str = "default",
+        verify: bool = True
     ):
-        """Add or update an account"""
+        """Add or update an account
+
+        Credentials are verified against the given host unless `verify` is `False`,
+        in which case an API token is required.
+        """
+
+        # Only required for verifying credentials, importing it is comparatively slow
+        import httpx
 
         # TODO: remove any trailing slash and/or /api/* script path
         # TODO: check if pypaperless supports unauthenticated requests or remote user auth
@@ -104,7 +136,11 @@ class CLIConfig:
 
         # If no credentials have been provided, the API might be accessible without authentication
         # (e.g. because a reverse proxy is adding required authentication header to the request)
-        if all([p == None for p in [user, password, token]]):
+        if not verify:
+            if token is None:
+                raise ValueError("An API token is required.")
+
+        elif all([p == None for p in [user, password, token]]):
             response = httpx.get(f"{host}/api/profile/")
             if response.status_code != 200:
                 raise ValueError(f"Server {host} requires authentication.")
@@ -1,7 +1,126 @@
 """Constants."""
 
-from pypaperless.const import DOCUMENTS
+from pypaperless.const import API_PATH as PYPAPERLESS_API_PATH, DOCUMENTS
 
 GUI_PATH = {
     f"{DOCUMENTS}_details": f"/{DOCUMENTS}/{{pk}}/details/",
 }
+
+# API endpoints not (yet) covered by pypaperless
+API_PATH = {
+    **PYPAPERLESS_API_PATH,
+    f"{DOCUMENTS}_bulk_edit": f"/api/{DOCUMENTS}/bulk_edit/",
+    f"{DOCUMENTS}_history": f"/api/{DOCUMENTS}/{{pk}}/history/",
+    "statistics": "/api/statistics/",
+}
+
+# Maximum number of documents per bulk edit request
+BULK_EDIT_CHUNK_SIZE = 1000
+
+# Fields of the document representation which can be requested via the API's `fields` parameter
+DOCUMENT_FIELDS = (
+    "id",
+    "title",
+    "content",
+    "created",
+    "created_date",
+    "modified",
+    "added",
+    "deleted_at",
+    "archive_serial_number",
+    "correspondent",
+    "document_type",
+    "storage_path",
+    "tags",
+    "custom_fields",
+    "notes",
+    "original_file_name",
+    "archived_file_name",
+    "mime_type",
+    "page_count",
+    "owner",
+    "user_can_change",
+    "is_shared_by_requester",
+)
+
+# Sub-resources of documents which can be shown along with a document, mapped to their endpoint
+DOCUMENT_EXPANSIONS = {
+    "notes": f"{DOCUMENTS}_notes",
+    "history": f"{DOCUMENTS}_history",
+    "metadata": f"{DOCUMENTS}_meta",
+    "suggestions": f"{DOCUMENTS}_suggestions",
+}
+
+# Document fields which can be set from suggestions, mapped to the key of suggestions
+SUGGESTION_FIELDS = {
+    "tags": "tags",
+    "correspondent": "correspondents",
+    "document_type": "document_types",
+    "storage_path": "storage_paths",
+}
+
+# Filter rules of saved views (as defined by the Paperless-ngx web interface), mapped to
+# the API's query parameters. Values of rules with the same parameter are combined.
+# Rules referring to an object without value (e.g. "no correspondent") map to `<param>__isnull` instead.
+SAVED_VIEW_FILTER_RULES = {
+    0: "title__icontains",
+    1: "content__icontains",
+    2: "archive_serial_number",
+    3: "correspondent__id",
+    4: "document_type__id",
+    5: "is_in_inbox",
+    6: "tags__id__all",
+    7: "is_tagged",
+    8: "created__date__lt",
+    9: "created__date__gt",
+    10: "created__year",
+    11: "created__month",
+    12: "created__day",
+    13: "added__date__lt",
+    14: "added__date__gt",
+    15: "modified__date__lt",
+    16: "modified__date__gt",
+    17: "tags__id__none",
+    18: "archive_serial_number__isnull",
+    19: "title_content",
+    20: "query",
+    21: "more_like_id",
+    22: "tags__id__in",
+    23: "archive_serial_number__gt",
+    24: "archive_serial_number__lt",
+    25: "storage_path__id",
+    26: "correspondent__id__in",
+    27: "correspondent__id__none",
+    28: "document_type__id__in",
+    29: "document_type__id__none",
+    30: "storage_path__id__in",
+    31: "storage_path__id__none",
+    32: "owner__id",
+    33: "owner__id__in",
+    34: "owner__isnull",
+    35: "owner__id__none",
+    36: "custom_fields__icontains",
+    37: "shared_by__id",
+    38: "custom_fields__id__all",
+    39: "custom_fields__id__in",
+    40: "custom_fields__id__none",
+    41: "has_custom_fields",
+    42: "custom_field_query",
+}
+
+# Display fields of saved views, mapped to document fields
+SAVED_VIEW_DISPLAY_FIELDS = {
+    "title": "title",
+    "created": "created_date",
+    "added": "added",
+    "modified": "modified",
+    "tag": "tags",
+    "correspondent": "correspondent",
+    "documenttype": "document_type",
+    "storagepath": "storage_path",
+    "note": "notes",
+    "owner": "owner",
+    "shared": "is_shared_by_requester",
+    "asn": "archive_serial_number",
+    "pagecount": "page_count",
+}
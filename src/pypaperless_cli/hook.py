@@ -0,0 +1,88 @@
+"""
+Post-consumption hook.
+
+Paperless-ngx runs post-consumption scripts once per consumed document, passing information
+about the document via environment variables (e.g. `DOCUMENT_ID`). This entry point applies
+content-matching rules (see `pypaperless_cli.rules`) to that document.
+
+As it runs for every single document, startup time matters: it bypasses the command-line
+interface entirely and imports only what's required to talk to the API.
+
+Configuration is read from environment variables:
+
+* `DOCUMENT_ID` (set by Paperless-ngx)
+* `PNGX_HOOK_RULES`: path to the rules file, unless given as first argument
+* `PNGX_CONFIG`, `PNGX_USE`: configuration file and account to use, or
+* `PNGX_HOST`, `PNGX_USER`, `PNGX_TOKEN`: ad-hoc credentials (not verified up-front)
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.config import config as appconfig
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.rules import DOCUMENT_FIELDS, RuleSet, match_fields, resolve_actions
+from pypaperless_cli.utils.bulk import DocumentChanges
+from pypaperless_cli.utils.references import ReferenceTables
+
+
+async def run(document_id: int, ruleset: RuleSet) -> List[str]:
+    """Apply rules to a single document, returning the names of matching rules."""
+
+    # Neither the API index nor pypaperless' helpers are needed, so skip initialization
+    paperless = PaperlessAsyncAPI()
+
+    try:
+        params = {"fields": DOCUMENT_FIELDS}
+        document, references = await asyncio.gather(
+            paperless.request_json("get", API_PATH["documents_single"].format(pk=document_id), params=params),
+            ReferenceTables.load(paperless, ruleset.reference_kinds),
+        )
+
+        custom_field_names = {id: f["name"] for id, f in references.custom_fields.items()}
+        matched = ruleset.evaluate(match_fields(document, custom_field_names))
+
+        changes = DocumentChanges()
+        for i in matched:
+            changes.add(document, resolve_actions(ruleset.rules[i], references))
+
+        if changes:
+            await changes.apply(paperless)
+
+    finally:
+        await paperless.close()
+
+    return [ruleset.rules[i].name for i in matched]
+
+
+def launch(argv: Optional[List[str]] = None) -> None:
+    """Run the post-consumption hook."""
+
+    argv = sys.argv[1:] if argv is None else argv
+
+    try:
+        document_id = os.environ.get("DOCUMENT_ID", "")
+        if not document_id.isdigit():
+            raise ValueError("DOCUMENT_ID must be set to the ID of the consumed document.")
+
+        rules_file = argv[0] if argv else os.environ.get("PNGX_HOOK_RULES")
+        if not rules_file:
+            raise ValueError("Specify a rules file as argument or via PNGX_HOOK_RULES.")
+
+        ruleset = RuleSet.from_file(Path(rules_file))
+        appconfig.load_env()
+
+        matched = asyncio.run(run(int(document_id), ruleset))
+
+    except Exception as e:
+        print(f"pngx-hook: document {os.environ.get('DOCUMENT_ID')}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if matched:
+        print(f"pngx-hook: document {document_id} matched {', '.join(matched)}")
+    else:
+        print(f"pngx-hook: document {document_id} didn't match any rule")
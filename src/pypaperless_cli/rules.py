@@ -0,0 +1,264 @@
+"""
+Content-matching rules.
+
+Rules are defined in a TOML file, e.g.
+
+    [[rules]]
+    name = "ACME invoices"
+    match = "all"                       # all (default) or any condition must match
+
+    [[rules.conditions]]
+    field = "content"                   # title, content or custom_fields.<NAME>
+    regex = 'Invoice\\s+from\\s+ACME'
+
+    [[rules.conditions]]
+    field = "title"
+    keywords = ["invoice", "bill"]      # any of the keywords
+    ignore_case = true                  # default
+
+    [rules.actions]                     # rules without conditions apply to every document
+    add_tags = ["invoice"]              # IDs or exact names
+    remove_tags = ["inbox"]
+    correspondent = "ACME"
+    document_type = "Invoice"
+    storage_path = 1
+    custom_fields = { "Amount" = "EUR12.00" }
+
+This module is deliberately kept free of any CLI dependencies as it's also used by `pngx-hook`.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from tomlkit import parse
+
+# Fields documents are matched against
+MATCH_FIELDS = ("title", "content")
+CUSTOM_FIELD_PREFIX = "custom_fields."
+
+# Fields which need to be requested to evaluate rules and to compare changes with
+DOCUMENT_FIELDS = "id,title,content,tags,correspondent,document_type,storage_path,custom_fields"
+
+# Supported actions, mapped to the kind of objects they refer to
+ACTIONS = {
+    "add_tags": "tags",
+    "remove_tags": "tags",
+    "correspondent": "correspondents",
+    "document_type": "document_types",
+    "storage_path": "storage_paths",
+    "custom_fields": "custom_fields",
+}
+
+
+class Condition:
+    """A regular expression or a list of keywords matched against a single document field."""
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        """Compile a condition."""
+
+        self.field = spec.get("field", "")
+        if self.field not in MATCH_FIELDS and not self.field.startswith(CUSTOM_FIELD_PREFIX):
+            raise ValueError(f"Invalid condition field \"{self.field}\". Must be one of {', '.join(MATCH_FIELDS)} or {CUSTOM_FIELD_PREFIX}<NAME>.")
+
+        if ("regex" in spec) == ("keywords" in spec):
+            raise ValueError(f"Condition on \"{self.field}\" requires either `regex` or `keywords`.")
+
+        if "regex" in spec:
+            self.expression = spec["regex"]
+        else:
+            self.expression = "|".join(re.escape(k) for k in sorted(spec["keywords"], key=len, reverse=True))
+
+        self.flags = re.IGNORECASE if spec.get("ignore_case", True) else 0
+
+        try:
+            self.pattern = re.compile(self.expression, self.flags)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression \"{self.expression}\": {e}")
+
+
+    def matches(self, text: str) -> bool:
+        """Return whether the condition matches the given text."""
+
+        return self.pattern.search(text) is not None
+
+
+class Rule:
+    """A set of conditions mapped to actions."""
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        """Compile a rule."""
+
+        self.name = spec.get("name") or "unnamed"
+
+        if spec.get("match", "all") not in ("all", "any"):
+            raise ValueError(f"Rule \"{self.name}\": `match` must be either \"all\" or \"any\".")
+        self.match_all = spec.get("match", "all") == "all"
+
+        # Rules without conditions apply to every document
+        self.conditions = [Condition(c) for c in spec.get("conditions") or []]
+
+        self.actions = spec.get("actions") or {}
+        unknown = set(self.actions) - set(ACTIONS)
+        if unknown:
+            raise ValueError(f"Rule \"{self.name}\" has unknown actions: {', '.join(sorted(unknown))}.")
+
+
+class RuleSet:
+    """Compiled rules.
+
+    Besides each condition's own pattern, all conditions on the same field are combined into a single pattern.
+    As long as this combined pattern doesn't match, none of the individual conditions need to be evaluated,
+    which keeps the common case of non-matching documents to a single scan per field. Fields with conditions
+    containing groups are always checked individually.
+    """
+
+    def __init__(self, spec: List[Dict[str, Any]]) -> None:
+        """Compile rules given their specification (the `rules` list of a rules file)."""
+
+        self.spec = spec
+        self.rules = [Rule(r) for r in spec]
+
+        expressions: Dict[str, List[str]] = {}
+        uncombinable: Set[str] = set()
+        for rule in self.rules:
+            for condition in rule.conditions:
+                flags = "(?i:" if condition.flags else "(?:"
+                expressions.setdefault(condition.field, []).append(f"{flags}{condition.expression})")
+
+                # Combining renumbers groups, which breaks backreferences (and duplicates group names)
+                if condition.pattern.groups:
+                    uncombinable.add(condition.field)
+
+        self.prefilters: Dict[str, Optional[re.Pattern]] = {}
+        for field, alternatives in expressions.items():
+            if field in uncombinable:
+                self.prefilters[field] = None
+                continue
+
+            try:
+                self.prefilters[field] = re.compile("|".join(alternatives))
+            except re.error:
+                # E.g. patterns with global inline flags can't be combined, so always check them individually
+                self.prefilters[field] = None
+
+
+    @classmethod
+    def from_file(cls, path: Path) -> "RuleSet":
+        """Read rules from a TOML file."""
+
+        try:
+            spec = parse(Path(path).read_text()).unwrap()
+        except OSError as e:
+            raise ValueError(f"Can't read rules file {path}: {e.strerror}.")
+        except Exception as e:
+            raise ValueError(f"Invalid rules file {path}: {e}")
+
+        if not spec.get("rules"):
+            raise ValueError(f"Rules file {path} doesn't define any rules.")
+
+        return cls(spec["rules"])
+
+
+    @property
+    def custom_field_names(self) -> List[str]:
+        """Return names of custom fields that are matched against."""
+
+        return [f[len(CUSTOM_FIELD_PREFIX):] for f in self.prefilters if f.startswith(CUSTOM_FIELD_PREFIX)]
+
+
+    @property
+    def reference_kinds(self) -> Set[str]:
+        """Return the kinds of objects (e.g. `tags`) referenced by conditions or actions."""
+
+        kinds = {ACTIONS[action] for rule in self.rules for action in rule.actions}
+        if self.custom_field_names:
+            kinds.add("custom_fields")
+
+        return kinds
+
+
+    def evaluate(self, document: Dict[str, Any]) -> List[int]:
+        """Return the indices of all rules matching the given document.
+
+        Parameters
+        ----------
+        document : dict
+            Values of the document's fields to match against, custom fields keyed by `custom_fields.<NAME>`.
+        """
+
+        candidates = set()
+        for field, prefilter in self.prefilters.items():
+            value = document.get(field)
+            if value is None:
+                continue
+            if prefilter is None or prefilter.search(str(value)):
+                candidates.add(field)
+
+        matched = []
+        for i, rule in enumerate(self.rules):
+            if not rule.conditions:
+                matched.append(i)
+                continue
+
+            results = (
+                c.field in candidates and c.matches(str(document[c.field]))
+                for c in rule.conditions
+            )
+            if (all if rule.match_all else any)(results):
+                matched.append(i)
+
+        return matched
+
+
+def match_fields(document: Dict[str, Any], custom_field_names: Dict[int, str]) -> Dict[str, Any]:
+    """Extract the fields rules are matched against from a raw document."""
+
+    fields = {field: document.get(field) for field in MATCH_FIELDS}
+
+    for custom_field in document.get("custom_fields") or []:
+        name = custom_field_names.get(custom_field["field"])
+        if name is not None:
+            fields[f"{CUSTOM_FIELD_PREFIX}{name}"] = custom_field["value"]
+
+    return fields
+
+
+def resolve_actions(rule: Rule, references: Any) -> Dict[str, Any]:
+    """Translate a rule's actions into document changes, resolving names to IDs.
+
+    `references` are the `ReferenceTables` of the instance the rules are applied to.
+    """
+
+    changes: Dict[str, Any] = {}
+
+    for action, value in rule.actions.items():
+        kind = ACTIONS[action]
+
+        if action in ("add_tags", "remove_tags"):
+            values = value if isinstance(value, list) else [value]
+            changes[action] = [references.resolve(kind, v) for v in values]
+        elif action == "custom_fields":
+            changes[action] = {references.resolve(kind, k): v for k, v in value.items()}
+        else:
+            changes[action] = references.resolve(kind, value)
+
+    return changes
+
+
+#
+# Process pool workers
+#
+
+_worker_rules: Optional[RuleSet] = None
+
+def init_worker(spec: List[Dict[str, Any]]) -> None:
+    """Compile rules once per worker process."""
+
+    global _worker_rules
+    _worker_rules = RuleSet(spec)
+
+def evaluate_batch(documents: List[Dict[str, Any]]) -> List[List[int]]:
+    """Evaluate the worker's rules for a batch of documents."""
+
+    return [_worker_rules.evaluate(document) for document in documents]
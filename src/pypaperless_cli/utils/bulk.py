@@ -0,0 +1,176 @@
+"""
+Collect changes of many documents and apply them with as few requests as possible.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Dict, FrozenSet, List, Optional, Tuple
+
+from aiohttp import ClientError
+from pypaperless import Paperless
+from pypaperless.exceptions import PaperlessError
+
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils.errors import describe
+
+# Fields which can be set for many documents at once using bulk edit
+BULK_EDIT_FIELDS = {
+    "correspondent": "set_correspondent",
+    "document_type": "set_document_type",
+    "storage_path": "set_storage_path",
+}
+
+
+class DocumentChanges:
+    """Changes of many documents.
+
+    Tags, correspondents, document types and storage paths are grouped into bulk edit operations
+    for all documents receiving identical changes. Everything else (e.g. custom field values, titles)
+    is sent as a minimal PATCH request per document.
+    """
+
+    def __init__(self) -> None:
+        """Instantiate an empty change set."""
+
+        self.tags: Dict[int, Tuple[FrozenSet[int], FrozenSet[int]]] = {}
+        self.fields: Dict[str, Dict[int, Optional[int]]] = {field: {} for field in BULK_EDIT_FIELDS}
+        self.patches: Dict[int, Dict[str, Any]] = {}
+
+
+    def __len__(self) -> int:
+        """Return the number of documents with changes."""
+
+        return len(self.documents())
+
+
+    def documents(self) -> List[int]:
+        """Return the IDs of all documents with changes."""
+
+        ids = set(self.tags) | set(self.patches)
+        for values in self.fields.values():
+            ids.update(values)
+
+        return sorted(ids)
+
+
+    def add(self, document: dict, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Record changes of a document, skipping everything that already applies.
+
+        Parameters
+        ----------
+        document : dict
+            The document's current (raw) data. Must at least contain every field that is changed.
+        changes : dict
+            `add_tags` and `remove_tags` (lists of tag IDs), `custom_fields` (custom field IDs mapped to values),
+            `remove_custom_fields` (list of custom field IDs) and/or any other document field mapped to its new value.
+
+        Returns the effective changes.
+        """
+
+        id = document["id"]
+        effective = {}
+
+        # Tags, taking changes recorded earlier into account
+        previous_add, previous_remove = self.tags.get(id, (frozenset(), frozenset()))
+        current_tags = (set(document.get("tags") or []) | previous_add) - previous_remove
+        add_tags = frozenset(t for t in changes.get("add_tags") or [] if t not in current_tags)
+        remove_tags = frozenset(t for t in changes.get("remove_tags") or [] if t in current_tags) - add_tags
+
+        if add_tags or remove_tags:
+            original_tags = set(document.get("tags") or [])
+            target_tags = (current_tags | add_tags) - remove_tags
+            self.tags[id] = (
+                frozenset(target_tags - original_tags),
+                frozenset(original_tags - target_tags)
+            )
+            if add_tags:
+                effective["add_tags"] = sorted(add_tags)
+            if remove_tags:
+                effective["remove_tags"] = sorted(remove_tags)
+
+        # Custom fields need to be sent as a whole, thus merge them with the existing ones
+        custom_fields = changes.get("custom_fields") or {}
+        current_custom_fields = self.patches.get(id, {}).get("custom_fields", document.get("custom_fields") or [])
+        current_values = {f["field"]: f["value"] for f in current_custom_fields}
+        updated_values = {k: v for k, v in custom_fields.items() if k not in current_values or current_values[k] != v}
+        removed = [k for k in changes.get("remove_custom_fields") or [] if k in current_values and k not in custom_fields]
+
+        if updated_values or removed:
+            self.patches.setdefault(id, {})["custom_fields"] = (
+                [{"field": k, "value": updated_values.get(k, v)} for k, v in current_values.items() if k not in removed]
+                + [{"field": k, "value": v} for k, v in updated_values.items() if k not in current_values]
+            )
+            if updated_values:
+                effective["custom_fields"] = updated_values
+            if removed:
+                effective["remove_custom_fields"] = removed
+
+        # Any other field
+        for field, value in changes.items():
+            if field in ("add_tags", "remove_tags", "custom_fields", "remove_custom_fields") or document.get(field) == value:
+                continue
+
+            if field in BULK_EDIT_FIELDS:
+                self.fields[field][id] = value
+            else:
+                self.patches.setdefault(id, {})[field] = value
+
+            effective[field] = value
+
+        return effective
+
+
+    def operations(self) -> List[Tuple[str, Dict[str, Any], List[int]]]:
+        """Return bulk edit operations (method, parameters, documents) grouped by identical changes."""
+
+        operations = []
+
+        groups: Dict[Tuple[FrozenSet[int], FrozenSet[int]], List[int]] = {}
+        for id, tags in self.tags.items():
+            if any(tags):
+                groups.setdefault(tags, []).append(id)
+
+        for (add_tags, remove_tags), ids in groups.items():
+            parameters = {"add_tags": sorted(add_tags), "remove_tags": sorted(remove_tags)}
+            operations.append(("modify_tags", parameters, sorted(ids)))
+
+        for field, method in BULK_EDIT_FIELDS.items():
+            values: Dict[Optional[int], List[int]] = {}
+            for id, value in self.fields[field].items():
+                values.setdefault(value, []).append(id)
+
+            for value, ids in values.items():
+                operations.append((method, {field: value}, sorted(ids)))
+
+        return operations
+
+
+    async def apply(self, paperless: Paperless, concurrency: int = 8, errors: Optional[Dict[int, str]] = None) -> None:
+        """Send all changes using at most `concurrency` simultaneous requests.
+
+        If `errors` is given, failed requests are recorded in it for each affected document instead of being raised.
+        """
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(ids: List[int], request: Awaitable[Any]) -> None:
+            async with semaphore:
+                if errors is None:
+                    await request
+                    return
+
+                try:
+                    await request
+                except (ClientError, PaperlessError) as e:
+                    for id in ids:
+                        errors[id] = describe(e)
+
+        async def bulk_edit(method: str, parameters: Dict[str, Any], ids: List[int]) -> None:
+            await send(ids, paperless.bulk_edit(ids, method, **parameters))
+
+        async def patch(id: int, data: Dict[str, Any]) -> None:
+            await send([id], paperless.request_json("patch", API_PATH["documents_single"].format(pk=id), json=data))
+
+        await asyncio.gather(
+            *[bulk_edit(*operation) for operation in self.operations()],
+            *[patch(id, data) for id, data in self.patches.items()],
+        )
@@ -0,0 +1,104 @@
+"""
+Per-account files on disk, e.g. cached API data or persisted state.
+"""
+
+import json
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+from xdg_base_dirs import xdg_cache_home, xdg_state_home
+
+if TYPE_CHECKING:
+    from pypaperless_cli.config import Account
+
+
+def account_dirname(user: Optional[str], host: str) -> str:
+    """Return a directory name unique to an account's user and host.
+
+    Aliases aren't used as they can be renamed and ad-hoc accounts share the same alias.
+    """
+
+    name = f"{user}@{host}" if user else host
+
+    return re.sub(r"[^A-Za-z0-9._@-]+", "_", name)
+
+
+def cache_root() -> Path:
+    """Return the cache directory shared by all accounts."""
+
+    return xdg_cache_home().joinpath("pngx")
+
+
+def account_path(root: Path, account: Optional["Account"] = None) -> Path:
+    """Return (and create) an account's directory below `root`. Defaults to the current account."""
+
+    if account is None:
+        # Imported lazily, shell completion reads caches without loading the configuration module
+        from pypaperless_cli.config import config as appconfig
+        account = appconfig.current
+
+    path = root.joinpath(account_dirname(account.user, account.host))
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
+
+
+def cache_dir(account: Optional["Account"] = None) -> Path:
+    """Return (and create) the cache directory of an account, for data that can be fetched again."""
+
+    return account_path(cache_root(), account)
+
+
+def state_dir(account: Optional["Account"] = None) -> Path:
+    """Return (and create) the state directory of an account, for data that must persist between runs (e.g. cursors)."""
+
+    return account_path(xdg_state_home().joinpath("pngx"), account)
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """Read a JSON file, returning `default` if it doesn't exist or is corrupted."""
+
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return default
+
+
+@contextmanager
+def atomic_file(path: Path, mode: str = "w", opener: Callable[..., IO] = open) -> Iterator[IO]:
+    """Open a file for writing atomically.
+
+    Data is written to a temporary file next to it, which replaces the file once closed, so readers
+    never see a partially written file. Should writing fail, the file is left untouched.
+
+    Parameters
+    ----------
+    path : Path
+        File to write.
+    mode : str
+        Mode to open the file with, e.g. `wb` for binary data.
+    opener : Callable
+        Function opening the file given its path and mode, e.g. `gzip.open`.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    try:
+        with opener(tmp, mode) as f:
+            yield f
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    tmp.replace(path)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Atomically write a JSON file."""
+
+    with atomic_file(path) as f:
+        f.write(json.dumps(data, separators=(",", ":")))
@@ -0,0 +1,231 @@
+"""
+Recording and replaying of HTTP traffic.
+
+Requests to the Paperless-ngx API can be recorded to a cassette (a file with one JSON object
+per request) and replayed later without any network access, e.g. to compare the performance of
+pngx on realistic traffic reproducibly. Responses are replayed with their recorded latencies, scaled by a factor.
+
+Recording is configured via `configure()` or the environment variables `PNGX_RECORD`, `PNGX_REPLAY`
+and `PNGX_REPLAY_LATENCY`, and applied to all requests of `PaperlessAsyncAPI`. Cassettes never contain
+credentials: request headers aren't recorded, requests are recorded without host and tokens and passwords
+in responses are redacted.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Optional, TextIO
+
+from aiohttp import ClientConnectionError, ClientResponse, ClientResponseError
+from aiohttp.client_reqrep import RequestInfo
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+# Response headers worth recording, others might contain session information
+RECORDED_HEADERS = ("Content-Type", "Content-Disposition", "Content-Length", "Content-Range", "X-Version", "X-Api-Version")
+
+# Keys of JSON objects whose values are redacted
+REDACTED_KEYS = ("token", "auth_token", "password")
+
+settings = {
+    "record": os.environ.get("PNGX_RECORD"),
+    "replay": os.environ.get("PNGX_REPLAY"),
+    "latency": float(os.environ.get("PNGX_REPLAY_LATENCY", 1.0)),
+}
+
+# The cassette in use, shared by all sessions of a process
+_recording: Optional[TextIO] = None
+_replaying: Optional[Dict[str, Deque[dict]]] = None
+
+
+class NotRecordedError(ClientConnectionError):
+    """Raised when replaying a request which isn't part of the cassette."""
+
+
+def configure(record: Optional[Path] = None, replay: Optional[Path] = None, latency: Optional[float] = None) -> None:
+    """Record to or replay from the given cassette, overriding environment variables."""
+
+    if record is not None and replay is not None:
+        raise ValueError("Traffic can't be recorded and replayed at the same time.")
+
+    if record is not None or replay is not None:
+        settings["record"] = str(record) if record is not None else None
+        settings["replay"] = str(replay) if replay is not None else None
+
+    if latency is not None:
+        settings["latency"] = latency
+
+
+def request_key(method: str, url: URL) -> str:
+    """Identify a request by its method, path and (sorted) query, leaving out the host."""
+
+    query = "&".join(f"{k}={v}" for k, v in sorted(url.query.items()))
+    return f"{method.upper()} {url.path}" + (f"?{query}" if query else "")
+
+
+def redact(data: Any) -> Any:
+    """Replace values of secret keys in JSON data."""
+
+    if isinstance(data, dict):
+        return {k: "REDACTED" if k in REDACTED_KEYS else redact(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [redact(v) for v in data]
+
+    return data
+
+
+class ReplayStream:
+    """Stand-in for the body stream of a response."""
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    async def read(self, n: int = -1) -> bytes:
+        body, self.body = (self.body, b"") if n < 0 else (self.body[:n], self.body[n:])
+        return body
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        while chunk := await self.read(n):
+            yield chunk
+
+
+class ReplayResponse:
+    """A response with a body that has been read completely, e.g. from a cassette.
+
+    Implements the parts of `aiohttp.ClientResponse` used by pypaperless and pngx.
+    """
+
+    def __init__(self, method: str, url: URL, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.method = method
+        self.url = url
+        self.status = status
+        self.reason = None
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self.content = ReplayStream(body)
+        self._body = body
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("Content-Type", "application/octet-stream").split(";")[0].strip()
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def request_info(self) -> RequestInfo:
+        return RequestInfo(self.url, self.method, CIMultiDictProxy(CIMultiDict()), self.url)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None, errors: str = "strict") -> str:
+        return self._body.decode(encoding or "utf-8", errors)
+
+    async def json(self, *, loads: Any = json.loads, **kwargs: Any) -> Any:
+        return loads(self._body.decode())
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise ClientResponseError(self.request_info, (), status=self.status, message=self._body[:200].decode(errors="replace"), headers=self.headers)
+
+    def release(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "ReplayResponse":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        pass
+
+
+def encode_response(key: str, response: ReplayResponse, latency: float) -> Dict[str, Any]:
+    """Turn a response into an entry of a cassette."""
+
+    headers = {k: response.headers[k] for k in RECORDED_HEADERS if k in response.headers}
+    entry = {"request": key, "status": response.status, "headers": headers, "latency": round(latency, 4)}
+    body = response._body
+
+    if response.content_type == "application/json":
+        if any(f'"{k}"'.encode() in body for k in REDACTED_KEYS):
+            body = json.dumps(redact(json.loads(body)), separators=(",", ":")).encode()
+        entry["body"] = body.decode()
+    else:
+        try:
+            entry["body"] = body.decode() if response.content_type.startswith("text/") else None
+        except UnicodeDecodeError:
+            entry["body"] = None
+
+        if entry["body"] is None:
+            entry["body_base64"] = base64.b64encode(body).decode()
+
+    return entry
+
+
+def decode_response(method: str, url: URL, entry: Dict[str, Any]) -> ReplayResponse:
+    """Turn an entry of a cassette into a response."""
+
+    body = base64.b64decode(entry["body_base64"]) if "body_base64" in entry else entry["body"].encode()
+    return ReplayResponse(method, url, entry["status"], entry["headers"], body)
+
+
+def load() -> Dict[str, Deque[dict]]:
+    """Read the cassette to replay, once per process."""
+
+    global _replaying
+
+    if _replaying is None:
+        _replaying = defaultdict(deque)
+        with open(settings["replay"]) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    _replaying[entry["request"]].append(entry)
+
+    return _replaying
+
+
+async def record(method: str, url: URL, response: ClientResponse, started: float) -> ReplayResponse:
+    """Read a response completely and record it to the cassette, with its latency since `started`.
+
+    Returns a response served from memory, as the original one has been consumed.
+    """
+
+    global _recording
+
+    body = await response.read()
+    latency = time.monotonic() - started
+    replay = ReplayResponse(method, response.url, response.status, dict(response.headers), body)
+
+    if _recording is None:
+        _recording = open(settings["record"], "w")
+
+    _recording.write(json.dumps(encode_response(request_key(method, url), replay, latency), separators=(",", ":")) + "\n")
+    _recording.flush()
+
+    return replay
+
+
+async def replay(method: str, url: URL) -> ReplayResponse:
+    """Answer a request from the cassette without any network access.
+
+    Identical requests are answered in the order they were recorded.
+    """
+
+    entries = load()
+    key = request_key(method, url)
+
+    if not entries[key]:
+        raise NotRecordedError(f"No recorded response for {key}.")
+
+    entry = entries[key].popleft()
+    await asyncio.sleep(entry["latency"] * settings["latency"])
+
+    return decode_response(method, url, entry)
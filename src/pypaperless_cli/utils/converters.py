@@ -6,6 +6,7 @@ import asyncio
 from typing import Any
 
 from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.const import DOCUMENT_EXPANSIONS, DOCUMENT_FIELDS, SUGGESTION_FIELDS
 
 
 def format_url(type_, *args) -> Any:
@@ -21,6 +22,76 @@ def format_url(type_, *args) -> Any:
         # subsequent validation will catch any error
         return value
 
+def query_filters(type_, *args) -> Any:
+    """Convert KEY=VALUE pairs into API query parameters."""
+
+    filters = {}
+
+    for kv in args:
+        k, sep, v = kv.partition("=")
+
+        if not sep or not k:
+            raise ValueError(f"Invalid filter \"{kv}\". Filters must be given as KEY=VALUE.")
+
+        filters[k] = v
+
+    return filters
+
+def boolean(value: Any) -> bool:
+    """Convert a boolean given as text (e.g. in CSV files)."""
+
+    if isinstance(value, bool):
+        return value
+
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "y"):
+        return True
+    if text in ("0", "false", "no", "n"):
+        return False
+
+    raise ValueError(f"\"{value}\" is not a boolean.")
+
+def document_ids(type_, *args) -> Any:
+    """Convert document IDs, keeping `-` which stands for IDs read from stdin."""
+
+    ids = []
+
+    for arg in args:
+        if arg == "-":
+            ids.append(arg)
+        elif arg.isdigit():
+            ids.append(int(arg))
+        else:
+            raise ValueError(f"Invalid document ID \"{arg}\". Use - to read IDs from stdin.")
+
+    return ids
+
+def _split_choices(args, choices, label: str) -> list:
+    """Split comma-separated values, validating them against the given choices."""
+
+    values = [v.strip() for arg in args for v in arg.split(",") if v.strip()]
+
+    unknown = [v for v in values if v not in choices]
+    if unknown:
+        raise ValueError(f"Unknown {label}: {', '.join(unknown)}. Must be any of {', '.join(choices)}.")
+
+    return list(dict.fromkeys(values))
+
+def document_fields(type_, *args) -> Any:
+    """Split comma-separated document fields, validating their names."""
+
+    return _split_choices(args, DOCUMENT_FIELDS, "document fields")
+
+def document_expansions(type_, *args) -> Any:
+    """Split comma-separated document sub-resources, validating their names."""
+
+    return _split_choices(args, DOCUMENT_EXPANSIONS, "document details")
+
+def suggestion_fields(type_, *args) -> Any:
+    """Split comma-separated document fields which can be set from suggestions, validating their names."""
+
+    return _split_choices(args, SUGGESTION_FIELDS, "suggestion fields")
+
 def tag_name_to_id(type_, *args) -> Any:
     """Determines ID for tag name."""
 
@@ -86,3 +157,37 @@ def custom_field_name_to_id(type_, *args) -> Any:
         })
     
     return params
+
+def _object_name_to_id(resource: str, label: str, value: str) -> int:
+    """Determines ID for the name of a correspondent, document type or storage path."""
+
+    async def get_id(name: str) -> int:
+        filters = {
+            "name__iexact": name
+        }
+        async with PaperlessAsyncAPI() as paperless:
+            async with getattr(paperless, resource).reduce(**filters) as filtered:
+                async for item in filtered:
+                    return item.id
+                else:
+                    raise ValueError(f"{label} \"{name}\" does not exist.")
+
+    if value.isdigit():
+        return int(value)
+
+    return asyncio.run(get_id(value))
+
+def correspondent_name_to_id(type_, *args) -> Any:
+    """Determines ID for correspondent name."""
+
+    return _object_name_to_id("correspondents", "Correspondent", args[0])
+
+def document_type_name_to_id(type_, *args) -> Any:
+    """Determines ID for document type name."""
+
+    return _object_name_to_id("document_types", "Document type", args[0])
+
+def storage_path_name_to_id(type_, *args) -> Any:
+    """Determines ID for storage path name."""
+
+    return _object_name_to_id("storage_paths", "Storage path", args[0])
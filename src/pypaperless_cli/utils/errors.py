@@ -0,0 +1,9 @@
+"""
+Reporting of errors.
+"""
+
+
+def describe(error: BaseException) -> str:
+    """Return the message of an exception, or its type if it has none (e.g. `asyncio.TimeoutError()`)."""
+
+    return str(error) or type(error).__name__
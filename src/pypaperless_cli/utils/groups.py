@@ -11,10 +11,12 @@ from pypaperless_cli.utils.validators import adhoc_xor_specific
 # Meta app
 meta_parameters_adhoc = Group("Ad-hoc Session Parameters", sort_key=0, help="")
 meta_parameters_specific = Group("Specific Session Parameters", sort_key=meta_parameters_adhoc.sort_key+1, help="")
+meta_parameters_traffic = Group("Traffic Recording Parameters", sort_key=meta_parameters_specific.sort_key+1, help="")
+meta_parameters_profiling = Group("Profiling Parameters", sort_key=meta_parameters_traffic.sort_key+1, help="")
 
 # "Regular" commands group
 # Basically cyclopt's default, but with an explicit sort_key to keep the group in upper position in the CLI's help
-commands = Group(name = "Commands", sort_key=meta_parameters_specific.sort_key+1)
+commands = Group(name = "Commands", sort_key=meta_parameters_profiling.sort_key+1)
 
 # Parameter groups
 arguments = Group(name = "Arguments", sort_key=0)
@@ -0,0 +1,230 @@
+"""
+Journals of long-running jobs, which allow resuming them.
+
+Bulk commands record the items (e.g. document IDs) they completed in a journal, an append-only file
+with one JSON object per line in the state directory of the current account. Resuming a job runs
+its command again, skipping completed items before even requesting them.
+
+Each journal starts with the job's command, followed by records of the total number of items, completed
+items (in checkpoints), (re)starts and the outcome of each run.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pypaperless_cli.utils.cache import state_dir
+from pypaperless_cli.utils.errors import describe
+
+# Journals of finished jobs are removed after this many days
+RETENTION_DAYS = 7
+
+settings: Dict[str, Any] = {
+    # Tokens of the command being run, as passed to the app
+    "command": (),
+    # ID of the job being resumed
+    "resume": None,
+}
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def jobs_dir() -> Path:
+    """Return (and create) the directory of journals of the current account."""
+
+    path = state_dir().joinpath("jobs")
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
+
+
+def read_records(path: Path) -> List[Dict[str, Any]]:
+    """Read the records of a journal, ignoring a last line cut off by a crash."""
+
+    records = []
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+
+    return records
+
+
+class Journal:
+    """The journal of a job."""
+
+    def __init__(self, path: Optional[Path], records: List[Dict[str, Any]]) -> None:
+        """Use the journal at the given path (or none, if `path` is `None`) with the given records."""
+
+        self.path = path
+        self.records = records
+        self.completed: Set[Any] = {item for r in records for item in r.get("done", [])}
+
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.path.stem if self.path else None
+
+
+    @property
+    def command(self) -> Tuple[str, ...]:
+        return tuple(self.records[0]["command"]) if self.records else ()
+
+
+    @classmethod
+    def create(cls, command: Iterable[str]) -> "Journal":
+        """Start the journal of a new job."""
+
+        prune()
+
+        journal = cls(jobs_dir().joinpath(f"{uuid.uuid4().hex[:8]}.jsonl"), [])
+        journal.append({"command": list(command), "started": now()})
+
+        return journal
+
+
+    @classmethod
+    def load(cls, id: str) -> "Journal":
+        """Load the journal of an existing job."""
+
+        path = jobs_dir().joinpath(f"{id}.jsonl")
+        if not path.is_file():
+            raise ValueError(f"Job \"{id}\" does not exist.")
+
+        return cls(path, read_records(path))
+
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if self.path is None:
+            return
+
+        self.records.append(record)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+    def total(self, total: int) -> None:
+        """Record the total number of items, if known."""
+
+        self.append({"total": total})
+
+
+    def done(self, items: Iterable[Any]) -> None:
+        """Record completed items as a checkpoint."""
+
+        items = [i for i in items if i not in self.completed]
+        if items:
+            self.completed.update(items)
+            self.append({"done": items, "at": now()})
+
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the job's progress.
+
+        The throughput only takes the time spent running into account, not the time between runs.
+        """
+
+        status = "running"
+        total = None
+        done = 0
+        elapsed = 0.0
+        start = last = None
+
+        for record in self.records:
+            at = record.get("started") or record.get("resumed") or record.get("at")
+            at = datetime.fromisoformat(at) if at else None
+
+            if "started" in record or "resumed" in record:
+                if start is not None and last is not None:
+                    elapsed += (last - start).total_seconds()
+                start = last = at
+                status = "running"
+            elif at is not None:
+                last = at
+
+            if "total" in record:
+                total = record["total"]
+            if "done" in record:
+                done += len(record["done"])
+            if "status" in record:
+                status = record["status"]
+
+        if start is not None and last is not None:
+            elapsed += (last - start).total_seconds()
+
+        return {
+            "id": self.id,
+            "command": " ".join(self.command),
+            "status": status,
+            "done": done,
+            "total": total,
+            "throughput": round(done / elapsed, 1) if elapsed > 0 else None,
+            "started": self.records[0]["started"] if self.records else None,
+            "updated": last.isoformat() if last else None,
+        }
+
+
+@contextmanager
+def journal(enabled: bool = True) -> Iterator[Journal]:
+    """Journal the command being run, resuming its job if requested.
+
+    Yields a journal which doesn't record anything if disabled (e.g. for small operations not worth resuming).
+    The outcome of the run is recorded when it ends.
+    """
+
+    if settings["resume"] is not None:
+        journal = Journal.load(settings["resume"])
+        journal.append({"resumed": now()})
+    elif enabled:
+        journal = Journal.create(settings["command"])
+    else:
+        journal = Journal(None, [])
+
+    try:
+        yield journal
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # Commands run by asyncio are cancelled on Ctrl+C
+        journal.append({"status": "interrupted", "at": now()})
+        raise
+    except BaseException as e:
+        journal.append({"status": "failed", "at": now(), "error": describe(e)})
+        raise
+    else:
+        journal.append({"status": "finished", "at": now()})
+
+
+def list_journals() -> List[Journal]:
+    """Return the journals of all jobs of the current account, most recent first."""
+
+    journals = [Journal(path, read_records(path)) for path in jobs_dir().glob("*.jsonl")]
+    journals = [j for j in journals if j.records]
+
+    return sorted(journals, key=lambda j: j.records[0].get("started", ""), reverse=True)
+
+
+def remove(id: str) -> None:
+    """Remove the journal of a job."""
+
+    path = Journal.load(id).path
+    os.remove(path)
+
+
+def prune() -> None:
+    """Remove journals of jobs which finished more than `RETENTION_DAYS` days ago."""
+
+    threshold = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+
+    for journal in list_journals():
+        summary = journal.summary()
+        if summary["status"] == "finished" and datetime.fromisoformat(summary["updated"]) < threshold:
+            os.remove(journal.path)
@@ -0,0 +1,246 @@
+"""
+Output of records as table, JSON, newline-delimited JSON or CSV.
+
+Records are written incrementally as they arrive, so memory usage doesn't grow with the number of records.
+JSON is serialized with `orjson` if it's installed. Tables are only rendered by rich if printed
+to a terminal, otherwise they're written as tab-separated values.
+"""
+
+import csv
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, List, Literal, Optional, Sequence, TextIO, Tuple
+
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+from rich import box
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+OutputFormat = Literal["table", "json", "ndjson", "csv"]
+
+# Number of rows rendered at once when printing tables to a terminal
+TABLE_CHUNK_SIZE = 500
+
+
+def dumps(data: Any, indent: bool = False) -> str:
+    """Serialize data to JSON, compact unless `indent` is given."""
+
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, default=str, option=options).decode()
+
+    if indent:
+        return json.dumps(data, ensure_ascii=False, default=str, indent=2)
+
+    return json.dumps(data, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+def column_label(column: str) -> str:
+    """Turn a field name into a column label."""
+
+    return "ID" if column == "id" else column.replace("_", " ").capitalize()
+
+
+def as_text(value: Any) -> Text:
+    """Turn a value into rich `Text`, leaving brackets in plain strings as they are."""
+
+    return value if isinstance(value, Text) else Text(str(value))
+
+
+class RecordWriter(ABC):
+    """Write records (dictionaries) one batch after another.
+
+    Use as context manager or call `close()` once all records are written.
+    """
+
+    # Separator for list values in text-based formats
+    list_separator = ", "
+
+    def __init__(self, columns: Sequence[str], file: Optional[TextIO] = None) -> None:
+        self.columns = list(columns)
+        self.file = file or sys.stdout
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def text(self, value: Any) -> str:
+        """Format a single value as text."""
+
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            return self.list_separator.join(self.text(v) for v in value)
+        if isinstance(value, dict):
+            return ", ".join(f"{k}={self.text(v)}" for k, v in value.items())
+
+        return str(value)
+
+    @abstractmethod
+    def write(self, records: Iterable[dict]) -> None:
+        """Write a batch of records."""
+
+    def close(self) -> None:
+        self.file.flush()
+
+
+class NDJSONWriter(RecordWriter):
+    """Write one JSON object per line.
+
+    Records are flushed as they're written, so consumers reading from a pipe can start right away.
+    """
+
+    def write(self, records: Iterable[dict]) -> None:
+        self.file.write("".join(dumps(record) + "\n" for record in records))
+        self.file.flush()
+
+
+class IDWriter(RecordWriter):
+    """Write only the `id` of each record, one per line, flushing as they're written."""
+
+    def write(self, records: Iterable[dict]) -> None:
+        self.file.write("".join(f"{record['id']}\n" for record in records))
+        self.file.flush()
+
+
+class JSONWriter(RecordWriter):
+    """Write a JSON array, one element per line."""
+
+    def __init__(self, columns: Sequence[str], file: Optional[TextIO] = None) -> None:
+        super().__init__(columns, file)
+        self.empty = True
+
+    def write(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.file.write(("[\n" if self.empty else ",\n") + dumps(record))
+            self.empty = False
+
+    def close(self) -> None:
+        self.file.write("[]\n" if self.empty else "\n]\n")
+        super().close()
+
+
+class CSVWriter(RecordWriter):
+    """Write comma-separated values with a fixed header."""
+
+    list_separator = "|"
+
+    def __init__(self, columns: Sequence[str], file: Optional[TextIO] = None, header: bool = True) -> None:
+        """Write rows of the given columns, starting with a header row unless `header` is `False` (e.g. when appending)."""
+
+        super().__init__(columns, file)
+        self.writer = csv.writer(self.file)
+        if header:
+            self.writer.writerow(self.columns)
+
+    def write(self, records: Iterable[dict]) -> None:
+        self.writer.writerows([self.text(record.get(c)) for c in self.columns] for record in records)
+
+
+class TableWriter(RecordWriter):
+    """Print a table.
+
+    On a terminal, rows are rendered by rich in chunks of `TABLE_CHUNK_SIZE` rows,
+    otherwise they're written as tab-separated values without any rendering.
+    """
+
+    def __init__(self, columns: Sequence[str], file: Optional[TextIO] = None) -> None:
+        super().__init__(columns, file)
+        self.console = Console(file=self.file) if self.file.isatty() else None
+        self.rows: List[List[str]] = []
+        self.header = True
+
+        if self.console is None:
+            self.file.write("\t".join(column_label(c) for c in self.columns) + "\n")
+
+    def write(self, records: Iterable[dict]) -> None:
+        if self.console is None:
+            self.file.write("".join(
+                "\t".join(self.text(record.get(c)).replace("\t", " ").replace("\n", "; ") for c in self.columns) + "\n"
+                for record in records
+            ))
+            return
+
+        for record in records:
+            self.rows.append([self.text(record.get(c)) for c in self.columns])
+
+            if len(self.rows) >= TABLE_CHUNK_SIZE:
+                self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+
+        table = Table(box=box.SIMPLE_HEAD, show_header=self.header)
+        for column in self.columns:
+            table.add_column(column_label(column))
+
+        for row in self.rows:
+            # Values are data, not markup
+            table.add_row(*[as_text(value) for value in row])
+
+        self.console.print(table)
+        self.rows = []
+        self.header = False
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+
+WRITERS = {
+    "table": TableWriter,
+    "json": JSONWriter,
+    "ndjson": NDJSONWriter,
+    "csv": CSVWriter,
+}
+
+
+def writer(format: str, columns: Sequence[str], file: Optional[TextIO] = None) -> RecordWriter:
+    """Return a writer for the given output format."""
+
+    return WRITERS[format](columns, file)
+
+
+def print_json(data: Any, file: Optional[TextIO] = None) -> None:
+    """Print a single object as indented JSON."""
+
+    (file or sys.stdout).write(dumps(data, indent=True) + "\n")
+
+
+def print_fields(rows: List[Tuple[Any, Any]], file: Optional[TextIO] = None) -> None:
+    """Print labelled values, one per row.
+
+    Labels may contain rich markup, values are either plain strings or rich `Text`.
+    Styles are only rendered on a terminal.
+    """
+
+    file = file or sys.stdout
+
+    if file.isatty():
+        table = Table.grid(padding=(0,3))
+        table.add_column(style="blue", no_wrap=True)
+        table.add_column(style="green", overflow="fold")
+
+        for label, value in rows:
+            table.add_row(label, as_text(value))
+
+        Console(file=file).print(table)
+        return
+
+    labels = [Text.from_markup(label).plain for label, _ in rows]
+    width = max(map(len, labels), default=0)
+
+    for label, (_, value) in zip(labels, rows):
+        lines = as_text(value).plain.split("\n")
+        file.write(f"{label.ljust(width)}   {lines[0]}".rstrip() + "\n")
+        for line in lines[1:]:
+            file.write(f"{'':{width}}   {line}".rstrip() + "\n")
@@ -0,0 +1,135 @@
+"""
+Helpers for paginated API endpoints.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+
+from pypaperless import Paperless
+
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils.stdin import id_chunks
+
+
+async def stream_pages(
+        paperless: Paperless,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        page_size: int = 150
+    ) -> AsyncIterator[List[dict]]:
+    """Yield the raw results of a paginated endpoint page by page.
+
+    The next page is requested while the current one is being processed by the caller.
+    Results are passed as plain dictionaries, skipping the construction of pypaperless models.
+    """
+
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+
+    # Mimic pypaperless' handling of list values for `__in` filters
+    for k, v in params.items():
+        if isinstance(v, (list, tuple, set)):
+            params[k] = ",".join(map(str, v))
+
+    params["page_size"] = page_size
+
+    async def fetch(page: int) -> dict:
+        return await paperless.request_json("get", path, params={**params, "page": page})
+
+    page = 1
+    pending = asyncio.ensure_future(fetch(page))
+
+    try:
+        while pending is not None:
+            data = await pending
+            pending = None
+
+            if data.get("next"):
+                page += 1
+                pending = asyncio.ensure_future(fetch(page))
+
+            yield data["results"]
+
+    finally:
+        # Don't leave a prefetched page behind if the caller stops early
+        if pending is not None:
+            pending.cancel()
+
+
+async def stream_documents(
+        paperless: Paperless,
+        params: Optional[Dict[str, Any]] = None,
+        ids: Optional[List[Union[int, str]]] = None,
+        page_size: int = 150,
+        exclude: Optional[Set[int]] = None
+    ) -> AsyncIterator[List[dict]]:
+    """Yield raw documents page by page, either matching the given filters or the given IDs.
+
+    Only if `ids` is `None` all documents matching the filters are yielded, an empty list yields nothing.
+
+    IDs are requested in chunks of `page_size` to keep request URLs reasonably short.
+    `-` reads IDs from stdin, whose chunks are requested as soon as they arrive.
+    Documents in `exclude` (e.g. completed by a previous run of a job) aren't yielded. Given IDs of
+    such documents aren't requested at all, documents matching filters are left out of their pages.
+    """
+
+    if ids is None:
+        async for results in stream_pages(paperless, API_PATH["documents"], params, page_size):
+            if exclude:
+                results = [document for document in results if document["id"] not in exclude]
+            yield results
+        return
+
+    async for chunk in id_chunks(ids, page_size):
+        if exclude:
+            chunk = [id for id in chunk if id not in exclude]
+            if not chunk:
+                continue
+
+        async for results in stream_pages(paperless, API_PATH["documents"], {**(params or {}), "id__in": chunk}, page_size):
+            yield results
+
+
+async def stream_modified(
+        paperless: Paperless,
+        params: Optional[Dict[str, Any]] = None,
+        cursor: Tuple[Optional[str], Optional[int]] = (None, None),
+        page_size: int = 100
+    ) -> AsyncIterator[List[dict]]:
+    """Yield raw documents modified after the given cursor page by page, in order of modification.
+
+    The cursor is the modification time and ID of the last document seen (both may be `None`).
+    Rather than turning pages, the first page is requested again after each page, continuing after
+    the last document (keyset pagination). Thus documents modified meanwhile don't shift later pages,
+    they're yielded again at the end instead. `params` must request the fields `id` and `modified`, if limited.
+
+    Documents sharing the modification time of the cursor are paged through separately, ordered by ID,
+    leaving out those up to the cursor's ID (the API can't filter IDs by range).
+    """
+
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+    modified, id = cursor
+
+    # Continue in the middle of documents modified at the same time
+    remaining_ties = modified is not None and id is not None
+
+    while True:
+        if remaining_ties:
+            ties = {**params, "modified__gte": modified, "modified__lte": modified, "ordering": "id"}
+            async for results in stream_pages(paperless, API_PATH["documents"], ties, page_size):
+                results = [d for d in results if id is None or d["id"] > id]
+                if results:
+                    yield results
+
+        query: Dict[str, Any] = {**params, "ordering": "modified,id", "page_size": page_size}
+        if modified is not None:
+            query["modified__gt"] = modified
+
+        results = (await paperless.request_json("get", API_PATH["documents"], params=query))["results"]
+        if not results:
+            return
+
+        yield results
+        modified, id = results[-1]["modified"], results[-1]["id"]
+
+        # A full page might have left out further documents modified at the same time as its last one
+        remaining_ties = len(results) == page_size
@@ -0,0 +1,133 @@
+"""
+Profiling of commands.
+
+Commands can be run under a profiler to attribute the CLI's own CPU time, e.g. to argument parsing,
+converters, construction of pypaperless models or rendering of output. Profiles are written either
+as pstats files (deterministic profiling with cProfile) or as collapsed stacks (sampling profiling),
+the input format of flame graph tools like flamegraph.pl or speedscope.
+"""
+
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Iterator, Optional
+
+# Suffixes of files written as collapsed stacks, anything else is written as pstats
+COLLAPSED_SUFFIXES = (".folded", ".collapsed", ".txt")
+
+# Deepest stack recorded by the sampling profiler
+MAX_DEPTH = 256
+
+
+@lru_cache(maxsize=None)
+def code_name(code: CodeType) -> str:
+    """Name a function by its (shortened) file, e.g. `stream_pages (pypaperless_cli/utils/pages.py:12)`."""
+
+    filename = code.co_filename
+
+    # Strip the longest prefix of the import path, leaving the module's location within its package
+    prefixes = [p for p in sys.path if p and filename.startswith(p + os.sep)]
+    if prefixes:
+        filename = filename[len(max(prefixes, key=len)) + 1:]
+
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+def is_idle(frame: FrameType) -> bool:
+    """Whether a thread is waiting for I/O in the event loop."""
+
+    return frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py")
+
+
+class Sampler:
+    """Sample the stack of a thread at a fixed interval, counting identical stacks.
+
+    Samples taken while the event loop waits for I/O are counted separately, so the collapsed
+    stacks only show where CPU time is spent.
+    """
+
+    def __init__(self, interval: float, thread: Optional[int] = None) -> None:
+        """Sample the given thread (defaults to the current one) every `interval` seconds."""
+
+        self.interval = interval
+        self.thread = thread or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.idle = 0
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.run, daemon=True)
+
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread)
+            if frame is None:
+                continue
+
+            if is_idle(frame):
+                self.idle += 1
+                continue
+
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(code_name(frame.f_code))
+                frame = frame.f_back
+
+            self.stacks[";".join(reversed(stack))] += 1
+
+
+    def start(self) -> None:
+        self.sampler.start()
+
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.sampler.join()
+
+
+    def write(self, path: Path) -> None:
+        """Write collapsed stacks, one line of semicolon-separated frames and their count per stack."""
+
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile(path: Path, interval: float = 0.001) -> Iterator[None]:
+    """Profile the enclosed code, writing the profile to the given file when done.
+
+    Parameters
+    ----------
+    path : Path
+        File to write to. Files ending with `.folded`, `.collapsed` or `.txt` are written as collapsed stacks
+        of a sampling profiler, anything else (e.g. `.prof`) as pstats of a deterministic profiler.
+    interval : float
+        Seconds between samples of the sampling profiler.
+    """
+
+    if Path(path).suffix.lower() in COLLAPSED_SUFFIXES:
+        sampler = Sampler(interval)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.write(path)
+            samples = sum(sampler.stacks.values())
+            print(f"Profile written to {path} ({samples} samples, {sampler.idle} more waiting for I/O).", file=sys.stderr)
+
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            print(f"Profile written to {path}. Inspect it with `python -m pstats {path}` or e.g. snakeviz.", file=sys.stderr)
@@ -0,0 +1,155 @@
+"""
+Lookup tables for objects referenced by documents.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+
+from pypaperless import Paperless
+
+from pypaperless_cli.const import API_PATH
+from pypaperless_cli.utils.pages import stream_pages
+
+# Human readable names of the lookup tables
+REFERENCE_NAMES = {
+    "tags": "Tag",
+    "correspondents": "Correspondent",
+    "document_types": "Document type",
+    "storage_paths": "Storage path",
+    "custom_fields": "Custom field",
+}
+
+# Document fields referring to other objects, mapped to the lookup table resolving their names
+DOCUMENT_REFERENCES = {
+    "correspondent": "correspondents",
+    "document_type": "document_types",
+    "storage_path": "storage_paths",
+    "tags": "tags",
+    "custom_fields": "custom_fields",
+}
+
+class ReferenceTables:
+    """Map IDs of tags, correspondents, document types, storage paths and custom fields to their names.
+
+    All tables are fetched at once, so resolving names of many documents
+    doesn't require any further request.
+    """
+
+    def __init__(self) -> None:
+        """Instantiate empty lookup tables."""
+
+        self.tags: Dict[int, str] = {}
+        self.correspondents: Dict[int, str] = {}
+        self.document_types: Dict[int, str] = {}
+        self.storage_paths: Dict[int, str] = {}
+        self.custom_fields: Dict[int, dict] = {}
+
+
+    @classmethod
+    async def load(cls, paperless: Paperless, kinds: Optional[Iterable[str]] = None) -> "ReferenceTables":
+        """Fetch lookup tables concurrently.
+
+        Parameters
+        ----------
+        paperless : Paperless
+            The API client to use.
+        kinds : Iterable[str]
+            Only fetch the given lookup tables (e.g. `tags`, `custom_fields`). Defaults to all of them.
+        """
+
+        tables = cls()
+        kinds = set(REFERENCE_NAMES) if kinds is None else set(kinds)
+
+        async def fetch(kind: str) -> None:
+            fields = "id,name,data_type" if kind == "custom_fields" else "id,name"
+            table = getattr(tables, kind)
+
+            async for results in stream_pages(paperless, API_PATH[kind], {"fields": fields}, page_size=1000):
+                for item in results:
+                    table[item["id"]] = item if kind == "custom_fields" else item["name"]
+
+        await asyncio.gather(*[fetch(kind) for kind in REFERENCE_NAMES if kind in kinds])
+
+        return tables
+
+
+    def tag_names(self, ids: Optional[List[int]]) -> List[str]:
+        """Return the names of the given tags."""
+
+        return [self.tags.get(i, str(i)) for i in ids or []]
+
+
+    def custom_field_name(self, id: int) -> str:
+        """Return the name of the given custom field."""
+
+        field = self.custom_fields.get(id)
+        return field["name"] if field else str(id)
+
+
+    def resolve(self, kind: str, value: str|int) -> int:
+        """Return the ID of an object given its ID or exact (case-insensitive) name.
+
+        Parameters
+        ----------
+        kind : str
+            One of `tags`, `correspondents`, `document_types`, `storage_paths` or `custom_fields`.
+        value : str|int
+            ID or name of the object.
+        """
+
+        table = getattr(self, kind)
+
+        if isinstance(value, int) or str(value).isdigit():
+            if int(value) in table:
+                return int(value)
+        else:
+            name = str(value).casefold()
+            for id, item in table.items():
+                if (item["name"] if isinstance(item, dict) else item).casefold() == name:
+                    return id
+
+        raise ValueError(f"{REFERENCE_NAMES[kind]} \"{value}\" does not exist.")
+
+
+def document_record(document: dict, fields: List[str], references: ReferenceTables) -> Dict[str, Any]:
+    """Pick the given fields of a raw document, resolving IDs to names.
+
+    Custom fields are returned as a mapping of their names to their values.
+    """
+
+    record = {}
+
+    for field in fields:
+        value = document.get(field)
+
+        if field == "tags":
+            value = references.tag_names(value)
+        elif field == "custom_fields":
+            value = {references.custom_field_name(f["field"]): f["value"] for f in value or []}
+        elif field in DOCUMENT_REFERENCES and value is not None:
+            value = getattr(references, DOCUMENT_REFERENCES[field]).get(value, value)
+
+        record[field] = value
+
+    return record
+
+
+def describe_changes(changes: Dict[str, Any], references: ReferenceTables) -> str:
+    """Describe document changes in a human readable way."""
+
+    lines = []
+
+    if "add_tags" in changes:
+        lines.append("+ " + ", ".join(references.tag_names(changes["add_tags"])))
+    if "remove_tags" in changes:
+        lines.append("- " + ", ".join(references.tag_names(changes["remove_tags"])))
+    if "correspondent" in changes:
+        lines.append(f"Correspondent: {references.correspondents.get(changes['correspondent'])}")
+    if "document_type" in changes:
+        lines.append(f"Document type: {references.document_types.get(changes['document_type'])}")
+    if "storage_path" in changes:
+        lines.append(f"Storage path: {references.storage_paths.get(changes['storage_path'])}")
+    for id, value in changes.get("custom_fields", {}).items():
+        lines.append(f"{references.custom_field_name(id)}: {value}")
+
+    return "\n".join(lines)
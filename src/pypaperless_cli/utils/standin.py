@@ -0,0 +1,241 @@
+"""
+A stand-in for the Paperless-ngx API, serving synthetic documents from memory.
+
+Only the endpoints used by `pngx bench` are implemented, closely enough to exercise the
+CLI's API client. Any token is accepted. It's meant for testing, not for simulating
+the performance characteristics of a real server (apart from a fixed latency).
+
+Lists of documents and objects support the filters the CLI relies on. Any other filter is
+rejected with an error, rather than ignored, so nothing passes against the stand-in by accident.
+"""
+
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Set
+
+from aiohttp import web
+
+# Objects referenced by synthetic documents
+OBJECT_NAMES = {
+    "tags": ["inbox", "invoice", "receipt", "contract", "tax", "insurance", "private", "reviewed"],
+    "correspondents": ["ACME", "Bank", "Utility", "Insurance", "Employer", "Landlord"],
+    "document_types": ["Invoice", "Letter", "Receipt", "Contract", "Statement"],
+    "storage_paths": ["Archive", "Taxes"],
+    "custom_fields": ["Amount", "Due date"],
+}
+
+WORDS = ["invoice", "total", "amount", "payment", "contract", "insurance", "receipt", "account", "statement", "tax", "letter", "order"]
+
+API_VERSION = "2.5.3"
+
+# The synthetic documents of an application, e.g. for tests to set up specific documents
+DOCUMENTS = web.AppKey("documents", dict)
+
+# Query parameters of lists which aren't filters
+LIST_PARAMS = ("page", "page_size", "fields", "ordering", "truncate_content")
+
+
+def id_set(value: str) -> Set[int]:
+    """Parse a comma-separated list of IDs."""
+
+    return {int(i) for i in value.split(",") if i}
+
+
+def compare_time(field: str, operator: str) -> Callable[[str, Dict[str, Any]], bool]:
+    """Return a filter comparing a timestamp of documents."""
+
+    def matches(value: str, document: Dict[str, Any]) -> bool:
+        given = datetime.fromisoformat(value)
+        actual = datetime.fromisoformat(document[field])
+        return {"gt": actual > given, "gte": actual >= given, "lt": actual < given, "lte": actual <= given}[operator]
+
+    return matches
+
+
+# Document filters, given the value of the filter and a document
+DOCUMENT_FILTERS: Dict[str, Callable[[str, Dict[str, Any]], bool]] = {
+    "id": lambda v, d: d["id"] == int(v),
+    "id__in": lambda v, d: d["id"] in id_set(v),
+    "title__icontains": lambda v, d: v.lower() in d["title"].lower(),
+    "content__icontains": lambda v, d: v.lower() in d["content"].lower(),
+    "query": lambda v, d: all(w in d["content"] or w in d["title"].lower() for w in v.lower().split()),
+    "tags__id__all": lambda v, d: id_set(v) <= set(d["tags"]),
+    "tags__id__in": lambda v, d: bool(id_set(v) & set(d["tags"])),
+    "tags__id__none": lambda v, d: not id_set(v) & set(d["tags"]),
+    **{
+        f"{field}__id": (lambda field: lambda v, d: d[field] == int(v))(field)
+        for field in ("correspondent", "document_type", "storage_path")
+    },
+    **{
+        f"{field}__id__in": (lambda field: lambda v, d: d[field] in id_set(v))(field)
+        for field in ("correspondent", "document_type", "storage_path")
+    },
+    **{
+        f"{field}__{operator}": compare_time(field, operator)
+        for field in ("created", "added", "modified") for operator in ("gt", "gte", "lt", "lte")
+    },
+}
+
+# Object filters, given the value of the filter and an object
+OBJECT_FILTERS: Dict[str, Callable[[str, Dict[str, Any]], bool]] = {
+    "id__in": lambda v, o: o["id"] in id_set(v),
+    "name__iexact": lambda v, o: o["name"].lower() == v.lower(),
+}
+
+
+def synthetic_documents(count: int, seed: int = 0) -> Dict[int, Dict[str, Any]]:
+    """Generate documents with random metadata and content."""
+
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    documents = {}
+
+    for id in range(1, count + 1):
+        created = start + timedelta(hours=rng.randrange(5 * 365 * 24))
+        words = rng.choices(WORDS, k=60)
+
+        documents[id] = {
+            "id": id,
+            "title": f"{rng.choice(OBJECT_NAMES['document_types'])} {' '.join(words[:2])} {id}",
+            "content": " ".join(words),
+            "created": created.isoformat(),
+            "created_date": created.date().isoformat(),
+            "modified": created.isoformat(),
+            "added": created.isoformat(),
+            "archive_serial_number": None,
+            "correspondent": rng.randrange(1, len(OBJECT_NAMES["correspondents"]) + 1),
+            "document_type": rng.randrange(1, len(OBJECT_NAMES["document_types"]) + 1),
+            "storage_path": None,
+            "tags": sorted(rng.sample(range(1, len(OBJECT_NAMES["tags"]) + 1), rng.randrange(4))),
+            "custom_fields": [],
+            "notes": [],
+            "original_file_name": f"{id}.pdf",
+            "archived_file_name": f"{id}.pdf",
+            "mime_type": "application/pdf",
+            "page_count": 1,
+            "owner": 1,
+            "user_can_change": True,
+            "is_shared_by_requester": False,
+        }
+
+    return documents
+
+
+def create_app(documents: int = 1000, latency: float = 0.0) -> web.Application:
+    """Create the stand-in application.
+
+    Parameters
+    ----------
+    documents : int
+        Number of synthetic documents.
+    latency : float
+        Seconds each request is delayed.
+    """
+
+    docs = synthetic_documents(documents)
+    objects = {
+        kind: [{"id": i, "name": name, "document_count": 0, "data_type": "string"} for i, name in enumerate(names, 1)]
+        for kind, names in OBJECT_NAMES.items()
+    }
+    for storage_path in objects["storage_paths"]:
+        storage_path["path"] = f"{storage_path['name'].lower()}/{{title}}"
+
+    def paginate(request: web.Request, items: List[Dict[str, Any]], filters: Dict[str, Callable[[str, Dict[str, Any]], bool]]) -> web.Response:
+        query = request.query
+
+        unknown = [k for k in query if k not in filters and k not in LIST_PARAMS]
+        if unknown:
+            return web.json_response({k: ["Unsupported filter."] for k in unknown}, status=400)
+
+        try:
+            for key, match in filters.items():
+                if key in query:
+                    items = [item for item in items if match(query[key], item)]
+
+            for field in reversed(query.get("ordering", "id").split(",")):
+                name = field.removeprefix("-")
+                if not items or name not in items[0]:
+                    continue
+                items = sorted(items, key=lambda item: (item[name] is not None, item[name]), reverse=field.startswith("-"))
+
+            page = int(query.get("page", 1))
+            size = int(query.get("page_size", 25))
+        except ValueError as e:
+            return web.json_response({"detail": f"Invalid filter value: {e}"}, status=400)
+
+        chunk = items[(page - 1) * size:page * size]
+
+        if page > 1 and not chunk:
+            return web.json_response({"detail": "Invalid page."}, status=404)
+
+        if "fields" in query:
+            fields = query["fields"].split(",")
+            chunk = [{k: v for k, v in item.items() if k in fields} for item in chunk]
+
+        return web.json_response({
+            "count": len(items),
+            "next": f"{request.url.with_query({**query, 'page': page + 1})}" if page * size < len(items) else None,
+            "previous": None,
+            "all": [item["id"] for item in items],
+            "results": chunk,
+        })
+
+    @web.middleware
+    async def delay(request: web.Request, handler: Any) -> web.StreamResponse:
+        if latency:
+            await asyncio.sleep(latency)
+        return await handler(request)
+
+    async def index(request: web.Request) -> web.Response:
+        resources = ["documents", "tags", "correspondents", "document_types", "storage_paths", "custom_fields", "saved_views", "tasks", "users", "groups"]
+        return web.json_response({r: f"{request.url.origin()}/api/{r}/" for r in resources}, headers={"X-Version": API_VERSION})
+
+    async def profile(request: web.Request) -> web.Response:
+        return web.json_response({"username": "bench"})
+
+    async def list_documents(request: web.Request) -> web.Response:
+        return paginate(request, list(docs.values()), DOCUMENT_FILTERS)
+
+    async def document(request: web.Request) -> web.Response:
+        id = int(request.match_info["id"])
+        if id not in docs:
+            return web.json_response({"detail": "Not found."}, status=404)
+
+        if request.method == "PATCH":
+            docs[id].update(await request.json())
+            docs[id]["modified"] = datetime.now(timezone.utc).isoformat()
+
+        return web.json_response(docs[id])
+
+    async def bulk_edit(request: web.Request) -> web.Response:
+        await request.json()
+        return web.json_response({"result": "OK"})
+
+    async def post_document(request: web.Request) -> web.Response:
+        await request.post()
+        return web.json_response(str(uuid.uuid4()))
+
+    def list_objects(kind: str) -> Any:
+        async def handler(request: web.Request) -> web.Response:
+            return paginate(request, objects[kind], OBJECT_FILTERS)
+        return handler
+
+    async def tasks(request: web.Request) -> web.Response:
+        return web.json_response([])
+
+    app = web.Application(middlewares=[delay], client_max_size=1024**3)
+    app[DOCUMENTS] = docs
+    app.add_routes([
+        web.get("/api/", index),
+        web.get("/api/profile/", profile),
+        web.get("/api/documents/", list_documents),
+        web.route("*", "/api/documents/{id:\\d+}/", document),
+        web.post("/api/documents/bulk_edit/", bulk_edit),
+        web.post("/api/documents/post_document/", post_document),
+        web.get("/api/tasks/", tasks),
+        *[web.get(f"/api/{kind}/", list_objects(kind)) for kind in objects],
+    ])
+
+    return app
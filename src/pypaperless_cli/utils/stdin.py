@@ -0,0 +1,136 @@
+"""
+Reading document IDs from standard input.
+
+Commands accepting document IDs read them from stdin if given `-`, which allows piping commands
+into each other, e.g. `pngx document list --ids | pngx document edit - --add-tags reviewed`.
+Each line contains a document ID, a JSON object with an `id` key (as printed by `--format ndjson`)
+or a row of tab- or comma-separated values starting with the ID (as printed by `--format table` or `csv`).
+
+IDs are passed on in chunks as they arrive, so consumers start working before the producer finished.
+"""
+
+import asyncio
+import json
+import re
+import sys
+import threading
+from typing import AsyncIterator, Iterable, List, Optional, Union
+
+# Marks reading IDs from stdin
+STDIN = "-"
+
+# Seconds without new input after which an incomplete chunk is passed on
+IDLE_TIMEOUT = 0.5
+
+# Separators of values in a row
+SEPARATOR = re.compile(r"[\t,; ]")
+
+
+def parse_id(line: str) -> Optional[int]:
+    """Return the document ID of a line or `None` if the line doesn't start with one."""
+
+    line = line.strip()
+
+    if line.startswith("{"):
+        try:
+            return int(json.loads(line)["id"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    try:
+        return int(SEPARATOR.split(line, maxsplit=1)[0])
+    except ValueError:
+        return None
+
+
+async def read_ids(chunk_size: int, stream=None) -> AsyncIterator[List[int]]:
+    """Yield document IDs read line by line in chunks of at most `chunk_size`.
+
+    Chunks are passed on as soon as they are full or no new line arrived for a moment.
+    A first line without ID is skipped as header, any other raises a `ValueError`.
+    """
+
+    stream = stream or sys.stdin
+    loop = asyncio.get_running_loop()
+    # Bounded, so the reader waits for a slow consumer instead of buffering all of stdin
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * chunk_size)
+
+    def put(line: Optional[str]) -> None:
+        coroutine = queue.put(line)
+        try:
+            future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        except RuntimeError:
+            coroutine.close()
+            raise
+        future.result()
+
+    def read() -> None:
+        # Reading blocks, thus happens in a thread of its own. It's a daemon so it doesn't keep the CLI alive.
+        try:
+            try:
+                for line in stream:
+                    put(line)
+            finally:
+                put(None)
+
+        except RuntimeError:
+            # The event loop was closed as the consumer stopped early
+            pass
+
+    threading.Thread(target=read, daemon=True).start()
+
+    chunk: List[int] = []
+    number = 0
+
+    while True:
+        try:
+            line = await (asyncio.wait_for(queue.get(), IDLE_TIMEOUT) if chunk else queue.get())
+        except asyncio.TimeoutError:
+            yield chunk
+            chunk = []
+            continue
+
+        if line is None:
+            break
+
+        number += 1
+        if not line.strip():
+            continue
+
+        id = parse_id(line)
+        if id is None:
+            if number == 1:
+                continue
+            raise ValueError(f"Line {number} of standard input doesn't contain a document ID: {line.strip()[:80]}")
+
+        chunk.append(id)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+async def id_chunks(ids: Iterable[Union[int, str]], chunk_size: int) -> AsyncIterator[List[int]]:
+    """Yield the given document IDs in chunks, reading them from stdin in place of `-`."""
+
+    chunk: List[int] = []
+
+    for id in ids:
+        if id != STDIN:
+            chunk.append(id)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+            continue
+
+        if chunk:
+            yield chunk
+            chunk = []
+
+        async for ids_read in read_ids(chunk_size):
+            yield ids_read
+
+    if chunk:
+        yield chunk
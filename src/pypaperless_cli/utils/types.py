@@ -21,3 +21,12 @@ CustomFieldKeyValue = Annotated[str|int, Parameter(
     converter = converters.custom_field_name_to_id,
     validator = validators.custom_field_exists
     )]
+
+# Variadic document IDs, which are optional if documents can be selected by filters as well.
+# `-` reads IDs from stdin.
+DocumentIDs = Annotated[int|str, Parameter(
+    required = False,
+    show_default = False,
+    allow_leading_hyphen = True,
+    converter = converters.document_ids
+    )]
@@ -0,0 +1,79 @@
+"""
+Fixtures shared by tests.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
+
+import pytest
+from aiohttp import web
+
+from pypaperless_cli.utils.standin import create_app
+
+
+@contextmanager
+def serve(app: web.Application) -> Iterator[str]:
+    """Serve an application in a background thread. Yields its URL."""
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app, access_log=None)
+
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", 0).start())
+    host, port = runner.addresses[0][:2]
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+
+@pytest.fixture
+def server() -> Iterator[Callable[[web.Application], str]]:
+    """Serve applications for the duration of a test. Yields a function starting one and returning its URL."""
+
+    with ExitStack() as stack:
+        yield lambda app: stack.enter_context(serve(app))
+
+
+@pytest.fixture
+def standin() -> Iterator[Tuple[web.Application, str]]:
+    """Serve the stand-in API. Yields its application and URL."""
+
+    app = create_app(documents=100)
+
+    with serve(app) as url:
+        yield app, url
+
+
+@pytest.fixture
+def pngx(standin: Tuple[web.Application, str], tmp_path: Path):
+    """Run pngx against the stand-in, with configuration and state in a temporary directory."""
+
+    _, url = standin
+    env = {
+        **os.environ,
+        "HOME": str(tmp_path),
+        "XDG_CONFIG_HOME": str(tmp_path.joinpath("config")),
+        "XDG_CACHE_HOME": str(tmp_path.joinpath("cache")),
+        "XDG_STATE_HOME": str(tmp_path.joinpath("state")),
+        "PYTHONPATH": os.pathsep.join([str(Path(__file__).parents[1].joinpath("src")), os.environ.get("PYTHONPATH", "")]),
+    }
+
+    def run(*args: str, input: str = "") -> subprocess.CompletedProcess:
+        command = [sys.executable, "-c", "from pypaperless_cli.app import launch; launch()", "--host", url, "--token", "secret", *args]
+        return subprocess.run(command, input=input, capture_output=True, text=True, env=env, cwd=tmp_path, timeout=60)
+
+    return run
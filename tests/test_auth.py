@@ -0,0 +1,15 @@
+"""
+Tests of managing accounts.
+"""
+
+import json
+import subprocess
+from typing import Callable
+
+
+def test_list_accounts_as_ndjson(pngx: Callable[..., subprocess.CompletedProcess]) -> None:
+    result = pngx("auth", "list", "--format", "ndjson")
+
+    assert result.returncode == 0, result.stderr
+    accounts = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [account["current"] for account in accounts] == [True]
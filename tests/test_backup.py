@@ -0,0 +1,83 @@
+"""
+Tests of backing up documents.
+"""
+
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Callable
+
+from aiohttp import web
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.commands.backup import ObjectStore
+from pypaperless_cli.config import Account
+
+CONTENT = b"%PDF-1.4 " + bytes(range(256)) * 64
+CHECKSUM = hashlib.md5(CONTENT).hexdigest()
+
+
+def files_app() -> web.Application:
+    """Serve a single file supporting range requests, like Paperless-ngx."""
+
+    async def download(request: web.Request) -> web.Response:
+        if request.http_range.start is not None:
+            start = request.http_range.start
+            if start >= len(CONTENT):
+                return web.Response(status=416)
+            return web.Response(body=CONTENT[start:], status=206)
+
+        return web.Response(body=CONTENT)
+
+    async def index(request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    app = web.Application()
+    app.add_routes([web.get("/api/", index), web.get("/file/", download)])
+
+    return app
+
+
+def fetch(url: str, store: ObjectStore) -> int:
+    async def run() -> int:
+        async with PaperlessAsyncAPI(Account(url, token="secret")) as paperless:
+            return await store.fetch(paperless, CHECKSUM, "/file/", {})
+
+    return asyncio.run(run())
+
+
+def test_partial_download_is_resumed(server: Callable[[web.Application], str], tmp_path: Path) -> None:
+    store = ObjectStore(tmp_path)
+    part = store.path(CHECKSUM).with_name(f"{CHECKSUM}.part")
+    part.parent.mkdir(parents=True)
+    part.write_bytes(CONTENT[:1000])
+
+    url = server(files_app())
+    assert fetch(url, store) == len(CONTENT) - 1000
+
+    assert store.path(CHECKSUM).read_bytes() == CONTENT
+
+
+def test_complete_partial_download_is_stored(server: Callable[[web.Application], str], tmp_path: Path) -> None:
+    store = ObjectStore(tmp_path)
+    part = store.path(CHECKSUM).with_name(f"{CHECKSUM}.part")
+    part.parent.mkdir(parents=True)
+    part.write_bytes(CONTENT)
+
+    url = server(files_app())
+    assert fetch(url, store) == 0
+
+    assert store.path(CHECKSUM).read_bytes() == CONTENT
+    assert not part.exists()
+
+
+def test_partial_download_beyond_the_file_starts_over(server: Callable[[web.Application], str], tmp_path: Path) -> None:
+    store = ObjectStore(tmp_path)
+    part = store.path(CHECKSUM).with_name(f"{CHECKSUM}.part")
+    part.parent.mkdir(parents=True)
+    part.write_bytes(CONTENT + b"garbage")
+
+    url = server(files_app())
+    assert fetch(url, store) == len(CONTENT)
+
+    assert store.path(CHECKSUM).read_bytes() == CONTENT
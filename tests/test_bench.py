@@ -0,0 +1,42 @@
+"""
+Tests of benchmarking servers.
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from pypaperless_cli.commands.bench import Workload, parse_mix
+
+
+class Recorder:
+    """Record the parameters of requests instead of sending them."""
+
+    def __init__(self) -> None:
+        self.params: List[Dict[str, Any]] = []
+
+    async def request_json(self, method: str, path: str, params: Dict[str, Any]) -> dict:
+        self.params.append(params)
+        return {}
+
+
+def test_list_covers_last_partial_page() -> None:
+    recorder = Recorder()
+    workload = Workload(recorder, seed=1)
+    workload.ids = list(range(1, 31))
+
+    async def run() -> None:
+        for _ in range(50):
+            await workload.list()
+
+    asyncio.run(run())
+
+    assert {params["page"] for params in recorder.params} == {1, 2}
+
+
+def test_mix_rejects_negative_weights() -> None:
+    assert parse_mix("list=3,show=0", writes=False) == {"list": 3, "show": 0}
+
+    with pytest.raises(ValueError, match="negative"):
+        parse_mix("list=5,show=-1", writes=False)
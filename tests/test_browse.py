@@ -0,0 +1,54 @@
+"""
+Tests of the interactive document browser.
+"""
+
+import asyncio
+
+from pypaperless_cli.commands.browse import Browser, LRUCache
+
+
+def test_cancelled_caller_leaves_shared_request_running() -> None:
+    async def run() -> None:
+        browser = Browser(None, None, {})
+        cache = LRUCache(10)
+        started = 0
+
+        async def request() -> str:
+            nonlocal started
+            started += 1
+            await asyncio.sleep(0.1)
+            return "value"
+
+        first = asyncio.ensure_future(browser.cached(cache, "key", request))
+        second = asyncio.ensure_future(browser.cached(cache, "key", request))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        assert await second == "value"
+        assert first.cancelled()
+        assert started == 1
+
+    asyncio.run(run())
+
+
+def test_request_is_dropped_once_all_callers_cancelled() -> None:
+    async def run() -> None:
+        browser = Browser(None, None, {})
+        cache = LRUCache(10)
+        started = 0
+
+        async def request() -> str:
+            nonlocal started
+            started += 1
+            await asyncio.sleep(0.1)
+            return f"value {started}"
+
+        caller = asyncio.ensure_future(browser.cached(cache, "key", request))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0)
+
+        assert not browser.inflight
+        assert await browser.cached(cache, "key", request) == "value 2"
+
+    asyncio.run(run())
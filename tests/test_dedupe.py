@@ -0,0 +1,59 @@
+"""
+Tests of finding local files already stored in Paperless-ngx.
+"""
+
+import asyncio
+import importlib
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+from aiohttp import web
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.config import Account
+from pypaperless_cli.utils.cache import read_json
+
+# The commands package re-exports the command function under the module's name
+dedupe = importlib.import_module("pypaperless_cli.commands.dedupe")
+
+
+def metadata_app(failing: int) -> web.Application:
+    """Serve the checksums of documents 1 to 10, failing for one of them."""
+
+    async def index(request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def documents(request: web.Request) -> web.Response:
+        return web.json_response({"count": 10, "results": [], "all": list(range(1, 11))})
+
+    async def metadata(request: web.Request) -> web.Response:
+        id = int(request.match_info["id"])
+        if id == failing:
+            return web.json_response({"detail": "Server error."}, status=500)
+        return web.json_response({"original_checksum": f"checksum-{id}"})
+
+    app = web.Application()
+    app.add_routes([
+        web.get("/api/", index),
+        web.get("/api/documents/", documents),
+        web.get("/api/documents/{id:\\d+}/metadata/", metadata),
+    ])
+
+    return app
+
+
+def test_failed_checksums_are_recorded(server: Callable[[web.Application], str], tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(dedupe, "cache_dir", lambda: tmp_path)
+    url = server(metadata_app(failing=4))
+    errors: Dict[int, str] = {}
+
+    async def run() -> Dict[str, int]:
+        async with PaperlessAsyncAPI(Account(url, token="secret")) as paperless:
+            return await dedupe.update_index(paperless, 4, errors)
+
+    index = asyncio.run(run())
+
+    assert list(errors) == [4]
+    assert index == {f"checksum-{id}": id for id in range(1, 11) if id != 4}
+    assert read_json(tmp_path.joinpath("checksums.json"), {}) == {str(id): f"checksum-{id}" for id in range(1, 11) if id != 4}
@@ -0,0 +1,39 @@
+"""
+Tests of exporting documents.
+"""
+
+import csv
+import json
+from pathlib import Path
+
+from pypaperless_cli.utils.standin import DOCUMENTS
+
+
+def test_resumed_filter_export_has_no_duplicates(standin, pngx, tmp_path: Path) -> None:
+    app, _ = standin
+    expected = sorted(id for id, d in app[DOCUMENTS].items() if 1 in d["tags"])
+    output = tmp_path.joinpath("export.csv")
+
+    result = pngx("document", "export", "--filter", "tags__id__all=1", "--format", "csv", "--output", str(output), "--page-size", "5")
+    assert result.returncode == 0, result.stderr
+
+    # Turn the finished job into one interrupted after two pages
+    journal = next(tmp_path.joinpath("state").glob("**/jobs/*.jsonl"))
+    records = [json.loads(line) for line in journal.read_text().splitlines()]
+    done = [r for r in records if "done" in r][:2]
+    journal.write_text("".join(json.dumps(r) + "\n" for r in [records[0], *done]))
+
+    completed = {id for r in done for id in r["done"]}
+    with open(output, newline="") as f:
+        rows = list(csv.reader(f))
+    with open(output, "w", newline="") as f:
+        csv.writer(f).writerows([rows[0], *(row for row in rows[1:] if int(row[0]) in completed)])
+
+    result = pngx("jobs", "resume", journal.stem)
+    assert result.returncode == 0, result.stderr
+
+    with open(output, newline="") as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0][0] == "id"
+    assert [int(row[0]) for row in rows[1:]] == expected
@@ -0,0 +1,55 @@
+"""
+Tests of helpers for paginated API endpoints.
+"""
+
+import asyncio
+from typing import List, Optional, Tuple
+
+from aiohttp import web
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.config import Account
+from pypaperless_cli.utils.pages import stream_modified
+from pypaperless_cli.utils.standin import DOCUMENTS
+
+TIE = "2030-01-01T00:00:00+00:00"
+
+
+def modified_ids(url: str, cursor: Tuple[Optional[str], Optional[int]] = (None, None), page_size: int = 10) -> List[int]:
+    async def collect() -> List[int]:
+        async with PaperlessAsyncAPI(Account(url, token="secret")) as paperless:
+            return [
+                document["id"]
+                async for results in stream_modified(paperless, {"fields": "id,modified"}, cursor, page_size)
+                for document in results
+            ]
+
+    return asyncio.run(asyncio.wait_for(collect(), 30))
+
+
+def test_stream_modified_pages_through_ties(standin: Tuple[web.Application, str]) -> None:
+    app, url = standin
+    documents = app[DOCUMENTS]
+
+    # More documents modified at the same time than fit on a page, the most recently modified ones
+    ties = list(range(40, 75))
+    for id in ties:
+        documents[id]["modified"] = TIE
+
+    ids = modified_ids(url)
+
+    assert sorted(ids) == sorted(documents)
+    assert ids[-len(ties):] == ties
+
+
+def test_stream_modified_continues_in_ties(standin: Tuple[web.Application, str]) -> None:
+    app, url = standin
+    documents = app[DOCUMENTS]
+
+    ties = list(range(10, 40))
+    for id in ties:
+        documents[id]["modified"] = TIE
+    documents[99]["modified"] = "2031-01-01T00:00:00+00:00"
+
+    assert modified_ids(url, (TIE, 24)) == [*range(25, 40), 99]
+    assert modified_ids(url, (TIE, 39)) == [99]
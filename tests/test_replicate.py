@@ -0,0 +1,53 @@
+"""
+Tests of replicating documents between instances.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from aiohttp import web
+
+from pypaperless_cli.api import PaperlessAsyncAPI
+from pypaperless_cli.commands.replicate import Replication
+from pypaperless_cli.config import Account
+
+
+def tags_app(tags: List[str], failing: str = "") -> web.Application:
+    """Serve tags, creating new ones except for a failing name."""
+
+    objects = [{"id": id, "name": name} for id, name in enumerate(tags, 1)]
+
+    async def index(request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def list_tags(request: web.Request) -> web.Response:
+        return web.json_response({"count": len(objects), "next": None, "results": objects, "all": [o["id"] for o in objects]})
+
+    async def create_tag(request: web.Request) -> web.Response:
+        data = await request.json()
+        if data["name"] == failing:
+            return web.json_response({"name": ["Invalid name."]}, status=400)
+        objects.append({"id": len(objects) + 1, "name": data["name"]})
+        return web.json_response(objects[-1], status=201)
+
+    app = web.Application()
+    app.add_routes([web.get("/api/", index), web.get("/api/tags/", list_tags), web.post("/api/tags/", create_tag)])
+
+    return app
+
+
+def test_failed_objects_are_recorded(server: Callable[[web.Application], str], tmp_path: Path) -> None:
+    source = server(tags_app(["a", "b", "c", "d"]))
+    target = server(tags_app(["b"], failing="c"))
+
+    async def run() -> Replication:
+        async with PaperlessAsyncAPI(Account(source, token="secret")) as source_api, PaperlessAsyncAPI(Account(target, token="secret")) as target_api:
+            replication = Replication(source_api, target_api, tmp_path.joinpath("state.json"))
+            assert await replication.map_objects("tags", False, 2) == 3
+            return replication
+
+    replication = asyncio.run(run())
+
+    assert replication.maps["tags"] == {1: 2, 2: 1, 4: 3}
+    assert list(replication.object_errors) == ["Tag c"]
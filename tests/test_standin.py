@@ -0,0 +1,59 @@
+"""
+Tests of the stand-in API.
+"""
+
+import asyncio
+from typing import Any, Dict, Tuple
+
+from aiohttp import ClientSession, web
+
+from pypaperless_cli.utils.standin import DOCUMENTS
+
+
+def get(url: str, path: str, params: Dict[str, Any]) -> Tuple[int, Any]:
+    async def request() -> Tuple[int, Any]:
+        async with ClientSession() as session:
+            async with session.get(f"{url}{path}", params=params) as res:
+                return res.status, await res.json()
+
+    return asyncio.run(request())
+
+
+def test_unknown_filters_are_rejected(standin: Tuple[web.Application, str]) -> None:
+    _, url = standin
+
+    status, data = get(url, "/api/documents/", {"id__gt": 10})
+    assert status == 400
+    assert "id__gt" in data
+
+    status, _ = get(url, "/api/tags/", {"name__icontains": "inbox"})
+    assert status == 400
+
+
+def test_documents_are_filtered_and_ordered(standin: Tuple[web.Application, str]) -> None:
+    app, url = standin
+    documents = app[DOCUMENTS]
+    for id in (3, 1, 2):
+        documents[id]["modified"] = "2030-01-01T00:00:00+00:00"
+
+    status, data = get(url, "/api/documents/", {"modified__gte": "2030-01-01T00:00:00Z", "ordering": "-id", "fields": "id"})
+    assert status == 200
+    assert [d["id"] for d in data["results"]] == [3, 2, 1]
+
+    status, data = get(url, "/api/documents/", {"modified__gt": "2030-01-01T00:00:00Z"})
+    assert data["count"] == 0
+
+    status, data = get(url, "/api/documents/", {"id__in": "5,7", "ordering": "modified,id", "page_size": 1})
+    assert [d["id"] for d in data["results"]] == [min((5, 7), key=lambda id: (documents[id]["modified"], id))]
+    assert data["next"] is not None
+
+
+def test_objects_are_filtered(standin: Tuple[web.Application, str]) -> None:
+    _, url = standin
+
+    status, data = get(url, "/api/tags/", {"name__iexact": "INBOX"})
+    assert status == 200
+    assert [t["name"] for t in data["results"]] == ["inbox"]
+
+    status, data = get(url, "/api/storage_paths/", {"id__in": "2"})
+    assert data["results"][0]["path"]
@@ -0,0 +1,36 @@
+"""
+Tests of reading document IDs from standard input.
+"""
+
+import asyncio
+import subprocess
+from typing import Callable, Iterator, List
+
+from pypaperless_cli.utils.stdin import read_ids
+
+
+def test_reading_waits_for_the_consumer() -> None:
+    read: List[int] = []
+
+    def lines() -> Iterator[str]:
+        for id in range(1, 100_001):
+            read.append(id)
+            yield f"{id}\n"
+
+    async def run() -> List[int]:
+        chunks = read_ids(10, lines())
+        first = await anext(chunks)
+        # Give the reader thread time to run ahead as far as it may
+        await asyncio.sleep(0.2)
+        await chunks.aclose()
+        return first
+
+    assert asyncio.run(run()) == list(range(1, 11))
+    assert len(read) < 100
+
+
+def test_show_reads_ids_from_stdin(pngx: Callable[..., subprocess.CompletedProcess]) -> None:
+    result = pngx("document", "show", "-", "--fields", "id,title", input="id\n3\n{\"id\": 5}\n")
+
+    assert result.returncode == 0, result.stderr
+    assert [line.split()[-1] for line in result.stdout.splitlines() if line.startswith("ID")] == ["3", "5"]